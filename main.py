@@ -5,14 +5,22 @@ LogiQube - Main Entry Point
 
 Usage:
     python main.py
+    python main.py --clock 5+3     (5 minutes each, 3 seconds increment per move)
 """
 
+import argparse
 import sys
+from src.clock import parse_time_control
 from src.game import Game, MainMenu
 
 
 def main():
     """Main entry point for LogiQube."""
+    parser = argparse.ArgumentParser(description="LogiQube - 4x4x4 Strategic Tic-Tac-Toe")
+    parser.add_argument("--clock", type=parse_time_control, default=None, metavar="MINUTES+SECONDS",
+                        help="play with chess-style clocks, e.g. 5+3")
+    args = parser.parse_args()
+
     try:
         # Show main menu
         menu = MainMenu()
@@ -23,7 +31,7 @@ def main():
             sys.exit(0)
 
         # Start game with selected mode
-        game = Game()
+        game = Game(time_control=args.clock)
         game.mode = selected_mode
         game.run()
 
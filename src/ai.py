@@ -0,0 +1,208 @@
+"""
+LogiQube - AI Players
+Difficulty levels defined as deterministic search node budgets, with a
+wall-clock ceiling as a safety net so response time stays bounded when many
+AI games share one machine.
+
+Within its node budget a level always picks the same move for the same
+position and seed; easier levels choose randomly among moves scoring within
+a margin of the best. The ceiling only changes the result when the machine
+is so loaded that the budget cannot be spent in time.
+
+Usage (load test):
+    python -m src.ai --games 200 --workers 8
+"""
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.board import Board
+from src.clock import MIN_SEARCH_TIME, TimeManager
+from src.constants import AI_EASY, AI_MEDIUM, AI_HARD, STATE_PLAYING
+from src.endgame import EndgameSolver
+from src.search import Searcher
+
+# Per level: node budget, deepest iteration, wall-clock ceiling (seconds) and
+# the score margin within which moves are picked at random (None: always best).
+# In timed games the ceiling is lowered further by the time manager.
+DIFFICULTY_LEVELS = {
+    AI_EASY: {"nodes": 300, "max_depth": 2, "time_limit": 0.05, "margin": 150},
+    AI_MEDIUM: {"nodes": 3000, "max_depth": 4, "time_limit": 0.25, "margin": 20},
+    AI_HARD: {"nodes": 20000, "max_depth": 10, "time_limit": 1.0, "margin": None},
+}
+
+
+class AIPlayer:
+    """
+    Computer opponent for one difficulty level.
+    """
+
+    def __init__(self, difficulty=AI_MEDIUM, seed=0, settings=None):
+        """
+        Initialize the player.
+
+        Args:
+            difficulty: AI_EASY, AI_MEDIUM or AI_HARD
+            seed: Seed for choosing among near-best moves
+            settings: Custom level dict (same keys as DIFFICULTY_LEVELS
+                entries); overrides difficulty
+        """
+        if settings is None:
+            if difficulty not in DIFFICULTY_LEVELS:
+                raise ValueError(f"unknown difficulty {difficulty!r}")
+            settings = DIFFICULTY_LEVELS[difficulty]
+        self.difficulty = difficulty
+        self.settings = settings
+        self.seed = seed
+        self.searcher = Searcher(endgame=EndgameSolver())
+        self.time_manager = TimeManager()
+        self.last_result = None
+
+    def choose_move(self, board, time_left=None, increment=0.0):
+        """
+        Pick a move for the side to move.
+
+        Args:
+            board: Board instance (left unchanged)
+            time_left: Seconds on the player's clock in a timed game, or None
+            increment: Seconds added to the clock after the move
+
+        Returns:
+            tuple: (x, y, z), or None if the game is over
+        """
+        if board.game_status != STATE_PLAYING:
+            return None
+
+        start_time = time.perf_counter()
+        settings = self.settings
+        margin = settings["margin"]
+        time_limit = settings["time_limit"]
+        soft_limit = None
+        if time_left is not None:
+            soft_limit, hard_limit = self.time_manager.allocate(board, time_left, increment)
+            if hard_limit < MIN_SEARCH_TIME:
+                self.last_result = None
+                return next(board.generate_moves())
+            time_limit = hard_limit if time_limit is None else min(time_limit, hard_limit)
+
+        # Fresh tables per move, so the choice depends only on the position
+        self.searcher.tt.clear()
+        self.searcher.endgame.clear()
+        result = self.searcher.search(board, settings["max_depth"], time_limit=time_limit,
+                                      node_limit=settings["nodes"], root_margin=margin or 0,
+                                      soft_time_limit=soft_limit)
+        self.last_result = result
+        if time_left is not None:
+            self.time_manager.record(time_limit, time.perf_counter() - start_time)
+
+        if result is None:
+            # Not even depth 1 finished: fall back to the best-ordered move
+            return next(board.generate_moves())
+        if margin is None or len(result.candidates) == 1:
+            return result.move
+
+        rng = random.Random(hash((self.seed, board.zobrist_key, board.move_count)))
+        return rng.choice(result.candidates)[0]
+
+
+def play_games(args):
+    """
+    Worker: play several AI-vs-AI games in lockstep, timing every move.
+
+    Moves of different games are interleaved (one move per game in turn) to
+    mimic a server handling many games at once.
+
+    Args:
+        args: (difficulty, games, seed)
+
+    Returns:
+        tuple: (latencies in seconds, moves that stopped on the wall-clock ceiling)
+    """
+    difficulty, games, seed = args
+    boards = [Board() for _ in range(games)]
+    players = [AIPlayer(difficulty, seed + i) for i in range(games)]
+    latencies = []
+    ceiling_hits = 0
+
+    while boards:
+        still_playing = []
+        for board, player in zip(boards, players):
+            start_time = time.perf_counter()
+            move = player.choose_move(board)
+            latencies.append(time.perf_counter() - start_time)
+            if player.searcher.deadline_hit:
+                ceiling_hits += 1
+            board.make_move(*move)
+            if board.game_status == STATE_PLAYING:
+                still_playing.append((board, player))
+        boards = [board for board, _ in still_playing]
+        players = [player for _, player in still_playing]
+
+    return latencies, ceiling_hits
+
+
+def load_test(difficulty, games, workers=None, seed=0):
+    """
+    Measure move latency with many AI games running concurrently.
+
+    Args:
+        difficulty: Level to test
+        games: Concurrent games in total
+        workers: Processes to spread games over (defaults to the CPU count)
+        seed: Base seed
+
+    Returns:
+        dict: moves, p50/p99/max latency in milliseconds, ceiling hits,
+        moves that took longer than the ceiling and the largest overshoot
+        past it in milliseconds
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as pool:
+        per_worker = [games // workers + (i < games % workers) for i in range(workers)]
+        tasks = [(difficulty, count, seed + 1000 * i) for i, count in enumerate(per_worker) if count]
+        latencies = []
+        ceiling_hits = 0
+        for worker_latencies, worker_hits in pool.map(play_games, tasks):
+            latencies.extend(worker_latencies)
+            ceiling_hits += worker_hits
+
+    latencies = np.array(latencies) * 1000
+    overshoot = latencies - DIFFICULTY_LEVELS[difficulty]["time_limit"] * 1000
+    return {
+        "moves": len(latencies),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+        "ceiling_hits": ceiling_hits,
+        "over_ceiling": int((overshoot > 0).sum()),
+        "max_overshoot_ms": float(max(overshoot.max(), 0.0)),
+    }
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="LogiQube AI move latency load test")
+    parser.add_argument("--games", type=int, default=200, help="concurrent games per level")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--level", action="append", choices=list(DIFFICULTY_LEVELS),
+                        help="difficulty to test (repeatable, default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for difficulty in args.level or list(DIFFICULTY_LEVELS):
+        report = load_test(difficulty, args.games, args.workers, args.seed)
+        ceiling = DIFFICULTY_LEVELS[difficulty]["time_limit"] * 1000
+        print(f"{difficulty:>6}: {report['moves']} moves  p50 {report['p50_ms']:.1f}ms  "
+              f"p99 {report['p99_ms']:.1f}ms  max {report['max_ms']:.1f}ms  "
+              f"(ceiling {ceiling:.0f}ms, hit {report['ceiling_hits']} times, "
+              f"exceeded {report['over_ceiling']} times by up to {report['max_overshoot_ms']:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,561 @@
+"""
+LogiQube - Local Analysis Service
+JSON-RPC 2.0 over a local TCP socket (one JSON object per line).
+
+Concurrent requests arriving within a short window are coalesced into one
+vectorized batch evaluation, and results are cached by symmetry-canonical
+position so every rotation or reflection of a known position is a cache hit.
+
+Usage:
+    python -m src.analysis_server --port 8765
+
+Request:
+    {"jsonrpc": "2.0", "id": 1, "method": "analyze", "params": {"position": "X...O..."}}
+    {"jsonrpc": "2.0", "id": 2, "method": "analyze", "params": {"moves": [[0, 0, 0], [1, 1, 1]]}}
+    {"jsonrpc": "2.0", "id": 3, "method": "memory", "params": {"trace": true}}  (see src/diagnostics.py)
+"""
+
+import asyncio
+import json
+import socket
+from collections import OrderedDict
+
+import numpy as np
+
+from src import diagnostics
+from src.board import Board
+from src.constants import EMPTY, PLAYER_X, PLAYER_O, STATE_PLAYING, STATE_WIN, STATE_DRAW
+from src.evaluation import evaluate_batch, line_counts_batch
+from src.notation import notation_to_cells
+from src.search import WIN_SCORE
+from src.symmetry import canonical_form
+from src.winning_lines import NUM_CELLS, LINE_INDEX_ARRAY, index_to_position
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+BATCH_WINDOW = 0.005  # Seconds to wait for more requests before evaluating
+MAX_BATCH = 512  # Evaluate immediately once this many positions are pending
+CACHE_SIZE = 100000  # Canonical positions kept in the LRU cache
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+PLAYER_NAMES = {PLAYER_X: "X", PLAYER_O: "O"}
+
+
+class AnalysisError(Exception):
+    """Error reported back to the client as a JSON-RPC error object."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def parse_position(text):
+    """
+    Parse a position string in position notation (see src/notation.py).
+
+    Cells are listed in flat index order (index = x + 4y + 16z) using '.'
+    for empty, 'X' and 'O' (case-insensitive) for pieces, optionally
+    followed by a space and the side to move. The analysis takes the side
+    to move from the piece counts, so a given side that contradicts them in
+    a game in progress is rejected rather than silently ignored.
+
+    Args:
+        text: Position string
+
+    Returns:
+        np.ndarray: (64,) int8 flattened board
+
+    Raises:
+        AnalysisError: If the string is malformed, the piece counts are
+            impossible or the side to move contradicts them
+    """
+    if not isinstance(text, str):
+        raise AnalysisError(INVALID_PARAMS, f"position must be a {NUM_CELLS}-character string")
+    try:
+        cells, _ = notation_to_cells([text])
+    except ValueError as e:
+        raise AnalysisError(INVALID_PARAMS, str(e))
+    return cells[0]
+
+
+def replay_moves(moves):
+    """
+    Replay a move list through Board and return the resulting position.
+
+    Args:
+        moves: List of [x, y, z] moves, X first
+
+    Returns:
+        np.ndarray: (64,) int8 flattened board
+
+    Raises:
+        AnalysisError: If a move is malformed or illegal
+    """
+    board = Board()
+    for ply, move in enumerate(moves):
+        if (not isinstance(move, (list, tuple)) or len(move) != 3
+                or not all(isinstance(c, int) and not isinstance(c, bool) for c in move)):
+            raise AnalysisError(INVALID_PARAMS, f"move {ply} must be [x, y, z] with integer coordinates")
+        if not board.make_move(*move):
+            raise AnalysisError(INVALID_PARAMS, f"move {ply} {list(move)} is illegal")
+    return board.cells.copy()
+
+
+def _line_cells(cells, line_mask):
+    """
+    Mark the empty cells of the selected lines.
+
+    Args:
+        cells: (N, 64) flattened boards
+        line_mask: (N, 76) bool, lines to take empty cells from
+
+    Returns:
+        np.ndarray: (N, 64) bool
+    """
+    marked = np.zeros(cells.shape, dtype=bool)
+    candidates = line_mask[:, :, None] & (cells[:, LINE_INDEX_ARRAY] == EMPTY)
+    rows, lines, slots = np.nonzero(candidates)
+    marked[rows, LINE_INDEX_ARRAY[lines, slots]] = True
+    return marked
+
+
+def analyze_batch(cells):
+    """
+    Analyze a batch of positions with one vectorized pass.
+
+    The engine score is a one-ply lookahead: every empty cell is filled by
+    the side to move in all N x 64 child positions at once, immediate wins
+    score as wins, and when the opponent threatens to win every non-blocking
+    move scores as a loss.
+
+    Args:
+        cells: (N, 64) int8 flattened boards
+
+    Returns:
+        list: One dict per position with cell indices (not coordinates)
+    """
+    cells = np.asarray(cells, dtype=np.int8).reshape(-1, NUM_CELLS)
+    count = len(cells)
+    x_counts, o_counts = line_counts_batch(cells)
+    empty = cells == EMPTY
+    movers = np.where((cells == PLAYER_X).sum(axis=1) == (cells == PLAYER_O).sum(axis=1),
+                      PLAYER_X, PLAYER_O)
+
+    winning = {
+        PLAYER_X: _line_cells(cells, (x_counts == 3) & (o_counts == 0)),
+        PLAYER_O: _line_cells(cells, (o_counts == 3) & (x_counts == 0)),
+    }
+    threats = {
+        PLAYER_X: _line_cells(cells, (x_counts == 2) & (o_counts == 0)),
+        PLAYER_O: _line_cells(cells, (o_counts == 2) & (x_counts == 0)),
+    }
+    winners = np.where((x_counts == 4).any(axis=1), PLAYER_X,
+                       np.where((o_counts == 4).any(axis=1), PLAYER_O, EMPTY))
+    # A position is drawn once no line is free of one player or the other
+    live = ((x_counts == 0) | (o_counts == 0)).any(axis=1)
+    static = evaluate_batch(cells, movers)
+
+    # One-ply lookahead over every (position, cell) pair
+    children = np.repeat(cells[:, None, :], NUM_CELLS, axis=1)
+    diagonal = np.arange(NUM_CELLS)
+    children[:, diagonal, diagonal] = movers[:, None]
+    child_scores = evaluate_batch(children.reshape(-1, NUM_CELLS),
+                                  np.repeat(movers, NUM_CELLS)).reshape(count, NUM_CELLS)
+
+    mover_is_x = (movers == PLAYER_X)[:, None]
+    mover_wins = np.where(mover_is_x, winning[PLAYER_X], winning[PLAYER_O])
+    opponent_wins = np.where(mover_is_x, winning[PLAYER_O], winning[PLAYER_X])
+    must_block = opponent_wins.any(axis=1) & ~mover_wins.any(axis=1)
+    child_scores = np.where(must_block[:, None] & ~opponent_wins, -(WIN_SCORE - 2), child_scores)
+    child_scores = np.where(mover_wins, WIN_SCORE - 1, child_scores)
+    child_scores = np.where(empty, child_scores, np.iinfo(np.int64).min)
+    best_moves = child_scores.argmax(axis=1)
+
+    results = []
+    for i in range(count):
+        winner = int(winners[i])
+        if winner != EMPTY:
+            status = STATE_WIN
+        elif not live[i]:
+            status = STATE_DRAW
+        else:
+            status = STATE_PLAYING
+
+        playing = status == STATE_PLAYING
+        results.append({
+            "status": status,
+            "winner": winner if winner != EMPTY else None,
+            "side_to_move": int(movers[i]),
+            "evaluation": int(static[i]),
+            "score": int(child_scores[i, best_moves[i]]) if playing else None,
+            "best_move": int(best_moves[i]) if playing else None,
+            "winning_moves": {player: np.flatnonzero(winning[player][i]).tolist()
+                              for player in (PLAYER_X, PLAYER_O)},
+            "threat_positions": {player: np.flatnonzero(threats[player][i]).tolist()
+                                 for player in (PLAYER_X, PLAYER_O)},
+        })
+    return results
+
+
+def _to_response(result, perm):
+    """
+    Convert a canonical-frame result into the caller's orientation as JSON data.
+
+    Args:
+        result: Dict from analyze_batch for the canonical position
+        perm: Permutation from canonical_form; canonical cell j is original cell perm[j]
+
+    Returns:
+        dict: JSON-serializable result with (x, y, z) coordinates
+    """
+    def positions(indices):
+        return sorted(index_to_position(int(perm[j])) for j in indices)
+
+    best_move = result["best_move"]
+    return {
+        "status": result["status"],
+        "winner": PLAYER_NAMES.get(result["winner"]),
+        "side_to_move": PLAYER_NAMES[result["side_to_move"]],
+        "evaluation": result["evaluation"],
+        "score": result["score"],
+        "best_move": None if best_move is None else index_to_position(int(perm[best_move])),
+        "winning_moves": {PLAYER_NAMES[p]: positions(v) for p, v in result["winning_moves"].items()},
+        "threat_positions": {PLAYER_NAMES[p]: positions(v) for p, v in result["threat_positions"].items()},
+    }
+
+
+class LRUCache:
+    """
+    Fixed-capacity mapping that evicts the least recently used entry.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        """Return the cached value (marking it recently used) or None."""
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Insert or refresh an entry, evicting the oldest when full."""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class AnalysisService:
+    """
+    Batches and caches position analysis for concurrent asyncio callers.
+    """
+
+    def __init__(self, batch_window=BATCH_WINDOW, max_batch=MAX_BATCH, cache_size=CACHE_SIZE):
+        """
+        Initialize the service.
+
+        Args:
+            batch_window: Seconds to wait for more requests after the first
+            max_batch: Pending positions that trigger an immediate evaluation
+            cache_size: Canonical positions kept in the LRU cache
+        """
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.cache = LRUCache(cache_size)
+        self.pending = []  # (canonical key, future) awaiting evaluation
+        self.flush_handle = None
+
+        # Counters reported by the "stats" method
+        self.requests = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.positions_evaluated = 0
+
+    async def analyze(self, cells):
+        """
+        Analyze one position, sharing work with concurrent requests.
+
+        Args:
+            cells: (64,) flattened board
+
+        Returns:
+            dict: JSON-serializable analysis in the caller's orientation
+        """
+        self.requests += 1
+        key, perm = canonical_form(cells)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return _to_response(cached, perm)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((key, future))
+
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        return _to_response(await future, perm)
+
+    def _flush(self):
+        """Hand all pending requests to one batch evaluation."""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending = self.pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._evaluate(batch))
+
+    async def _evaluate(self, batch):
+        """Evaluate a batch off the event loop and resolve its futures."""
+        waiters = {}
+        for key, future in batch:
+            waiters.setdefault(key, []).append(future)
+        keys = list(waiters)
+        cells = np.frombuffer(b"".join(keys), dtype=np.int8).reshape(-1, NUM_CELLS)
+
+        try:
+            # Run in a thread so new requests keep arriving (and batching) meanwhile
+            results = await asyncio.get_running_loop().run_in_executor(None, analyze_batch, cells)
+        except Exception as e:
+            for futures in waiters.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.positions_evaluated += len(keys)
+        for key, result in zip(keys, results):
+            self.cache.put(key, result)
+            for future in waiters[key]:
+                if not future.done():
+                    future.set_result(result)
+
+    def get_stats(self):
+        """
+        Get service counters.
+
+        Returns:
+            dict: Request, cache and batch counts
+        """
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "cache_size": len(self.cache),
+            "batches": self.batches,
+            "positions_evaluated": self.positions_evaluated,
+        }
+
+
+class AnalysisServer:
+    """
+    Newline-delimited JSON-RPC 2.0 server in front of an AnalysisService.
+    """
+
+    def __init__(self, service=None, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.service = service if service is not None else AnalysisService()
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        """
+        Start listening.
+
+        Returns:
+            int: The bound port (useful when constructed with port 0)
+        """
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        """Start (if needed) and serve until cancelled."""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        """Stop accepting connections."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle_client(self, reader, writer):
+        """Serve one connection; pipelined requests are handled concurrently."""
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, line, writer):
+        """Handle one request line and write its response."""
+        response = await self.handle_request(line)
+        if response is not None:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+
+    async def handle_request(self, line):
+        """
+        Handle one raw JSON-RPC request.
+
+        Args:
+            line: Request bytes or str
+
+        Returns:
+            dict: Response object, or None for notifications
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return _error_response(None, PARSE_ERROR, "parse error")
+
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _error_response(None, INVALID_REQUEST, "invalid request")
+
+        request_id = request.get("id")
+        try:
+            result = await self.dispatch(request["method"], request.get("params") or {})
+        except AnalysisError as e:
+            return _error_response(request_id, e.code, e.message)
+        except Exception as e:
+            return _error_response(request_id, INTERNAL_ERROR, str(e))
+
+        if "id" not in request:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    async def dispatch(self, method, params):
+        """
+        Run one method.
+
+        Args:
+            method: Method name
+            params: Params object
+
+        Returns:
+            JSON-serializable result
+        """
+        if method == "ping":
+            return "pong"
+        if method == "stats":
+            return self.service.get_stats()
+        if method == "memory":
+            # Admin: memory report, optionally starting or stopping allocation tracing
+            if not isinstance(params, dict):
+                raise AnalysisError(INVALID_PARAMS, "params must be an object")
+            top = params.get("top", diagnostics.DEFAULT_TOP_SITES)
+            if not isinstance(top, int) or isinstance(top, bool) or top <= 0:
+                raise AnalysisError(INVALID_PARAMS, "top must be a positive integer")
+            trace = params.get("trace")
+            if trace:
+                diagnostics.start_tracing()
+            elif trace is not None:
+                diagnostics.stop_tracing()
+            # The object scan takes tens of milliseconds: keep it off the event loop
+            report = await asyncio.get_running_loop().run_in_executor(None, diagnostics.memory_report, top)
+            report["service"] = self.service.get_stats()
+            return report
+        if method == "analyze":
+            if not isinstance(params, dict):
+                raise AnalysisError(INVALID_PARAMS, "params must be an object")
+            if "position" in params:
+                cells = parse_position(params["position"])
+            elif "moves" in params:
+                cells = replay_moves(params["moves"])
+            else:
+                raise AnalysisError(INVALID_PARAMS, "expected 'position' or 'moves'")
+            return await self.service.analyze(cells)
+        raise AnalysisError(METHOD_NOT_FOUND, f"unknown method {method!r}")
+
+
+def _error_response(request_id, code, message):
+    """Build a JSON-RPC error response."""
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class AnalysisClient:
+    """
+    Minimal blocking client for the analysis server.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=10.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.stream = self.sock.makefile("rwb")
+        self.next_id = 1
+
+    def call(self, method, **params):
+        """
+        Call a method and wait for its result.
+
+        Raises:
+            AnalysisError: If the server returned an error
+        """
+        request_id = self.next_id
+        self.next_id += 1
+        request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+        self.stream.write(json.dumps(request).encode() + b"\n")
+        self.stream.flush()
+
+        response = json.loads(self.stream.readline())
+        if "error" in response:
+            raise AnalysisError(response["error"]["code"], response["error"]["message"])
+        return response["result"]
+
+    def close(self):
+        """Close the connection."""
+        self.stream.close()
+        self.sock.close()
+
+
+def main():
+    """Run the analysis server."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="LogiQube local analysis server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--window", type=float, default=BATCH_WINDOW, help="batch window in seconds")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    args = parser.parse_args()
+
+    service = AnalysisService(batch_window=args.window, cache_size=args.cache_size)
+    server = AnalysisServer(service, args.host, args.port)
+    print(f"LogiQube analysis server listening on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+LogiQube - Bitboard Backend
+Alternative Board implementation storing each player's pieces as a 64-bit
+integer mask (bit index = x + 4y + 16z). Mirrors the Board API used by the
+game, search and analysis tools, and is validated against the reference
+Board by src/difftest.py.
+"""
+
+from src.constants import (BOARD_SIZE, PLAYER_X, PLAYER_O, STATE_PLAYING, STATE_WIN, STATE_DRAW,
+                           DRAW_BOARD_FULL, DRAW_DEAD)
+from src.winning_lines import WINNING_LINES, NUM_CELLS, CELL_POSITIONS as POSITIONS, position_to_index
+
+
+def _bit(x, y, z):
+    """Bit for a position."""
+    return 1 << position_to_index(x, y, z)
+
+
+# One mask per winning line, in WINNING_LINES order
+LINE_MASKS = tuple(sum(_bit(x, y, z) for x, y, z in line) for line in WINNING_LINES)
+
+# For each bit index, the (mask, line) pairs through it in WINNING_LINES order
+CELL_LINES = tuple(
+    tuple((mask, line) for mask, line in zip(LINE_MASKS, WINNING_LINES) if mask >> index & 1)
+    for index in range(NUM_CELLS)
+)
+
+
+def _popcount(value):
+    """Number of set bits."""
+    return bin(value).count("1")
+
+
+class BitBoard:
+    """
+    Bitboard game state with the same rules and query results as Board.
+    """
+
+    def __init__(self):
+        """Initialize an empty game board."""
+        self.reset()
+
+    def reset(self):
+        """Reset the board to initial state."""
+        self.pieces = {PLAYER_X: 0, PLAYER_O: 0}
+        self.current_player = PLAYER_X
+        self.game_status = STATE_PLAYING
+        self.winner = None
+        self.winning_line = None
+        self.draw_reason = None
+        self.move_history = []
+        self.move_count = 0
+
+    def is_valid_move(self, x, y, z):
+        """
+        Check if a move is valid.
+
+        Args:
+            x, y, z: Coordinates of the position
+
+        Returns:
+            bool: True if move is valid, False otherwise
+        """
+        if not (0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE and 0 <= z < BOARD_SIZE):
+            return False
+        if (self.pieces[PLAYER_X] | self.pieces[PLAYER_O]) & _bit(x, y, z):
+            return False
+        return self.game_status == STATE_PLAYING
+
+    def make_move(self, x, y, z):
+        """
+        Make a move at the specified position.
+
+        Args:
+            x, y, z: Coordinates of the position
+
+        Returns:
+            bool: True if move was successful, False otherwise
+        """
+        if not self.is_valid_move(x, y, z):
+            return False
+
+        player = self.current_player
+        self.pieces[player] |= _bit(x, y, z)
+        self.move_history.append((x, y, z, player))
+        self.move_count += 1
+
+        own = self.pieces[player]
+        for mask, line in CELL_LINES[position_to_index(x, y, z)]:
+            if own & mask == mask:
+                self.game_status = STATE_WIN
+                self.winner = player
+                self.winning_line = line
+                return True
+
+        if self.move_count >= NUM_CELLS:
+            self.game_status = STATE_DRAW
+            self.draw_reason = DRAW_BOARD_FULL
+            return True
+
+        x_pieces = self.pieces[PLAYER_X]
+        o_pieces = self.pieces[PLAYER_O]
+        if all(x_pieces & mask and o_pieces & mask for mask in LINE_MASKS):
+            self.game_status = STATE_DRAW
+            self.draw_reason = DRAW_DEAD
+            return True
+
+        self.current_player = PLAYER_O if player == PLAYER_X else PLAYER_X
+        return True
+
+    def undo_move(self):
+        """
+        Take back the most recent move, restoring the previous game state.
+
+        Returns:
+            bool: True if a move was undone, False if there was nothing to undo
+        """
+        if not self.move_history:
+            return False
+
+        x, y, z, player = self.move_history.pop()
+        self.pieces[player] &= ~_bit(x, y, z)
+        self.move_count -= 1
+        self.current_player = player
+        self.game_status = STATE_PLAYING
+        self.winner = None
+        self.winning_line = None
+        self.draw_reason = None
+        return True
+
+    def get_empty_positions(self):
+        """
+        Get all empty positions on the board.
+
+        Returns:
+            list: List of (x, y, z) tuples for empty positions, in the same
+            order as Board.get_empty_positions
+        """
+        occupied = self.pieces[PLAYER_X] | self.pieces[PLAYER_O]
+        return [POSITIONS[index] for index in range(NUM_CELLS) if not occupied >> index & 1]
+
+    def get_position_value(self, x, y, z):
+        """
+        Get the value at a specific position.
+
+        Returns:
+            int: EMPTY, PLAYER_X, or PLAYER_O
+        """
+        bit = _bit(x, y, z)
+        if self.pieces[PLAYER_X] & bit:
+            return PLAYER_X
+        if self.pieces[PLAYER_O] & bit:
+            return PLAYER_O
+        return 0
+
+    def _open_line_cells(self, player, count):
+        """
+        Empty cells of lines holding exactly count of player's pieces and
+        none of the opponent's, in the same order Board reports them.
+        """
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        own = self.pieces[player]
+        theirs = self.pieces[opponent]
+        occupied = own | theirs
+
+        positions = []
+        seen = 0
+        for mask, line in zip(LINE_MASKS, WINNING_LINES):
+            if theirs & mask or _popcount(own & mask) != count:
+                continue
+            for x, y, z in line:
+                bit = _bit(x, y, z)
+                if not occupied & bit and not seen & bit:
+                    seen |= bit
+                    positions.append((x, y, z))
+        return positions
+
+    def get_winning_moves(self, player):
+        """
+        Find all positions where player can win on next move.
+
+        Returns:
+            list: List of (x, y, z) positions that would win the game
+        """
+        return self._open_line_cells(player, 3)
+
+    def get_threat_positions(self, player, threat_level=2):
+        """
+        Find positions where player has threat_level pieces in a line.
+
+        Returns:
+            list: List of (x, y, z) positions in threatened lines
+        """
+        return self._open_line_cells(player, threat_level)
@@ -1,10 +1,17 @@
 """
 LogiQube - Board Logic and Game State Management
+
+Cells are stored flat (index = x + 4y + 16z) and the move and query code
+works on indices; the (x, y, z) methods are thin wrappers over them.
 """
 
 import numpy as np
-from src.constants import BOARD_SIZE, EMPTY, PLAYER_X, PLAYER_O, STATE_PLAYING, STATE_WIN, STATE_DRAW
-from src.winning_lines import WINNING_LINES, get_lines_containing_position
+from src.constants import (BOARD_SIZE, EMPTY, PLAYER_X, PLAYER_O, STATE_PLAYING, STATE_WIN, STATE_DRAW,
+                           DRAW_BOARD_FULL, DRAW_DEAD, WIN_LINE, WIN_ON_TIME)
+from src.notation import cells_to_notation, is_move_notation, notation_to_cells, parse_move_notation
+from src.winning_lines import (WINNING_LINES, NUM_CELLS, CELL_POSITIONS, CELLS_BY_CENTRALITY, CELL_LINE_INDICES,
+                               LINE_CELL_INDICES, LINE_INDEX_ARRAY, LINE_INTERSECTIONS, position_to_index)
+from src.zobrist import ZOBRIST_CELL_KEYS
 
 
 class Board:
@@ -14,18 +21,28 @@ class Board:
 
     def __init__(self):
         """Initialize an empty game board."""
+        self.stats = None  # Optional SearchStats collecting move generator counters
         self.reset()
 
     def reset(self):
         """Reset the board to initial state."""
-        # 3D array: board[z][y][x] where z=plane, y=row, x=column
-        self.board = np.zeros((BOARD_SIZE, BOARD_SIZE, BOARD_SIZE), dtype=int)
+        # Flat cell storage, and a 3D view of it: board[z][y][x] where z=plane, y=row, x=column
+        self.cells = np.zeros(NUM_CELLS, dtype=np.int8)
+        self.board = self.cells.reshape(BOARD_SIZE, BOARD_SIZE, BOARD_SIZE)
         self.current_player = PLAYER_X
         self.game_status = STATE_PLAYING
         self.winner = None
         self.winning_line = None
+        self.draw_reason = None  # DRAW_BOARD_FULL or DRAW_DEAD once drawn
+        self.win_reason = None  # WIN_LINE or WIN_ON_TIME once won
         self.move_history = []
         self.move_count = 0
+        self.zobrist_key = 0  # Incremental position hash for transposition tables
+
+        # Pieces per player in each of the 76 lines, kept up to date by make/undo
+        self.line_counts = {PLAYER_X: [0] * len(WINNING_LINES), PLAYER_O: [0] * len(WINNING_LINES)}
+        # Lines still winnable by each player (no opponent piece in them)
+        self.live_lines = {PLAYER_X: len(WINNING_LINES), PLAYER_O: len(WINNING_LINES)}
 
     def is_valid_move(self, x, y, z):
         """
@@ -41,15 +58,23 @@ class Board:
         if not (0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE and 0 <= z < BOARD_SIZE):
             return False
 
-        # Check if position is empty
-        if self.board[z][y][x] != EMPTY:
-            return False
+        return self.is_valid_index(position_to_index(x, y, z))
 
-        # Check if game is still in progress
-        if self.game_status != STATE_PLAYING:
+    def is_valid_index(self, index):
+        """
+        Check if a move is valid.
+
+        Args:
+            index: Flat cell index (0-63)
+
+        Returns:
+            bool: True if move is valid, False otherwise
+        """
+        if not 0 <= index < NUM_CELLS:
             return False
 
-        return True
+        # Check if position is empty and the game is still in progress
+        return self.cells[index] == EMPTY and self.game_status == STATE_PLAYING
 
     def make_move(self, x, y, z):
         """
@@ -61,25 +86,60 @@ class Board:
         Returns:
             bool: True if move was successful, False otherwise
         """
-        if not self.is_valid_move(x, y, z):
+        if not (0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE and 0 <= z < BOARD_SIZE):
+            return False
+        return self.make_move_index(position_to_index(x, y, z))
+
+    def make_move_index(self, index):
+        """
+        Make a move at the specified cell.
+
+        Args:
+            index: Flat cell index (0-63)
+
+        Returns:
+            bool: True if move was successful, False otherwise
+        """
+        if not self.is_valid_index(index):
             return False
 
         # Place the piece
-        self.board[z][y][x] = self.current_player
-        self.move_history.append((x, y, z, self.current_player))
+        player = self.current_player
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        self.cells[index] = player
+        self.move_history.append(CELL_POSITIONS[index] + (player,))
         self.move_count += 1
+        self.zobrist_key ^= ZOBRIST_CELL_KEYS[player][index]
+
+        # A player's first piece in a line takes that line away from the opponent,
+        # and a fourth one completes it
+        counts = self.line_counts[player]
+        completed = None
+        for line_index in CELL_LINE_INDICES[index]:
+            if counts[line_index] == 0:
+                self.live_lines[opponent] -= 1
+            counts[line_index] += 1
+            if counts[line_index] == 4 and completed is None:
+                completed = line_index
 
         # Check for win
-        won, winning_line = self.check_win(x, y, z)
-        if won:
+        if completed is not None:
             self.game_status = STATE_WIN
             self.winner = self.current_player
-            self.winning_line = winning_line
+            self.winning_line = WINNING_LINES[completed]
+            self.win_reason = WIN_LINE
             return True
 
         # Check for draw (board full)
         if self.move_count >= BOARD_SIZE ** 3:
             self.game_status = STATE_DRAW
+            self.draw_reason = DRAW_BOARD_FULL
+            return True
+
+        # Check for dead draw (no line left that either player could complete)
+        if self.live_lines[PLAYER_X] == 0 and self.live_lines[PLAYER_O] == 0:
+            self.game_status = STATE_DRAW
+            self.draw_reason = DRAW_DEAD
             return True
 
         # Switch player
@@ -87,6 +147,56 @@ class Board:
 
         return True
 
+    def undo_move(self):
+        """
+        Take back the most recent move, restoring the previous game state.
+
+        Returns:
+            bool: True if a move was undone, False if there was nothing to undo
+        """
+        if not self.move_history:
+            return False
+
+        x, y, z, player = self.move_history.pop()
+        index = position_to_index(x, y, z)
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        self.cells[index] = EMPTY
+        self.move_count -= 1
+        self.zobrist_key ^= ZOBRIST_CELL_KEYS[player][index]
+
+        counts = self.line_counts[player]
+        for line_index in CELL_LINE_INDICES[index]:
+            counts[line_index] -= 1
+            if counts[line_index] == 0:
+                self.live_lines[opponent] += 1
+
+        # Any finished state was caused by the move being undone
+        self.current_player = player
+        self.game_status = STATE_PLAYING
+        self.winner = None
+        self.winning_line = None
+        self.draw_reason = None
+        self.win_reason = None
+
+        return True
+
+    def flag_fall(self, player):
+        """
+        End the game as a loss on time for player.
+
+        Args:
+            player: PLAYER_X or PLAYER_O, whose clock ran out
+
+        Returns:
+            bool: True if the game was still in progress
+        """
+        if self.game_status != STATE_PLAYING:
+            return False
+        self.game_status = STATE_WIN
+        self.winner = PLAYER_O if player == PLAYER_X else PLAYER_X
+        self.win_reason = WIN_ON_TIME
+        return True
+
     def check_win(self, x, y, z):
         """
         Check if the last move resulted in a win.
@@ -98,15 +208,16 @@ class Board:
         Returns:
             tuple: (is_win: bool, winning_line: tuple or None)
         """
-        player = self.board[z][y][x]
+        index = position_to_index(x, y, z)
+        player = self.cells[index]
+        if player == EMPTY:
+            return False, None
 
-        # Get only lines that pass through this position
-        relevant_lines = get_lines_containing_position(x, y, z)
-
-        for line in relevant_lines:
-            # Check if all positions in this line belong to the current player
-            if all(self.board[pos[2]][pos[1]][pos[0]] == player for pos in line):
-                return True, line
+        # Only lines through this cell can have been completed by it
+        counts = self.line_counts[player]
+        for line_index in CELL_LINE_INDICES[index]:
+            if counts[line_index] == 4:
+                return True, WINNING_LINES[line_index]
 
         return False, None
 
@@ -117,13 +228,173 @@ class Board:
         Returns:
             list: List of (x, y, z) tuples for empty positions
         """
-        empty_positions = []
-        for z in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                for x in range(BOARD_SIZE):
-                    if self.board[z][y][x] == EMPTY:
-                        empty_positions.append((x, y, z))
-        return empty_positions
+        return [CELL_POSITIONS[index] for index in self.get_empty_indices()]
+
+    def get_empty_indices(self):
+        """
+        Get all empty cells on the board.
+
+        Returns:
+            list: Flat cell indices of empty cells, ascending
+        """
+        return np.flatnonzero(self.cells == EMPTY).tolist()
+
+    def generate_moves(self):
+        """
+        Lazily generate legal moves for the current player, forcing moves first.
+
+        Moves are yielded in stages, and a stage is only computed once the
+        consumer asks for more moves than the earlier stages produced:
+          1. Immediate wins for the current player
+          2. Blocks of the opponent's open 3-in-a-lines
+          3. Fork moves (moves making two or more open 3s)
+          4. Remaining empty cells, most central first
+
+        Yields:
+            tuple: (x, y, z) position of each legal move, exactly once
+        """
+        if self.game_status != STATE_PLAYING:
+            return
+
+        player = self.current_player
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        stats = self.stats
+        yielded = set()
+
+        # Stage 1: immediate wins
+        wins = self.get_winning_moves(player)
+        if stats is not None:
+            stats.movegen_stages[0] += 1
+            if wins:
+                stats.forcing_nodes += 1
+        for position in wins:
+            yielded.add(position)
+            yield position
+
+        # Stage 2: forced blocks
+        blocks = self.get_winning_moves(opponent)
+        if stats is not None:
+            stats.movegen_stages[1] += 1
+            if blocks and not wins:
+                stats.forcing_nodes += 1
+        for position in blocks:
+            if position not in yielded:
+                yielded.add(position)
+                yield position
+
+        # Stage 3: fork moves
+        if stats is not None:
+            stats.movegen_stages[2] += 1
+        for position in self.get_fork_moves(player):
+            if position not in yielded:
+                yielded.add(position)
+                yield position
+
+        # Stage 4: everything else by line-count centrality
+        if stats is not None:
+            stats.movegen_stages[3] += 1
+        cells = self.cells
+        for index in CELLS_BY_CENTRALITY:
+            if cells[index] == EMPTY and CELL_POSITIONS[index] not in yielded:
+                yield CELL_POSITIONS[index]
+
+    def get_fork_moves(self, player):
+        """
+        Find empty positions that would give player two or more open 3-in-a-lines.
+
+        Args:
+            player: PLAYER_X or PLAYER_O
+
+        Returns:
+            list: List of (x, y, z) positions creating a fork (double threat)
+        """
+        return [CELL_POSITIONS[index] for index in self._fork_lines(player)]
+
+    def get_fork_blocks(self, player):
+        """
+        Find empty positions where player's move leaves the opponent no fork.
+
+        A fork is defused by taking its cell, or by occupying enough of the
+        lines that form it that fewer than two stay open. Forcing replies
+        (making an open 3 the opponent must block first) are not included.
+
+        Args:
+            player: PLAYER_X or PLAYER_O
+
+        Returns:
+            list: List of (x, y, z) positions, by ascending cell index; empty
+            if the opponent has no fork
+        """
+        forks = self._fork_lines(PLAYER_O if player == PLAYER_X else PLAYER_X)
+        if not forks:
+            return []
+
+        # Only a fork cell or an empty cell on one of a fork's lines can defuse it
+        cells = self.cells
+        candidates = set(forks)
+        for lines in forks.values():
+            for line_index in lines:
+                candidates.update(index for index in LINE_CELL_INDICES[line_index] if cells[index] == EMPTY)
+
+        blocks = []
+        for index in sorted(candidates):
+            crossing = CELL_LINE_INDICES[index]
+            if all(index == fork or len(lines.difference(crossing)) < 2 for fork, lines in forks.items()):
+                blocks.append(CELL_POSITIONS[index])
+        return blocks
+
+    def _fork_lines(self, player):
+        """
+        Fork cells of player, found by crossing player's open twos pairwise
+        through the line-intersection table.
+
+        Args:
+            player: PLAYER_X or PLAYER_O
+
+        Returns:
+            dict: Flat cell index of each fork -> set of the open-two line
+            indices through it
+        """
+        opponent_counts = self.line_counts[PLAYER_O if player == PLAYER_X else PLAYER_X]
+        open_twos = [line_index for line_index, count in enumerate(self.line_counts[player])
+                     if count == 2 and opponent_counts[line_index] == 0]
+        cells = self.cells
+        forks = {}
+        for i, first in enumerate(open_twos):
+            crossings = LINE_INTERSECTIONS[first]
+            for second in open_twos[i + 1:]:
+                index = crossings[second]
+                if index >= 0 and cells[index] == EMPTY:
+                    lines = forks.get(index)
+                    if lines is None:
+                        forks[index] = {first, second}
+                    else:
+                        lines.add(first)
+                        lines.add(second)
+        return forks
+
+    def _open_line_cells(self, player, count):
+        """
+        Empty cells of lines holding exactly count of player's pieces and none
+        of the opponent's, in line order, each reported once.
+
+        Args:
+            player: PLAYER_X or PLAYER_O
+            count: Pieces player must have in the line
+
+        Returns:
+            list: Flat cell indices
+        """
+        cells = self.cells
+        found = []
+        opponent_counts = self.line_counts[PLAYER_O if player == PLAYER_X else PLAYER_X]
+        for line, player_count, opponent_count in zip(LINE_CELL_INDICES, self.line_counts[player],
+                                                      opponent_counts):
+            if player_count == count and opponent_count == 0:
+                for index in line:
+                    if cells[index] == EMPTY and index not in found:
+                        found.append(index)
+        return found
 
     def get_position_value(self, x, y, z):
         """
@@ -135,7 +406,7 @@ class Board:
         Returns:
             int: EMPTY, PLAYER_X, or PLAYER_O
         """
-        return self.board[z][y][x]
+        return int(self.cells[position_to_index(x, y, z)])
 
     def count_in_line(self, line, player):
         """
@@ -150,7 +421,7 @@ class Board:
         """
         count = 0
         for x, y, z in line:
-            if self.board[z][y][x] == player:
+            if self.cells[position_to_index(x, y, z)] == player:
                 count += 1
         return count
 
@@ -167,7 +438,7 @@ class Board:
         """
         opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
         for x, y, z in line:
-            if self.board[z][y][x] == opponent:
+            if self.cells[position_to_index(x, y, z)] == opponent:
                 return True
         return False
 
@@ -181,19 +452,8 @@ class Board:
         Returns:
             list: List of (x, y, z) positions that would win the game
         """
-        winning_moves = []
-
-        for line in WINNING_LINES:
-            # Check if player has 3 in this line and it's not blocked
-            player_count = self.count_in_line(line, player)
-            if player_count == 3 and not self.is_line_blocked(line, player):
-                # Find the empty position in this line
-                for x, y, z in line:
-                    if self.board[z][y][x] == EMPTY:
-                        if (x, y, z) not in winning_moves:
-                            winning_moves.append((x, y, z))
-
-        return winning_moves
+        # Lines where player has 3 and the opponent none
+        return [CELL_POSITIONS[index] for index in self._open_line_cells(player, 3)]
 
     def get_threat_positions(self, player, threat_level=2):
         """
@@ -206,18 +466,107 @@ class Board:
         Returns:
             list: List of (x, y, z) positions in threatened lines
         """
-        threat_positions = []
+        return [CELL_POSITIONS[index] for index in self._open_line_cells(player, threat_level)]
+
+    @classmethod
+    def from_notation(cls, text):
+        """
+        Create a board from position or move notation (see src/notation.py).
+
+        Args:
+            text: 64 cell characters with an optional side to move, or cell
+                indices joined by commas
+
+        Returns:
+            Board: The position. From position notation the move history
+            lists X's and O's pieces alternately by ascending cell index,
+            except that in a won game the winner's last move is a cell on
+            every completed line, so undoing it gives a game in progress.
+
+        Raises:
+            ValueError: If the text is malformed, a move is illegal or the
+                position cannot arise in a game
+        """
+        board = cls()
+        if is_move_notation(text):
+            for ply, index in enumerate(parse_move_notation(text)):
+                if not board.make_move_index(index):
+                    raise ValueError(f"move {ply} (cell {index}) is illegal")
+        else:
+            cells, sides = notation_to_cells([text])
+            board._set_position(cells[0], int(sides[0]))
+        return board
+
+    def to_notation(self, moves=False):
+        """
+        One-line text form of the board (see src/notation.py).
+
+        Args:
+            moves: Write the move list instead of the cells and side to move
+
+        Returns:
+            str: Position notation, or move notation if moves is true
+        """
+        if moves:
+            return ",".join(str(position_to_index(x, y, z)) for x, y, z, _ in self.move_history)
+        return cells_to_notation(self.cells[np.newaxis], [self.current_player])[0]
 
-        for line in WINNING_LINES:
-            player_count = self.count_in_line(line, player)
-            if player_count == threat_level and not self.is_line_blocked(line, player):
-                # Add all empty positions in this line
-                for x, y, z in line:
-                    if self.board[z][y][x] == EMPTY:
-                        if (x, y, z) not in threat_positions:
-                            threat_positions.append((x, y, z))
+    def _set_position(self, cells, player):
+        """
+        Set up a position directly, recomputing every derived field.
 
-        return threat_positions
+        Args:
+            cells: (64,) array of EMPTY, PLAYER_X and PLAYER_O
+            player: Side to move (for a finished game, the player who moved last)
+
+        Raises:
+            ValueError: If the position cannot arise in a game
+        """
+        self.reset()
+        self.cells[:] = cells
+        line_cells = self.cells[LINE_INDEX_ARRAY]
+        for owner in (PLAYER_X, PLAYER_O):
+            self.line_counts[owner] = (line_cells == owner).sum(axis=1).tolist()
+        for owner, opponent in ((PLAYER_X, PLAYER_O), (PLAYER_O, PLAYER_X)):
+            self.live_lines[owner] = self.line_counts[opponent].count(0)
+
+        owned = {owner: np.flatnonzero(self.cells == owner).tolist() for owner in (PLAYER_X, PLAYER_O)}
+        self.move_count = len(owned[PLAYER_X]) + len(owned[PLAYER_O])
+        last_mover = PLAYER_X if self.move_count % 2 == 1 else PLAYER_O
+        winners = [owner for owner in (PLAYER_X, PLAYER_O) if 4 in self.line_counts[owner]]
+        completed = []
+        if winners:
+            if winners != [last_mover]:
+                raise ValueError("only the player who moved last can have a completed line")
+            completed = [line for line, count in enumerate(self.line_counts[last_mover]) if count == 4]
+            # The winning move lies on every completed line, and is played last
+            common = set.intersection(*(set(LINE_CELL_INDICES[line]) for line in completed))
+            if not common:
+                raise ValueError("completed lines that share no cell cannot arise in a game")
+            last_cell = min(common)
+            owned[last_mover].remove(last_cell)
+            owned[last_mover].append(last_cell)
+
+        for index in range(self.move_count):
+            owner = PLAYER_X if index % 2 == 0 else PLAYER_O
+            cell = owned[owner][index // 2]
+            self.move_history.append(CELL_POSITIONS[cell] + (owner,))
+            self.zobrist_key ^= ZOBRIST_CELL_KEYS[owner][cell]
+
+        if completed:
+            self.game_status = STATE_WIN
+            self.winner = last_mover
+            self.winning_line = WINNING_LINES[completed[0]]
+            self.win_reason = WIN_LINE
+        elif self.move_count >= NUM_CELLS:
+            self.game_status = STATE_DRAW
+            self.draw_reason = DRAW_BOARD_FULL
+        elif self.live_lines[PLAYER_X] == 0 and self.live_lines[PLAYER_O] == 0:
+            self.game_status = STATE_DRAW
+            self.draw_reason = DRAW_DEAD
+        elif player == last_mover:
+            raise ValueError("side to move does not match the piece counts")
+        self.current_player = player
 
     def get_state_dict(self):
         """
@@ -232,6 +581,7 @@ class Board:
             'game_status': self.game_status,
             'winner': self.winner,
             'winning_line': self.winning_line,
+            'draw_reason': self.draw_reason,
             'move_history': self.move_history.copy(),
             'move_count': self.move_count
         }
@@ -244,7 +594,7 @@ class Board:
             for y in range(BOARD_SIZE):
                 row = []
                 for x in range(BOARD_SIZE):
-                    val = self.board[z][y][x]
+                    val = self.cells[position_to_index(x, y, z)]
                     if val == EMPTY:
                         row.append('.')
                     elif val == PLAYER_X:
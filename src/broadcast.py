@@ -0,0 +1,353 @@
+"""
+LogiQube - Spectator Broadcast
+Fans live matches out to any number of spectators as per-move deltas.
+
+Every change to a match is encoded once into a compact JSON line carrying a
+sequence number, and the same bytes are written to every subscriber, so the
+cost per spectator is one buffered write per move. Late joiners receive the
+most recent snapshot plus the deltas since it; snapshots are re-encoded only
+every snapshot_interval moves, so joining costs at most that many deltas.
+
+Messages (one JSON object per line):
+    {"t":"snap","match":1,"seq":12,"cells":"X..O...","player":2,"status":"playing",...}
+    {"t":"move","seq":13,"cell":37,"player":2}
+    {"t":"move","seq":14,"cell":42,"player":1,"status":"win","winner":1,"line":[0,21,42,63]}
+    {"t":"undo","seq":15,"cell":42,"status":"playing"}
+
+Status fields (status, winner, line, reason) are only sent when they change.
+
+Usage:
+    python -m src.broadcast --port 8766 --replay game_records.jsonl
+    Spectators connect and send {"match": 0} (optionally "since": seq to resume).
+"""
+
+import asyncio
+import json
+from collections import deque
+
+from src.constants import EMPTY, PLAYER_X, PLAYER_O, STATE_PLAYING
+from src.winning_lines import NUM_CELLS, position_to_index
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+SNAPSHOT_INTERVAL = 16  # Moves between snapshot refreshes (bounds a late joiner's delta tail)
+MAX_SUBSCRIBER_BUFFER = 1 << 20  # Bytes queued for one spectator before it is dropped
+
+CELL_CHARS = {EMPTY: ".", PLAYER_X: "X", PLAYER_O: "O"}
+_CHAR_VALUES = {char: value for value, char in CELL_CHARS.items()}
+
+
+class BroadcastError(Exception):
+    """Raised when a spectator receives a delta that does not follow its state."""
+
+
+def _encode(message):
+    """Encode one message as a compact JSON line."""
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def _status(board):
+    """Status fields of a board, with the winning line as cell indices."""
+    line = board.winning_line
+    return {
+        "status": board.game_status,
+        "winner": board.winner,
+        "line": None if line is None else [position_to_index(*position) for position in line],
+        "reason": board.draw_reason,
+    }
+
+
+class MatchChannel:
+    """
+    Broadcast state of one match: its subscribers, latest snapshot and delta tail.
+    """
+
+    def __init__(self, match_id, snapshot_interval=SNAPSHOT_INTERVAL, max_buffer=MAX_SUBSCRIBER_BUFFER):
+        """
+        Initialize a channel for an empty board.
+
+        Args:
+            match_id: JSON-serializable match identifier
+            snapshot_interval: Moves between snapshot refreshes
+            max_buffer: Bytes a subscriber may have queued before it is dropped
+        """
+        self.match_id = match_id
+        self.snapshot_interval = snapshot_interval
+        self.max_buffer = max_buffer
+        self.subscribers = set()
+
+        self.seq = 0
+        self.moves = []  # Cell indices played, to know which cell an undo frees
+        self.player = PLAYER_X
+        self.status = {"status": STATE_PLAYING, "winner": None, "line": None, "reason": None}
+        self.tail = deque()  # (seq, encoded delta) since the snapshot
+        self.snapshot = self._encode_snapshot()
+        self.bytes_encoded = 0
+        self.bytes_sent = 0
+
+    def _encode_snapshot(self):
+        """Encode the full current state."""
+        cells = ["."] * NUM_CELLS
+        for ply, cell in enumerate(self.moves):
+            cells[cell] = CELL_CHARS[PLAYER_X if ply % 2 == 0 else PLAYER_O]
+        message = {"t": "snap", "match": self.match_id, "seq": self.seq, "cells": "".join(cells),
+                   "player": self.player}
+        message.update(self.status)
+        return _encode(message)
+
+    def publish(self, board):
+        """
+        Broadcast whatever changed on board since the last call.
+
+        The board's move history is compared with the moves broadcast so
+        far: one move appended or taken back at the end becomes a delta;
+        anything else (a reset, even one followed by a move, or several
+        moves at once) is sent to every subscriber as a fresh snapshot.
+
+        Args:
+            board: Board of the match, after the change
+        """
+        cells = [position_to_index(x, y, z) for x, y, z, _ in board.move_history]
+        if len(cells) == len(self.moves) + 1 and cells[:-1] == self.moves:
+            cell = cells[-1]
+            self.moves.append(cell)
+            message = {"t": "move", "seq": self.seq + 1, "cell": cell, "player": board.move_history[-1][3]}
+        elif len(cells) == len(self.moves) - 1 and cells == self.moves[:-1]:
+            cell = self.moves.pop()
+            message = {"t": "undo", "seq": self.seq + 1, "cell": cell}
+        else:
+            self._resync(board)
+            return
+
+        self.seq += 1
+        self.player = board.current_player
+        status = _status(board)
+        if status != self.status:
+            message.update(status)
+            self.status = status
+
+        data = _encode(message)
+        self.bytes_encoded += len(data)
+        self.tail.append((self.seq, data))
+        if len(self.tail) >= self.snapshot_interval:
+            self.snapshot = self._encode_snapshot()
+            self.tail.clear()
+        self._send(data)
+
+    def _resync(self, board):
+        """Replace the channel state from board and push a snapshot to everyone."""
+        self.seq += 1
+        self.moves = [position_to_index(x, y, z) for x, y, z, _ in board.move_history]
+        self.player = board.current_player
+        self.status = _status(board)
+        self.tail.clear()
+        self.snapshot = self._encode_snapshot()
+        self._send(self.snapshot)
+
+    def _send(self, data):
+        """Write the same bytes to every subscriber, dropping any that fall too far behind."""
+        for writer in list(self.subscribers):
+            transport = getattr(writer, "transport", None)
+            if transport is not None and transport.get_write_buffer_size() > self.max_buffer:
+                self.unsubscribe(writer)
+                writer.close()
+                continue
+            writer.write(data)
+            self.bytes_sent += len(data)
+
+    def subscribe(self, writer, since=None):
+        """
+        Add a subscriber and bring it up to date.
+
+        Args:
+            writer: Object with write(bytes), e.g. an asyncio StreamWriter
+            since: Last sequence number the subscriber already has; it only
+                receives later deltas when those are still in the tail,
+                otherwise it gets the snapshot and tail
+        """
+        first_seq = self.tail[0][0] if self.tail else self.seq + 1
+        if since is None or not first_seq - 1 <= since <= self.seq:
+            catch_up = [self.snapshot]
+            catch_up.extend(data for _, data in self.tail)
+        else:
+            catch_up = [data for seq, data in self.tail if seq > since]
+        data = b"".join(catch_up)
+        if data:
+            writer.write(data)
+            self.bytes_sent += len(data)
+        self.subscribers.add(writer)
+
+    def unsubscribe(self, writer):
+        """Remove a subscriber (no-op if it is not subscribed)."""
+        self.subscribers.discard(writer)
+
+
+class Spectator:
+    """
+    Client-side match state rebuilt from snapshot and delta messages.
+    """
+
+    def __init__(self):
+        self.seq = None  # None until the first snapshot
+        self.match_id = None
+        self.cells = [EMPTY] * NUM_CELLS
+        self.player = PLAYER_X
+        self.status = STATE_PLAYING
+        self.winner = None
+        self.line = None
+        self.reason = None
+
+    def apply(self, message):
+        """
+        Apply one decoded message.
+
+        Args:
+            message: Dict decoded from a broadcast line
+
+        Raises:
+            BroadcastError: If a delta does not directly follow the current state
+        """
+        kind = message["t"]
+        if kind == "snap":
+            self.match_id = message["match"]
+            self.cells = [_CHAR_VALUES[char] for char in message["cells"]]
+        elif self.seq is None or message["seq"] != self.seq + 1:
+            raise BroadcastError(f"delta {message['seq']} does not follow {self.seq}")
+        elif kind == "move":
+            self.cells[message["cell"]] = message["player"]
+            self.player = PLAYER_O if message["player"] == PLAYER_X else PLAYER_X
+        elif kind == "undo":
+            self.player = self.cells[message["cell"]]
+            self.cells[message["cell"]] = EMPTY
+        else:
+            raise BroadcastError(f"unknown message type {kind!r}")
+
+        self.seq = message["seq"]
+        if kind == "snap":
+            self.player = message["player"]
+        if "status" in message:
+            self.status = message["status"]
+            self.winner = message["winner"]
+            self.line = message["line"]
+            self.reason = message["reason"]
+
+    def apply_line(self, line):
+        """Decode and apply one broadcast line."""
+        self.apply(json.loads(line))
+
+
+class BroadcastServer:
+    """
+    TCP server streaming MatchChannel updates to spectators.
+
+    Publishers run on the server's event loop and call
+    channel(match_id).publish(board) after every change.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.host = host
+        self.port = port
+        self.snapshot_interval = snapshot_interval
+        self.channels = {}
+        self.server = None
+
+    def channel(self, match_id):
+        """
+        Get (creating if needed) the channel of a match.
+
+        Args:
+            match_id: Match identifier
+
+        Returns:
+            MatchChannel
+        """
+        channel = self.channels.get(match_id)
+        if channel is None:
+            channel = self.channels[match_id] = MatchChannel(match_id, self.snapshot_interval)
+        return channel
+
+    def close_channel(self, match_id):
+        """Forget a finished match; its spectators keep their connections until they leave."""
+        self.channels.pop(match_id, None)
+
+    async def start(self):
+        """
+        Start listening.
+
+        Returns:
+            int: The bound port (useful when constructed with port 0)
+        """
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def close(self):
+        """Stop accepting connections."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle_client(self, reader, writer):
+        """Subscribe a spectator to the match named in its first line."""
+        channel = None
+        try:
+            try:
+                request = json.loads(await reader.readline())
+                channel = self.channels[request["match"]]
+            except (ValueError, TypeError, KeyError):
+                writer.write(_encode({"t": "error", "message": "expected {\"match\": <known match id>}"}))
+                await writer.drain()
+                return
+            channel.subscribe(writer, request.get("since"))
+            await reader.read()  # Spectators send nothing more; wait for them to leave
+        except ConnectionError:
+            pass
+        finally:
+            if channel is not None:
+                channel.unsubscribe(writer)
+            writer.close()
+
+
+async def _replay(server, games, delay):
+    """Publish stored games move by move, one match per game."""
+    from src.board import Board
+
+    for match_id, record in enumerate(games):
+        board = Board()
+        channel = server.channel(match_id)
+        for move in record["moves"]:
+            board.make_move(*move)
+            channel.publish(board)
+            await asyncio.sleep(delay)
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+
+    from src.game_records import iter_games
+
+    parser = argparse.ArgumentParser(description="LogiQube spectator broadcast server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--replay", help="game records file to broadcast as demo matches")
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds between replayed moves")
+    args = parser.parse_args()
+
+    async def serve():
+        server = BroadcastServer(args.host, args.port)
+        port = await server.start()
+        print(f"Broadcasting on {args.host}:{port}")
+        if args.replay:
+            await _replay(server, list(iter_games(args.replay)), args.delay)
+        async with server.server:
+            await server.server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
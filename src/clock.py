@@ -0,0 +1,235 @@
+"""
+LogiQube - Game Clocks
+Chess-style per-player clocks with Fischer increment, and the time manager
+that decides how long the engine may think on each move.
+
+The time manager gives every move a soft limit (no new search iteration is
+started after it) and a hard limit (the search is abandoned). The hard limit
+keeps a reserve for time spent outside the search and never exceeds a
+fraction of the remaining time, so even when the machine is too loaded to
+finish an iteration, the engine answers with the previous iteration's move
+(or, with almost no time left, the move generator's first move) before its
+flag falls. The reserve is never below MOVE_OVERHEAD and grows with the
+overshoot past the hard limit measured on earlier moves, so an engine on a
+busy machine plays faster rather than losing on time.
+"""
+
+import time
+
+from src.constants import CLOCK_LOW_TIME, PLAYER_X, PLAYER_O
+
+MOVE_OVERHEAD = 0.1  # Least seconds kept in reserve per move for scheduling delays and the move itself
+OVERSHOOT_SAFETY = 2.0  # Reserve as a multiple of the overshoot measured on earlier moves...
+OVERSHOOT_DECAY = 0.9  # ...which is forgotten by this factor per move once the machine calms down
+MAX_TIME_SHARE = 0.25  # Largest fraction of the remaining time one move may use
+EXPECTED_GAME_PLIES = 40  # Typical game length the time is budgeted over
+MIN_MOVES_TO_GO = 6  # Never budget for fewer remaining moves than this
+INCREMENT_SHARE = 0.8  # Part of the increment spent on the current move
+HARD_LIMIT_FACTOR = 3.0  # Hard limit as a multiple of the soft limit
+MIN_SEARCH_TIME = 0.01  # Below this hard limit the engine moves without searching
+
+# Time multipliers by how forcing the position is
+VOLATILITY_WIN_NOW = 0.2  # Side to move can complete a line: the search proves it at once
+VOLATILITY_FORCED = 0.5  # Opponent threatens a single line: one sensible block
+VOLATILITY_FORKS = 1.6  # Either side can create a double threat: critical position
+VOLATILITY_QUIET = 1.0
+
+
+def parse_time_control(text):
+    """
+    Parse a time control such as "5+3" (minutes + increment seconds).
+
+    Args:
+        text: "MINUTES+SECONDS", or "MINUTES" for no increment
+
+    Returns:
+        tuple: (initial seconds, increment seconds)
+
+    Raises:
+        ValueError: If the text is malformed or not positive
+    """
+    minutes, _, increment = text.partition("+")
+    initial = float(minutes) * 60
+    increment = float(increment) if increment else 0.0
+    if initial <= 0 or increment < 0:
+        raise ValueError(f"invalid time control {text!r}")
+    return initial, increment
+
+
+def format_time(seconds):
+    """Format remaining time as m:ss, or s.t seconds when it runs low."""
+    seconds = max(seconds, 0.0)
+    if seconds < CLOCK_LOW_TIME:
+        return f"{seconds:.1f}"
+    whole = int(seconds)
+    return f"{whole // 60}:{whole % 60:02d}"
+
+
+class GameClock:
+    """
+    Two-player clock with Fischer increment.
+    """
+
+    def __init__(self, initial, increment=0.0, time_source=time.monotonic):
+        """
+        Initialize a stopped clock.
+
+        Args:
+            initial: Seconds each player starts with
+            increment: Seconds added after each of a player's moves
+            time_source: Callable returning the current time in seconds
+        """
+        self.initial = initial
+        self.increment = increment
+        self.time_source = time_source
+        self.reset()
+
+    def reset(self):
+        """Give both players their initial time and stop the clock."""
+        self.remaining = {PLAYER_X: float(self.initial), PLAYER_O: float(self.initial)}
+        self.running = None  # Player whose time is running
+        self.started_at = None
+
+    def start(self, player):
+        """
+        Run player's clock (stopping the other one).
+
+        Args:
+            player: PLAYER_X or PLAYER_O
+        """
+        self.stop()
+        self.running = player
+        self.started_at = self.time_source()
+
+    def stop(self):
+        """Stop the running clock, charging its player the time used."""
+        if self.running is not None:
+            self.remaining[self.running] -= self.time_source() - self.started_at
+            self.running = None
+            self.started_at = None
+
+    def press(self, player):
+        """
+        Player finished a move: stop their clock, add the increment and
+        start the opponent's.
+
+        Args:
+            player: Player who moved
+
+        Returns:
+            bool: False if player's time had already run out (no increment
+            is added then, and the clock is left stopped)
+        """
+        self.stop()
+        if self.remaining[player] <= 0:
+            return False
+        self.remaining[player] += self.increment
+        self.start(PLAYER_O if player == PLAYER_X else PLAYER_X)
+        return True
+
+    def time_left(self, player):
+        """
+        Seconds player has left, counting the running move.
+
+        Args:
+            player: PLAYER_X or PLAYER_O
+
+        Returns:
+            float: Remaining seconds (negative once the flag has fallen)
+        """
+        remaining = self.remaining[player]
+        if self.running == player:
+            remaining -= self.time_source() - self.started_at
+        return remaining
+
+    def flagged(self):
+        """
+        The player whose running clock has run out.
+
+        Returns:
+            int: PLAYER_X or PLAYER_O, or None
+        """
+        if self.running is not None and self.time_left(self.running) <= 0:
+            return self.running
+        return None
+
+
+class TimeManager:
+    """
+    Allocates thinking time per move from the clock, the move number and
+    how forcing the position is.
+    """
+
+    def __init__(self, move_overhead=MOVE_OVERHEAD, max_share=MAX_TIME_SHARE):
+        """
+        Initialize the time manager.
+
+        Args:
+            move_overhead: Least seconds reserved per move for delays outside
+                the search
+            max_share: Largest fraction of the remaining time one move may use
+        """
+        self.move_overhead = move_overhead
+        self.max_share = max_share
+        self.overshoot = 0.0  # Decaying maximum of measured overshoots, in seconds
+
+    def reserve(self):
+        """
+        Seconds kept back from the clock on every move.
+
+        Returns:
+            float: The move overhead, or more after moves overshot their
+            hard limit
+        """
+        return max(self.move_overhead, self.overshoot * OVERSHOOT_SAFETY)
+
+    def record(self, hard_limit, elapsed):
+        """
+        Measure how far a move ran past its hard limit.
+
+        Args:
+            hard_limit: Hard limit allocated for the move
+            elapsed: Seconds the move actually took
+        """
+        self.overshoot = max(elapsed - hard_limit, self.overshoot * OVERSHOOT_DECAY)
+
+    def volatility(self, board):
+        """
+        Time multiplier for the position.
+
+        Args:
+            board: Board instance
+
+        Returns:
+            float: One of the VOLATILITY_* factors
+        """
+        player = board.current_player
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        if board.get_winning_moves(player):
+            return VOLATILITY_WIN_NOW
+        if len(board.get_winning_moves(opponent)) == 1:
+            return VOLATILITY_FORCED
+        if board.get_fork_moves(player) or board.get_fork_moves(opponent):
+            return VOLATILITY_FORKS
+        return VOLATILITY_QUIET
+
+    def allocate(self, board, time_left, increment=0.0):
+        """
+        Time budget for the side to move.
+
+        Args:
+            board: Board instance
+            time_left: Seconds on the mover's clock
+            increment: Seconds the mover gains after the move
+
+        Returns:
+            tuple: (soft, hard) limits in seconds; both 0 when only the
+            reserve is left
+        """
+        usable = time_left - self.reserve()
+        if usable <= 0:
+            return 0.0, 0.0
+        moves_to_go = max(MIN_MOVES_TO_GO, (EXPECTED_GAME_PLIES - board.move_count + 1) // 2)
+        soft = (usable / moves_to_go + increment * INCREMENT_SHARE) * self.volatility(board)
+        hard = min(soft * HARD_LIMIT_FACTOR, usable * self.max_share)
+        return min(soft, hard), hard
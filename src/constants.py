@@ -15,6 +15,14 @@ STATE_PLAYING = "playing"
 STATE_WIN = "win"
 STATE_DRAW = "draw"
 
+# Why a game was drawn (Board.draw_reason)
+DRAW_BOARD_FULL = "board_full"  # All 64 cells filled
+DRAW_DEAD = "dead_draw"  # Every line holds both X and O, so nobody can win
+
+# How a game was won (Board.win_reason)
+WIN_LINE = "line"  # Four in a row
+WIN_ON_TIME = "time"  # The opponent's clock ran out
+
 # UI Constants
 WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 800
@@ -34,6 +42,39 @@ COLOR_WIN_LINE = (255, 215, 0)  # Gold
 COLOR_TEXT = (255, 255, 255)
 COLOR_BUTTON = (70, 70, 90)
 COLOR_BUTTON_HOVER = (90, 90, 110)
+COLOR_HEAT_LOW = (150, 40, 40)  # Heatmap cell the side to move rarely wins from
+COLOR_HEAT_HIGH = (40, 160, 70)  # Heatmap cell the side to move usually wins from
+
+# Game clocks
+COLOR_CLOCK_LOW = (255, 80, 80)  # Clock under CLOCK_LOW_TIME seconds
+CLOCK_LOW_TIME = 10.0  # Seconds left below which clocks show tenths
+CLOCK_OFFSET = 380  # Horizontal distance of each clock from the status text
+
+# Board views
+VIEW_PLANES = "planes"  # Four layers side by side
+VIEW_CUBE = "cube"  # Rotatable isometric cube (src/cube_view.py)
+
+# Isometric cube view
+CUBE_CELL_SCALE = 55  # Pixels per cell width
+CUBE_LAYER_GAP = 150  # Pixels between layers before tilting
+CUBE_CELL_FILL = 0.9  # Fraction of the cell width a cell polygon covers
+CUBE_CELL_ALPHA = 200  # Cell opacity, so lower layers show through
+CUBE_YAW = 30  # Initial rotation, degrees
+CUBE_PITCH = 30  # Initial viewing angle above the horizon, degrees
+CUBE_PITCH_MIN = 10
+CUBE_PITCH_MAX = 80
+CUBE_YAW_STEP = 15  # Degrees per arrow key press
+CUBE_PITCH_STEP = 5
+
+# Threat overlay kinds and their (ring width, alpha) styles
+THREAT_WIN = "win"  # Completes a line
+THREAT_FORK = "fork"  # Creates two open 3s at once
+THREAT_OPEN_TWO = "open_two"  # Lies on a line with 2 of the player's pieces and none of the opponent's
+THREAT_STYLES = {
+    THREAT_WIN: (3, 255),
+    THREAT_FORK: (2, 220),
+    THREAT_OPEN_TWO: (1, 120),
+}
 
 # Game modes
 MODE_HUMAN_VS_HUMAN = "human_vs_human"
@@ -43,3 +84,6 @@ MODE_HUMAN_VS_AI = "human_vs_ai"
 AI_EASY = "easy"
 AI_MEDIUM = "medium"
 AI_HARD = "hard"
+
+# Finished games are appended here (one JSON object per line) for later analysis
+GAME_RECORDS_FILE = "game_records.jsonl"
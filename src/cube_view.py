@@ -0,0 +1,216 @@
+"""
+LogiQube - Isometric Cube View
+Alternate board view drawing the four layers stacked as a rotatable 3D
+cube, so diagonals through all layers read as straight lines.
+
+Everything that depends only on the camera is built once per rotation:
+the projected polygon of every cell, a pre-rendered surface per cell and
+cell value (empty, X, O), the back-to-front drawing order and an ID buffer
+holding, for every screen pixel, the index of the frontmost cell drawn
+there. A frame is then one blits() call over cached surfaces, and picking
+the cell under the mouse is a single array lookup.
+"""
+
+import math
+
+import numpy as np
+import pygame
+
+from src.constants import *
+from src.winning_lines import NUM_CELLS, CELL_POSITIONS, position_to_index
+
+_CORNERS = ((-0.5, -0.5), (0.5, -0.5), (0.5, 0.5), (-0.5, 0.5))
+
+
+class CubeView:
+    """
+    Rotatable isometric projection of the board with cached rendering and picking.
+    """
+
+    def __init__(self, size=(WINDOW_WIDTH, WINDOW_HEIGHT), center=None, scale=CUBE_CELL_SCALE,
+                 layer_gap=CUBE_LAYER_GAP, yaw=CUBE_YAW, pitch=CUBE_PITCH):
+        """
+        Initialize the view (projection happens on first use).
+
+        Args:
+            size: (width, height) of the surface drawn on
+            center: Screen position of the cube's center (default: middle of size)
+            scale: Pixels per cell width
+            layer_gap: Pixels between layers before tilting
+            yaw: Rotation around the vertical axis, in degrees
+            pitch: Viewing angle above the horizon, in degrees
+        """
+        self.size = size
+        self.center = center or (size[0] // 2, size[1] // 2)
+        self.scale = scale
+        self.layer_gap = layer_gap
+        self.yaw = yaw
+        self.pitch = pitch
+        self.font = pygame.font.Font(None, 24)
+        self.camera = None  # (yaw, pitch) the caches below were built for
+
+        self.polygons = []  # Per cell: four screen-space corner points
+        self.centers = []  # Per cell: screen-space center
+        self.order = []  # Cell indices, farthest first
+        self.cell_surfaces = {}  # (cell, value) -> (surface, topleft)
+        self.labels = []  # (surface, position) of the layer labels
+        self.id_buffer = None  # (width, height) int8 array of cell index per pixel, -1 for none
+
+    def rotate(self, yaw_delta=0, pitch_delta=0):
+        """
+        Turn the camera (the projection is rebuilt on the next draw or pick).
+
+        Args:
+            yaw_delta: Degrees to turn around the vertical axis
+            pitch_delta: Degrees to tilt, kept between CUBE_PITCH_MIN and CUBE_PITCH_MAX
+        """
+        self.yaw = (self.yaw + yaw_delta) % 360
+        self.pitch = min(max(self.pitch + pitch_delta, CUBE_PITCH_MIN), CUBE_PITCH_MAX)
+
+    def _project_point(self, x, y, z):
+        """
+        Project a board-space point (cell units, cube centered at the origin).
+
+        Returns:
+            tuple: (screen_x, screen_y, depth), larger depth nearer the viewer
+        """
+        yaw = math.radians(self.yaw)
+        pitch = math.radians(self.pitch)
+        u = x * math.cos(yaw) - y * math.sin(yaw)
+        v = x * math.sin(yaw) + y * math.cos(yaw)
+        height = z * self.layer_gap / self.scale
+        screen_x = self.center[0] + u * self.scale
+        screen_y = self.center[1] + (v * math.sin(pitch) - height * math.cos(pitch)) * self.scale
+        depth = v * math.cos(pitch) + height * math.sin(pitch)
+        return screen_x, screen_y, depth
+
+    def _ensure_projection(self):
+        """Rebuild every camera-dependent cache if the camera moved."""
+        camera = (self.yaw, self.pitch)
+        if camera == self.camera:
+            return
+        self.camera = camera
+
+        depths = []
+        self.polygons = []
+        self.centers = []
+        for x, y, z in CELL_POSITIONS:
+            cx, cy, cz = x - 1.5, y - 1.5, z - 1.5
+            corners = [self._project_point(cx + dx * CUBE_CELL_FILL, cy + dy * CUBE_CELL_FILL, cz)
+                       for dx, dy in _CORNERS]
+            self.polygons.append([(px, py) for px, py, _ in corners])
+            px, py, depth = self._project_point(cx, cy, cz)
+            self.centers.append((px, py))
+            depths.append(depth)
+        self.order = sorted(range(NUM_CELLS), key=depths.__getitem__)
+
+        self.cell_surfaces = {}
+        for index in range(NUM_CELLS):
+            for value in (EMPTY, PLAYER_X, PLAYER_O):
+                self.cell_surfaces[index, value] = self._render_cell(index, value)
+
+        self.labels = []
+        for z in range(BOARD_SIZE):
+            # Beside the layer's leftmost outer corner
+            corner = min(self._project_point(dx * BOARD_SIZE, dy * BOARD_SIZE, z - 1.5)[:2]
+                         for dx, dy in _CORNERS)
+            label = self.font.render(f"Layer {z}", True, COLOR_TEXT)
+            self.labels.append((label, label.get_rect(midright=(corner[0] - 12, corner[1]))))
+
+        # ID buffer: cells painted back to front, so nearer cells overwrite farther ones
+        id_surface = pygame.Surface(self.size, depth=32)
+        id_surface.fill(0)
+        for index in self.order:
+            pygame.draw.polygon(id_surface, index + 1, self.polygons[index])
+        self.id_buffer = (pygame.surfarray.array2d(id_surface) - 1).astype(np.int8)
+
+    def _render_cell(self, index, value):
+        """Pre-render one cell polygon with its piece, flattened onto the layer."""
+        points = self.polygons[index]
+        left = math.floor(min(px for px, _ in points)) - 2
+        top = math.floor(min(py for _, py in points)) - 2
+        width = math.ceil(max(px for px, _ in points)) - left + 3
+        height = math.ceil(max(py for _, py in points)) - top + 3
+        local = [(px - left, py - top) for px, py in points]
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+
+        z = CELL_POSITIONS[index][2]
+        shade = tuple(min(255, channel + 8 * z) for channel in COLOR_PLANE_BG)
+        pygame.draw.polygon(surface, shade + (CUBE_CELL_ALPHA,), local)
+        pygame.draw.polygon(surface, COLOR_GRID, local, 1)
+
+        # Pieces are drawn in the cell's own (tilted) plane
+        center_x = sum(px for px, _ in local) / 4
+        center_y = sum(py for _, py in local) / 4
+
+        def inset(point, amount):
+            return (center_x + (point[0] - center_x) * amount, center_y + (point[1] - center_y) * amount)
+
+        if value == PLAYER_X:
+            pygame.draw.line(surface, COLOR_X, inset(local[0], 0.6), inset(local[2], 0.6), 3)
+            pygame.draw.line(surface, COLOR_X, inset(local[1], 0.6), inset(local[3], 0.6), 3)
+        elif value == PLAYER_O:
+            ring = [inset(self._ring_point(local, angle), 0.6) for angle in range(0, 360, 20)]
+            pygame.draw.polygon(surface, COLOR_O, ring, 3)
+        return surface, (left, top)
+
+    @staticmethod
+    def _ring_point(corners, angle):
+        """Point of the ellipse inscribed in a projected square, by angle in degrees."""
+        # Bilinear map of the unit circle onto the quadrilateral
+        s = 0.5 + 0.5 * math.cos(math.radians(angle))
+        t = 0.5 + 0.5 * math.sin(math.radians(angle))
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = corners
+        x = (1 - t) * ((1 - s) * x0 + s * x1) + t * ((1 - s) * x3 + s * x2)
+        y = (1 - t) * ((1 - s) * y0 + s * y1) + t * ((1 - s) * y3 + s * y2)
+        return x, y
+
+    def pick(self, mouse_pos):
+        """
+        Find the cell under a screen position.
+
+        Args:
+            mouse_pos: (x, y) screen position
+
+        Returns:
+            int: Cell index (0-63), or None if no cell is drawn there
+        """
+        self._ensure_projection()
+        x, y = mouse_pos
+        if not (0 <= x < self.size[0] and 0 <= y < self.size[1]):
+            return None
+        index = int(self.id_buffer[x, y])
+        return None if index < 0 else index
+
+    def draw(self, surface, board, hover_index=None):
+        """
+        Draw the cube.
+
+        Args:
+            surface: Target surface
+            board: Board instance
+            hover_index: Empty cell to highlight, or None
+        """
+        self._ensure_projection()
+        cells = board.cells.tolist()
+        surface.blits([self.cell_surfaces[index, cells[index]] for index in self.order], doreturn=False)
+        surface.blits(self.labels, doreturn=False)
+        if hover_index is not None and cells[hover_index] == EMPTY:
+            pygame.draw.polygon(surface, COLOR_HOVER, self.polygons[hover_index], 3)
+
+    def draw_winning_line(self, surface, board):
+        """
+        Draw the winning line straight through its four cells.
+
+        Args:
+            surface: Target surface
+            board: Board instance
+        """
+        if board.game_status != STATE_WIN or board.winning_line is None:
+            return
+        self._ensure_projection()
+        indices = [position_to_index(*position) for position in board.winning_line]
+        for index in indices:
+            pygame.draw.polygon(surface, COLOR_WIN_LINE, self.polygons[index], 3)
+        # Cells of a line are listed in order along it
+        pygame.draw.line(surface, COLOR_WIN_LINE, self.centers[indices[0]], self.centers[indices[-1]], 4)
@@ -0,0 +1,357 @@
+"""
+LogiQube - Self-Play Datasets
+Generates self-play games and streams their positions into fixed-size
+memory-mapped .npy shards for training policy/value models.
+
+Each shard is one .npy file per field:
+    cells    (shard_size, 64) int8     board, index = x + 4y + 16z
+    side     (shard_size,)    int8     side to move (PLAYER_X or PLAYER_O)
+    outcome  (shard_size,)    int8     final result for the side to move (+1, 0, -1)
+    policy   (shard_size, 64) float32  search policy over cells (optional)
+
+manifest.json lists the shards and how many rows of each are filled; it is
+rewritten as each shard completes, so an interrupted run leaves a readable
+dataset. Positions can be augmented with random cube symmetries (see
+src/symmetry.py), applied to cells and policy alike.
+
+Usage:
+    python -m src.dataset data/ --games 10000 --workers 8 --policy --augment 4
+"""
+
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.board import Board
+from src.constants import STATE_PLAYING, STATE_WIN
+from src.search import Searcher
+from src.symmetry import SYMMETRIES
+from src.winning_lines import NUM_CELLS, index_to_position, position_to_index
+
+MANIFEST_FILE = "manifest.json"
+DEFAULT_SHARD_SIZE = 1 << 16  # Positions per shard
+DEFAULT_NODES = 2000  # Search node budget per self-play move
+DEFAULT_MAX_DEPTH = 4
+POLICY_MARGIN = 200  # Root moves within this score of the best get policy mass
+POLICY_TEMPERATURE = 50.0  # Score units per e-fold of policy weight
+EXPLORATION_PLIES = 8  # Opening moves sampled from the policy instead of played greedily
+
+FIELDS = {
+    "cells": (np.int8, (NUM_CELLS,)),
+    "side": (np.int8, ()),
+    "outcome": (np.int8, ()),
+    "policy": (np.float32, (NUM_CELLS,)),
+}
+
+
+def search_policy(result):
+    """
+    Turn a search result into a probability distribution over cells.
+
+    Args:
+        result: SearchResult with candidates
+
+    Returns:
+        np.ndarray: (64,) float32, softmax of the candidates' scores
+    """
+    policy = np.zeros(NUM_CELLS, dtype=np.float32)
+    scores = np.array([score for _, score in result.candidates], dtype=np.float64)
+    weights = np.exp((scores - scores.max()) / POLICY_TEMPERATURE)
+    for (move, _), weight in zip(result.candidates, weights / weights.sum()):
+        policy[position_to_index(*move)] = weight
+    return policy
+
+
+def play_game(args):
+    """
+    Worker: play one self-play game.
+
+    Args:
+        args: (seed, nodes, max_depth)
+
+    Returns:
+        tuple: (cells (n, 64) int8, side (n,) int8, outcome (n,) int8,
+        policy (n, 64) float32) for the n positions before each move
+    """
+    seed, nodes, max_depth = args
+    rng = random.Random(seed)
+    searcher = Searcher()
+    board = Board()
+    cells, sides, policies = [], [], []
+
+    while board.game_status == STATE_PLAYING:
+        searcher.tt.clear()
+        result = searcher.search(board, max_depth, node_limit=nodes, root_margin=POLICY_MARGIN)
+        if result is None:
+            move = next(board.generate_moves())
+            policy = np.zeros(NUM_CELLS, dtype=np.float32)
+            policy[position_to_index(*move)] = 1.0
+        else:
+            policy = search_policy(result)
+            if board.move_count < EXPLORATION_PLIES:
+                move = index_to_position(rng.choices(range(NUM_CELLS), weights=policy.tolist())[0])
+            else:
+                move = result.move
+
+        cells.append(board.cells.copy())
+        sides.append(board.current_player)
+        policies.append(policy)
+        board.make_move(*move)
+
+    sides = np.array(sides, dtype=np.int8)
+    if board.game_status == STATE_WIN:
+        outcome = np.where(sides == board.winner, 1, -1).astype(np.int8)
+    else:
+        outcome = np.zeros(len(sides), dtype=np.int8)
+    return np.array(cells), sides, outcome, np.array(policies)
+
+
+class ShardWriter:
+    """
+    Streams positions into fixed-size memory-mapped shards.
+    """
+
+    def __init__(self, directory, shard_size=DEFAULT_SHARD_SIZE, with_policy=True):
+        """
+        Start a new dataset (existing shards in directory are overwritten).
+
+        Args:
+            directory: Output directory (created if missing)
+            shard_size: Positions per shard
+            with_policy: Store the policy field
+        """
+        self.directory = directory
+        self.shard_size = shard_size
+        self.fields = [name for name in FIELDS if with_policy or name != "policy"]
+        self.shards = []  # Completed shards: {"name", "count"}
+        self.arrays = None  # Memmaps of the shard being filled
+        self.count = 0  # Rows filled in the current shard
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_shard(self):
+        """Create the memmaps for the next shard."""
+        name = f"shard_{len(self.shards):05d}"
+        self.arrays = {}
+        for field in self.fields:
+            dtype, shape = FIELDS[field]
+            path = os.path.join(self.directory, f"{name}.{field}.npy")
+            self.arrays[field] = np.lib.format.open_memmap(path, mode="w+", dtype=dtype,
+                                                           shape=(self.shard_size,) + shape)
+        self.name = name
+        self.count = 0
+
+    def _close_shard(self):
+        """Flush the current shard and record it in the manifest."""
+        for array in self.arrays.values():
+            array.flush()
+        self.shards.append({"name": self.name, "count": self.count})
+        self.arrays = None
+        self.write_manifest()
+
+    def write(self, **columns):
+        """
+        Append rows, spilling into new shards as they fill.
+
+        Args:
+            **columns: One array per field, all with the same number of rows
+        """
+        rows = len(columns["cells"])
+        start = 0
+        while start < rows:
+            if self.arrays is None:
+                self._open_shard()
+            take = min(rows - start, self.shard_size - self.count)
+            for field in self.fields:
+                self.arrays[field][self.count:self.count + take] = columns[field][start:start + take]
+            self.count += take
+            start += take
+            if self.count == self.shard_size:
+                self._close_shard()
+
+    def write_manifest(self):
+        """Atomically rewrite the manifest with the completed shards."""
+        manifest = {
+            "version": 1,
+            "shard_size": self.shard_size,
+            "fields": {field: {"dtype": np.dtype(FIELDS[field][0]).name, "shape": list(FIELDS[field][1])}
+                       for field in self.fields},
+            "shards": self.shards,
+            "positions": sum(shard["count"] for shard in self.shards),
+        }
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        """Finish the last (possibly partly filled) shard."""
+        if self.arrays is not None and self.count:
+            self._close_shard()
+        self.write_manifest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def augment(cells, policy, count, rng):
+    """
+    Apply random cube symmetries to a game's positions.
+
+    Args:
+        cells: (n, 64) positions
+        policy: (n, 64) policies, or None
+        count: Symmetries per position, the identity always first (1-48)
+        rng: np.random.Generator
+
+    Returns:
+        tuple: (cells, policy) with count * n rows, each position's copies adjacent
+    """
+    chosen = np.concatenate(([0], rng.choice(np.arange(1, len(SYMMETRIES)), size=count - 1, replace=False)))
+    perms = SYMMETRIES[chosen]  # (count, 64); transformed[j] = original[perm[j]]
+    cells = cells[:, perms].reshape(-1, NUM_CELLS)
+    if policy is not None:
+        policy = policy[:, perms].reshape(-1, NUM_CELLS)
+    return cells, policy
+
+
+def generate(directory, games, nodes=DEFAULT_NODES, max_depth=DEFAULT_MAX_DEPTH, with_policy=True,
+             augment_count=1, shard_size=DEFAULT_SHARD_SIZE, workers=None, seed=0):
+    """
+    Play self-play games in a process pool and stream them into shards.
+
+    Args:
+        directory: Output directory
+        games: Number of games
+        nodes: Search node budget per move
+        max_depth: Deepest search iteration per move
+        with_policy: Store search policies
+        augment_count: Symmetric copies written per position (1 = none)
+        shard_size: Positions per shard
+        workers: Worker processes (defaults to the CPU count)
+        seed: Base seed; game i uses seed + i
+
+    Returns:
+        int: Positions written
+    """
+    rng = np.random.default_rng(seed)
+    written = 0
+    tasks = ((seed + i, nodes, max_depth) for i in range(games))
+    with ShardWriter(directory, shard_size, with_policy) as writer, ProcessPoolExecutor(workers) as pool:
+        for cells, side, outcome, policy in pool.map(play_game, tasks, chunksize=4):
+            cells, policy = augment(cells, policy if with_policy else None, augment_count, rng)
+            columns = {"cells": cells, "side": np.repeat(side, augment_count),
+                       "outcome": np.repeat(outcome, augment_count)}
+            if with_policy:
+                columns["policy"] = policy
+            writer.write(**columns)
+            written += len(cells)
+    return written
+
+
+class ShardDataset:
+    """
+    Read-only view of a shard dataset that samples without loading shards whole.
+    """
+
+    def __init__(self, directory):
+        """
+        Open a dataset by its manifest.
+
+        Args:
+            directory: Dataset directory
+        """
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        self.fields = list(self.manifest["fields"])
+        # Row dtype and shape per field, known even before the first shard completes
+        self.field_specs = {field: (np.dtype(spec["dtype"]), tuple(spec["shape"]))
+                            for field, spec in self.manifest["fields"].items()}
+        self.shards = []
+        for shard in self.manifest["shards"]:
+            self.shards.append({field: np.load(os.path.join(directory, f"{shard['name']}.{field}.npy"),
+                                               mmap_mode="r")
+                                for field in self.fields})
+        self.counts = np.array([shard["count"] for shard in self.manifest["shards"]], dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def get(self, indices):
+        """
+        Gather rows by global index, touching only the pages that hold them.
+
+        Args:
+            indices: Global row indices
+
+        Returns:
+            dict: Field name to array of the requested rows, in order
+
+        Raises:
+            IndexError: If an index is outside the dataset
+        """
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if len(indices) and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f"row indices must be 0-{len(self) - 1}" if len(self) else "dataset is empty")
+        shard_numbers = np.searchsorted(self.offsets, indices, side="right") - 1
+        batch = {field: np.empty((len(indices),) + shape, dtype=dtype)
+                 for field, (dtype, shape) in self.field_specs.items()}
+        for shard_number in np.unique(shard_numbers):
+            rows = np.flatnonzero(shard_numbers == shard_number)
+            local = indices[rows] - self.offsets[shard_number]
+            # Sorted reads keep page access sequential within the shard
+            order = np.argsort(local)
+            for field in self.fields:
+                batch[field][rows[order]] = self.shards[shard_number][field][local[order]]
+        return batch
+
+    def sample(self, batch_size, rng):
+        """
+        Draw a random minibatch across all shards.
+
+        Args:
+            batch_size: Rows to draw (with replacement)
+            rng: np.random.Generator
+
+        Returns:
+            dict: Field name to (batch_size, ...) array
+
+        Raises:
+            ValueError: If no shard has been completed yet
+        """
+        if not len(self):
+            raise ValueError("dataset has no completed shards to sample from")
+        return self.get(rng.integers(0, len(self), size=batch_size))
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="LogiQube self-play dataset generator")
+    parser.add_argument("directory", help="output directory")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--nodes", type=int, default=DEFAULT_NODES, help="search nodes per move")
+    parser.add_argument("--depth", type=int, default=DEFAULT_MAX_DEPTH)
+    parser.add_argument("--policy", action="store_true", help="store search policies")
+    parser.add_argument("--augment", type=int, default=1, choices=range(1, len(SYMMETRIES) + 1),
+                        metavar="N", help="symmetric copies per position (1-48)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    written = generate(args.directory, args.games, args.nodes, args.depth, args.policy, args.augment,
+                       args.shard_size, args.workers, args.seed)
+    dataset = ShardDataset(args.directory)
+    print(f"Wrote {written} positions from {args.games} games into {len(dataset.shards)} shards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+LogiQube - Memory Diagnostics
+Memory accounting for long-running hosts: live object counts per LogiQube
+class, bytes per game broken down by component, and tracemalloc allocation
+sites compared between reports to show what keeps growing.
+
+Nothing is tracked while idle. Live objects are found by a garbage
+collector scan when a report is requested, and tracemalloc (which slows
+every allocation) only runs between start_tracing() and stop_tracing().
+A report is requested by calling memory_report(), by a signal once
+install_signal_handler() has been called, or through the analysis
+server's "memory" admin method.
+
+A report pauses the calling thread for a full garbage collection and
+scan of every object, roughly 25ms per 100,000 live objects (plus a
+snapshot of every traced allocation while tracing). The analysis server
+therefore builds it in its executor rather than on the event loop.
+
+Usage (against a running analysis server):
+    python -m src.diagnostics --port 8765 --trace
+    kill -USR1 <pid>    (in a process that called install_signal_handler)
+"""
+
+import gc
+import json
+import os
+import signal
+import sys
+import time
+import tracemalloc
+
+from src.board import Board
+from src.broadcast import MatchChannel
+from src.journal import GameJournal
+from src.search import Searcher
+
+DEFAULT_TOP_SITES = 10  # Allocation sites listed per report
+DEFAULT_TRACE_FRAMES = 1  # Stack frames recorded per allocation while tracing
+REPORT_SIGNAL = getattr(signal, "SIGUSR1", None)  # Not available on Windows
+
+# Snapshot of the previous report, so the next one can show growth
+_last_snapshot = None
+
+
+def live_objects():
+    """
+    Find every live instance of a LogiQube class.
+
+    Returns:
+        dict: Class name -> list of instances, for classes defined in src
+    """
+    found = {}
+    for obj in gc.get_objects():
+        cls = type(obj)
+        module = getattr(cls, "__module__", None)
+        # (Some metaclasses expose __module__ as a descriptor, not a string)
+        if isinstance(module, str) and module.startswith("src."):
+            found.setdefault(cls.__name__, []).append(obj)
+    return found
+
+
+def instances_of(objects, cls):
+    """
+    Live instances of cls or any subclass (e.g. JournaledBoard for Board).
+
+    Args:
+        objects: From live_objects
+        cls: Class to match
+
+    Returns:
+        list: Matching instances
+    """
+    return [obj for instances in objects.values() for obj in instances if isinstance(obj, cls)]
+
+
+def session_counts(objects):
+    """
+    Live game sessions as the hosting objects see them.
+
+    Args:
+        objects: From live_objects
+
+    Returns:
+        dict: journal_sessions (sessions open in every GameJournal),
+        match_channels and spectators (their subscribers)
+    """
+    journals = instances_of(objects, GameJournal)
+    channels = instances_of(objects, MatchChannel)
+    return {
+        "journal_sessions": sum(len(journal.sessions) for journal in journals),
+        "match_channels": len(channels),
+        "spectators": sum(len(channel.subscribers) for channel in channels),
+    }
+
+
+def board_memory(board):
+    """
+    Bytes held by one board, by component.
+
+    Args:
+        board: Board instance
+
+    Returns:
+        dict: Component -> bytes
+    """
+    history = board.move_history
+    return {
+        "object": sys.getsizeof(board) + sys.getsizeof(board.__dict__),
+        "cells": sys.getsizeof(board.cells) + sys.getsizeof(board.board),
+        "move_history": sys.getsizeof(history) + sum(sys.getsizeof(entry) for entry in history),
+        "line_counts": sys.getsizeof(board.line_counts) + sum(
+            sys.getsizeof(counts) for counts in board.line_counts.values()),
+        "live_lines": sys.getsizeof(board.live_lines),
+    }
+
+
+def searcher_memory(searcher):
+    """
+    Bytes held by one searcher's tables, by component.
+
+    Table keys and entries are counted; moves in the entries are shared
+    position tuples and are not. A shared-memory table is counted once per
+    searcher attached to it.
+
+    Args:
+        searcher: Searcher instance
+
+    Returns:
+        dict: Component -> bytes
+    """
+    tt = searcher.tt
+    if hasattr(tt, "entries"):
+        components = {"transposition_table": _table_bytes(tt.entries)}
+    else:
+        components = {"shared_transposition_table": tt.num_entries * 16}
+    if searcher.endgame is not None:
+        components["endgame_memo"] = _table_bytes(searcher.endgame.memo)
+    return components
+
+
+def _table_bytes(table):
+    """Approximate bytes of a dict of int keys to tuple entries."""
+    # Copy the items first: another thread may be searching with the table
+    items = list(table.items())
+    return sys.getsizeof(table) + sum(sys.getsizeof(key) + sys.getsizeof(entry) for key, entry in items)
+
+
+def _component_summary(objects, measure):
+    """Totals and per-object averages of measure() over objects."""
+    totals = {}
+    for obj in objects:
+        for component, size in measure(obj).items():
+            totals[component] = totals.get(component, 0) + size
+    count = len(objects)
+    total = sum(totals.values())
+    return {
+        "count": count,
+        "bytes": totals,
+        "total_bytes": total,
+        "bytes_each": total // count if count else 0,
+    }
+
+
+def rss_bytes():
+    """
+    Resident set size of this process.
+
+    Returns:
+        int: Bytes, or None where /proc is unavailable
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def start_tracing(frames=DEFAULT_TRACE_FRAMES):
+    """
+    Start tracemalloc so reports include allocation sites.
+
+    Args:
+        frames: Stack frames recorded per allocation (more frames cost more)
+    """
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        _last_snapshot = None
+
+
+def stop_tracing():
+    """Stop tracemalloc and forget the previous snapshot."""
+    global _last_snapshot
+    tracemalloc.stop()
+    _last_snapshot = None
+
+
+def allocation_sites(top=DEFAULT_TOP_SITES):
+    """
+    Largest allocation sites now, and the fastest growing since the last call.
+
+    Args:
+        top: Sites listed in each ranking
+
+    Returns:
+        dict: "largest" and "growth" lists of {"site", "bytes", "count"}
+        (growth also has "bytes_diff" and "count_diff"; it is empty on the
+        first call), or None if tracemalloc is not tracing
+    """
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        return None
+    # Leave out tracemalloc's and this module's own allocations
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)])
+
+    def site(stat):
+        frame = stat.traceback[0]
+        return f"{frame.filename}:{frame.lineno}"
+
+    largest = [{"site": site(stat), "bytes": stat.size, "count": stat.count}
+               for stat in snapshot.statistics("lineno")[:top]]
+    growth = []
+    if _last_snapshot is not None:
+        growth = [{"site": site(stat), "bytes": stat.size, "count": stat.count,
+                   "bytes_diff": stat.size_diff, "count_diff": stat.count_diff}
+                  for stat in snapshot.compare_to(_last_snapshot, "lineno")[:top] if stat.size_diff > 0]
+    _last_snapshot = snapshot
+    return {"largest": largest, "growth": growth}
+
+
+def memory_report(top=DEFAULT_TOP_SITES):
+    """
+    Collect a memory report for this process.
+
+    Args:
+        top: Allocation sites listed per ranking when tracing
+
+    Returns:
+        dict: JSON-serializable report with "live" object counts, "sessions"
+        (see session_counts), "boards" and "searchers" component breakdowns
+        (subclasses such as JournaledBoard included), "per_game" with the
+        board bytes of one game and the engine table bytes shared out per
+        game kept apart, "rss_bytes" and "allocations" (None unless tracing)
+    """
+    gc.collect()
+    objects = live_objects()
+    boards = _component_summary(instances_of(objects, Board), board_memory)
+    searchers = _component_summary(instances_of(objects, Searcher), searcher_memory)
+    # Every game owns one board; engines' tables are spread over the games
+    games = boards["count"]
+    per_game = {}
+    if games:
+        per_game = {
+            "board": {component: size // games for component, size in boards["bytes"].items()},
+            "engine": {component: size // games for component, size in searchers["bytes"].items()},
+        }
+    report = {
+        "time": time.time(),
+        "pid": os.getpid(),
+        "rss_bytes": rss_bytes(),
+        "live": {name: len(instances) for name, instances in sorted(objects.items())},
+        "sessions": session_counts(objects),
+        "boards": boards,
+        "searchers": searchers,
+        "per_game": per_game,
+        "allocations": allocation_sites(top),
+    }
+    if tracemalloc.is_tracing():
+        report["traced_bytes"], report["traced_peak_bytes"] = tracemalloc.get_traced_memory()
+    return report
+
+
+def format_report(report):
+    """
+    Render a memory report as readable text.
+
+    Args:
+        report: From memory_report
+
+    Returns:
+        str: Multi-line summary
+    """
+    lines = [f"=== LogiQube memory report (pid {report['pid']}) ==="]
+    if report["rss_bytes"] is not None:
+        lines.append(f"RSS: {report['rss_bytes'] / 2 ** 20:.1f} MiB")
+    lines.append("Live objects: " + ", ".join(f"{name} {count}" for name, count in report["live"].items()))
+    sessions = report["sessions"]
+    lines.append(f"Sessions: {sessions['journal_sessions']} journaled, {sessions['match_channels']} "
+                 f"broadcast matches with {sessions['spectators']} spectators")
+    for title in ("boards", "searchers"):
+        summary = report[title]
+        if summary["count"]:
+            parts = ", ".join(f"{component} {size}" for component, size in summary["bytes"].items())
+            lines.append(f"{title.capitalize()}: {summary['count']} x {summary['bytes_each']} bytes "
+                         f"(totals: {parts})")
+    for part, title in (("board", "Board per game"), ("engine", "Engine tables per game")):
+        sizes = report["per_game"].get(part)
+        if sizes:
+            lines.append(f"{title}: {sum(sizes.values())} bytes (" + ", ".join(
+                f"{component} {size}" for component, size in sizes.items()) + ")")
+    allocations = report["allocations"]
+    if allocations is not None:
+        lines.append(f"Traced: {report['traced_bytes'] / 2 ** 20:.1f} MiB "
+                     f"(peak {report['traced_peak_bytes'] / 2 ** 20:.1f} MiB)")
+        lines.append("Largest allocation sites:")
+        lines.extend(f"  {entry['bytes']:>10} B {entry['count']:>7}  {entry['site']}"
+                     for entry in allocations["largest"])
+        if allocations["growth"]:
+            lines.append("Growth since the last report:")
+            lines.extend(f"  {entry['bytes_diff']:>+10} B {entry['count_diff']:>+7}  {entry['site']}"
+                         for entry in allocations["growth"])
+    return "\n".join(lines)
+
+
+def install_signal_handler(signum=REPORT_SIGNAL, path=None, top=DEFAULT_TOP_SITES):
+    """
+    Write a memory report whenever the process receives signum.
+
+    The handler runs in the main thread between bytecodes, so the report
+    reflects a consistent state of the game objects.
+
+    Args:
+        signum: Signal to handle (SIGUSR1 by default)
+        path: File to append JSON-line reports to; None writes text to stderr
+        top: Allocation sites listed per ranking when tracing
+
+    Returns:
+        The previous handler for signum
+    """
+    if signum is None:
+        raise ValueError("this platform has no SIGUSR1; pass another signal")
+
+    def handler(received, frame):
+        report = memory_report(top)
+        if path is None:
+            print(format_report(report), file=sys.stderr, flush=True)
+        else:
+            with open(path, "a") as f:
+                f.write(json.dumps(report) + "\n")
+
+    return signal.signal(signum, handler)
+
+
+def main():
+    """Command-line entry point: print a running analysis server's memory report."""
+    import argparse
+
+    from src.analysis_server import DEFAULT_HOST, DEFAULT_PORT, AnalysisClient
+
+    parser = argparse.ArgumentParser(description="LogiQube memory diagnostics")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--trace", action="store_true", help="start tracemalloc in the server")
+    parser.add_argument("--stop-trace", action="store_true", help="stop tracemalloc in the server")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_SITES)
+    parser.add_argument("--json", action="store_true", help="print the raw report")
+    args = parser.parse_args()
+
+    client = AnalysisClient(args.host, args.port)
+    try:
+        trace = True if args.trace else False if args.stop_trace else None
+        report = client.call("memory", trace=trace, top=args.top)
+    finally:
+        client.close()
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+LogiQube - Differential Stress Harness
+Plays large numbers of random and adversarial games on the reference Board
+and on each alternative backend, compares the observable state after every
+ply, and shrinks any diverging game to a short reproducer.
+
+Throughput target: a few hundred games per second per worker process,
+not tens of thousands. Every ply replays on two pure-Python boards and,
+by default, queries winning moves and threats for both players, which
+costs about 5 ms per game (around 200 games/s per core). Comparing the
+queries every Nth ply (--query-interval 16) more than doubles that, and
+the rate scales with --workers; status fields are still compared on
+every ply.
+
+Usage:
+    python -m src.difftest --games 100000 --workers 8
+"""
+
+import multiprocessing as mp
+import random
+import time
+
+from src.bitboard import BitBoard
+from src.board import Board
+from src.constants import PLAYER_X, PLAYER_O
+from src.winning_lines import NUM_CELLS, LINE_CELL_INDICES, CELL_LINE_INDICES, index_to_position
+
+# Alternative backends checked against the reference Board
+BACKENDS = {
+    "bitboard": BitBoard,
+}
+
+# Game generators (see generate_game)
+GAME_KINDS = ("random", "drawish", "diagonal")
+
+# Lines leaving a plane (through-plane verticals and all diagonals through planes)
+_CROSS_PLANE_LINES = frozenset(range(40, 76))
+
+
+
+def generate_game(rng, kind):
+    """
+    Generate one game as a list of (x, y, z) moves.
+
+    Kinds:
+        random: uniformly random legal moves
+        drawish: avoids completing lines, so many games end in dead draws
+            or run to move 64
+        diagonal: prefers cross-plane lines and takes wins on them, so games
+            end on 3D diagonals far more often than at random
+
+    Args:
+        rng: random.Random instance
+        kind: One of GAME_KINDS
+
+    Returns:
+        list: Moves, ending at the first win or at a full board
+    """
+    counts = {PLAYER_X: [0] * len(LINE_CELL_INDICES), PLAYER_O: [0] * len(LINE_CELL_INDICES)}
+    empty = list(range(NUM_CELLS))
+    player = PLAYER_X
+    moves = []
+
+    while empty:
+        own = counts[player]
+        if kind == "drawish":
+            candidates = [c for c in empty if all(own[i] < 3 for i in CELL_LINE_INDICES[c])]
+        elif kind == "diagonal":
+            candidates = [c for c in empty
+                          if any(own[i] == 3 for i in CELL_LINE_INDICES[c] if i in _CROSS_PLANE_LINES)]
+            if not candidates:
+                candidates = [c for c in empty
+                              if sum(i in _CROSS_PLANE_LINES for i in CELL_LINE_INDICES[c]) >= 3]
+        else:
+            candidates = empty
+        cell = rng.choice(candidates or empty)
+
+        empty.remove(cell)
+        moves.append(index_to_position(cell))
+        won = False
+        for i in CELL_LINE_INDICES[cell]:
+            own[i] += 1
+            won = won or own[i] == 4
+        if won:
+            break
+        player = PLAYER_O if player == PLAYER_X else PLAYER_X
+
+    return moves
+
+
+def snapshot(board, accepted, full=True):
+    """
+    Capture everything observable about a board after a move.
+
+    Args:
+        board: Board or alternative backend
+        accepted: Return value of make_move
+        full: Include the (slower) winning move and threat queries
+
+    Returns:
+        dict: Field name to value
+    """
+    state = {
+        "accepted": accepted,
+        "game_status": board.game_status,
+        "winner": board.winner,
+        "winning_line": board.winning_line,
+        "draw_reason": board.draw_reason,
+        "current_player": board.current_player,
+        "move_count": board.move_count,
+    }
+    if full:
+        for player in (PLAYER_X, PLAYER_O):
+            state[f"winning_moves_{player}"] = board.get_winning_moves(player)
+            state[f"threats_{player}"] = board.get_threat_positions(player)
+    return state
+
+
+def find_divergence(moves, backend_class, query_interval=1):
+    """
+    Replay a game on the reference Board and a backend, comparing every ply.
+
+    Args:
+        moves: List of (x, y, z) moves
+        backend_class: Alternative backend to check
+        query_interval: Compare winning moves/threats every Nth ply (and always
+            on the last); status fields are compared on every ply
+
+    Returns:
+        tuple: (ply, field, reference_value, backend_value) for the first
+        difference, or None if the backend agrees throughout
+    """
+    reference = Board()
+    backend = backend_class()
+    last_ply = len(moves) - 1
+
+    for ply, move in enumerate(moves):
+        full = ply % query_interval == 0 or ply == last_ply
+        expected = snapshot(reference, reference.make_move(*move), full)
+        actual = snapshot(backend, backend.make_move(*move), full)
+        if expected != actual:
+            for field, value in expected.items():
+                if actual.get(field) != value:
+                    return ply, field, value, actual.get(field)
+    return None
+
+
+def minimize(moves, backend_class):
+    """
+    Shrink a diverging game to a short reproducer.
+
+    Cuts the game right after the first divergence, then repeatedly drops
+    single moves, and then pairs of moves, while the backend still diverges
+    (a shorter sequence of distinct cells is always a valid test input).
+    Pairs matter because dropping one move hands every later move to the
+    other player.
+
+    Args:
+        moves: Diverging list of moves
+        backend_class: Backend that diverges
+
+    Returns:
+        list: Locally minimal diverging move list
+    """
+    divergence = find_divergence(moves, backend_class)
+    if divergence is None:
+        return moves
+    moves = list(moves[:divergence[0] + 1])
+
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        removals = [(i,) for i in range(len(moves))]
+        removals += [(i, j) for i in range(len(moves)) for j in range(i + 1, len(moves))]
+        for removal in removals:
+            candidate = [move for k, move in enumerate(moves) if k not in removal]
+            divergence = find_divergence(candidate, backend_class)
+            if divergence is not None:
+                moves = candidate[:divergence[0] + 1]
+                shrunk = True
+                break
+    return moves
+
+
+def run_chunk(args):
+    """
+    Worker: generate and check one chunk of games.
+
+    Args:
+        args: (seed, games, backend_names, query_interval)
+
+    Returns:
+        tuple: (games, plies, failures) with failures as
+        (backend_name, kind, moves, divergence) tuples
+    """
+    seed, games, backend_names, query_interval = args
+    rng = random.Random(seed)
+    plies = 0
+    failures = []
+
+    for game_number in range(games):
+        kind = GAME_KINDS[game_number % len(GAME_KINDS)]
+        moves = generate_game(rng, kind)
+        plies += len(moves)
+        for name in backend_names:
+            divergence = find_divergence(moves, BACKENDS[name], query_interval)
+            if divergence is not None:
+                failures.append((name, kind, moves, divergence))
+
+    return games, plies, failures
+
+
+def run(games, backend_names=None, workers=None, seed=0, chunk_size=200, query_interval=1):
+    """
+    Run the differential test across a process pool.
+
+    Args:
+        games: Total games to generate
+        backend_names: Backends to check (defaults to all)
+        workers: Worker processes (defaults to the CPU count)
+        seed: Base random seed; chunk i uses seed + i
+        chunk_size: Games per work unit
+        query_interval: See find_divergence
+
+    Returns:
+        dict: games, plies, seconds and minimized failures
+    """
+    if backend_names is None:
+        backend_names = list(BACKENDS)
+    chunks = []
+    remaining = games
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunks.append((seed + len(chunks), size, backend_names, query_interval))
+        remaining -= size
+
+    start_time = time.perf_counter()
+    total_games = 0
+    total_plies = 0
+    failures = []
+    with mp.Pool(workers) as pool:
+        for chunk_games, chunk_plies, chunk_failures in pool.imap_unordered(run_chunk, chunks):
+            total_games += chunk_games
+            total_plies += chunk_plies
+            failures.extend(chunk_failures)
+    seconds = time.perf_counter() - start_time
+
+    minimized = []
+    for name, kind, moves, divergence in failures:
+        reproducer = minimize(moves, BACKENDS[name])
+        minimized.append({
+            "backend": name,
+            "kind": kind,
+            "moves": reproducer,
+            "divergence": find_divergence(reproducer, BACKENDS[name]),
+        })
+
+    return {"games": total_games, "plies": total_plies, "seconds": seconds, "failures": minimized}
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="LogiQube differential backend stress test")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS),
+                        help="backend to check (repeatable, default: all)")
+    parser.add_argument("--query-interval", type=int, default=1,
+                        help="compare winning moves/threats every Nth ply")
+    args = parser.parse_args()
+
+    report = run(args.games, args.backend, args.workers, args.seed, query_interval=args.query_interval)
+    rate = report["games"] / report["seconds"] if report["seconds"] else 0.0
+    print(f"{report['games']} games, {report['plies']} plies in {report['seconds']:.1f}s "
+          f"({rate:.0f} games/s)")
+
+    # Failures sharing a minimized reproducer are the same bug
+    seen = set()
+    for failure in report["failures"]:
+        key = (failure["backend"], tuple(failure["moves"]))
+        if key in seen:
+            continue
+        seen.add(key)
+        ply, field, expected, actual = failure["divergence"]
+        print(f"\n✗ {failure['backend']} diverged ({failure['kind']} game) at ply {ply} on {field}")
+        print(f"  reference: {expected}")
+        print(f"  backend:   {actual}")
+        print(f"  moves: {failure['moves']}")
+
+    if report["failures"]:
+        sys.exit(1)
+    print("✓ All backends agree with the reference Board")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+LogiQube - Exact Endgame Solver
+Exhaustive alpha-beta search for late positions, returning exact
+win/loss/draw scores with distance on the same scale as the main search.
+
+Late in a game most lines hold pieces of both players and can no longer be
+completed. A move on a cell that lies only on such dead lines changes
+nothing but whose turn it is, and an extra piece never hurts its owner, so
+some move on a still-winnable line is always at least as good: the solver
+only considers cells on live lines. It also resolves forced positions
+without branching (an immediate win, a single threat that must be blocked,
+two threats that cannot both be) and memoizes solved positions in its own
+table, which is never mixed with the depth-limited heuristic entries.
+"""
+
+import time
+
+from src.constants import EMPTY, PLAYER_X, PLAYER_O, STATE_WIN, STATE_DRAW
+from src.search import (WIN_SCORE, TT_EXACT, TT_LOWER, TT_UPPER, CHECK_INTERVAL, SearchTimeout,
+                        check_interval, score_to_tt, score_from_tt)
+from src.winning_lines import NUM_CELLS, LINE_CELL_INDICES
+
+ENDGAME_EMPTY_CELLS = 20  # Switch to exact solving with this few empty cells...
+ENDGAME_LIVE_LINES = 12  # ...or this few lines still winnable by either player
+ENDGAME_BUDGET_SHARE = 0.5  # Part of a search's node and time budget the solver may use
+MEMO_MAX_ENTRIES = 1 << 20  # The memo is cleared whenever it would grow past this, even mid-solve
+
+# Move ordering weight of a live line by the pieces its owner has in it
+_LINE_WEIGHTS = (1, 4, 16, 64)
+
+
+class EndgameSolver:
+    """
+    Exact solver over live-line cells with a memo of solved positions.
+    """
+
+    def __init__(self, empty_cells=ENDGAME_EMPTY_CELLS, live_lines=ENDGAME_LIVE_LINES,
+                 budget_share=ENDGAME_BUDGET_SHARE, max_entries=MEMO_MAX_ENTRIES):
+        """
+        Initialize the solver with an empty memo.
+
+        Args:
+            empty_cells: applies() is true from this many empty cells down
+            live_lines: applies() is true from this many live lines down
+            budget_share: Part of a search's budget the Searcher hands over
+                before falling back to heuristic search
+            max_entries: Largest memo size; a full memo is cleared before
+                the next store
+        """
+        self.empty_cells = empty_cells
+        self.live_lines = live_lines
+        self.budget_share = budget_share
+        self.max_entries = max_entries
+        self.memo = {}  # Zobrist key -> (flag, node-relative score, best cell index)
+        self.nodes = 0
+        self.node_limit = None
+        self.deadline = None
+        self.stop_event = None
+        self.next_check = CHECK_INTERVAL
+
+    def applies(self, board):
+        """
+        Whether the position is late enough to solve exactly.
+
+        Args:
+            board: Board instance
+
+        Returns:
+            bool: True once empty cells or live lines drop to the thresholds
+        """
+        if NUM_CELLS - board.move_count <= self.empty_cells:
+            return True
+        return count_live_lines(board) <= self.live_lines
+
+    def clear(self):
+        """Forget all solved positions."""
+        self.memo.clear()
+
+    def solve(self, board, margin=0, node_limit=None, deadline=None, stop_event=None):
+        """
+        Solve the position exactly.
+
+        Args:
+            board: Board instance (restored to its original state on return)
+            margin: Score exactly every root move within this margin of the best
+            node_limit: Nodes allowed, or None for no limit
+            deadline: time.perf_counter() value to stop at, or None
+            stop_event: Optional Event that aborts the solve when set
+
+        Returns:
+            tuple: (best cell index, score, [(cell index, score), ...]) with
+            the root moves scored within the margin, best first; the index
+            is None if the game is over
+
+        Raises:
+            SearchTimeout: If the node limit or deadline ran out or a stop
+                was requested (the memo keeps what was solved)
+        """
+        self.nodes = 0
+        self.node_limit = node_limit
+        self.deadline = deadline
+        self.stop_event = stop_event
+        self.next_check = check_interval(deadline, node_limit)
+
+        if board.game_status == STATE_WIN:
+            return None, -WIN_SCORE, []
+        if board.game_status == STATE_DRAW:
+            return None, 0, []
+
+        score, moves = self._node_moves(board, 0)
+        if score is not None:
+            return moves[0], score, [(moves[0], score)]
+
+        alpha = -WIN_SCORE - 1
+        beta = WIN_SCORE + 1
+        best_move = None
+        best_score = alpha
+        scores = []
+        for index in self._memo_first(board, moves):
+            board.make_move_index(index)
+            try:
+                # Alpha lowered by the margin, so near-best scores are exact
+                score = -self._negamax(board, -beta, -(alpha - margin), 1)
+            finally:
+                board.undo_move()
+            scores.append((index, score))
+            if score > best_score:
+                best_score = score
+                best_move = index
+            if score > alpha:
+                alpha = score
+
+        self._store(board.zobrist_key, (TT_EXACT, best_score, best_move))
+        candidates = sorted((entry for entry in scores if entry[1] >= best_score - margin),
+                            key=lambda entry: -entry[1])
+        return best_move, best_score, candidates
+
+    def _negamax(self, board, alpha, beta, ply):
+        """
+        Exact negamax alpha-beta search.
+
+        Args:
+            board: Board instance
+            alpha, beta: Search window
+            ply: Distance from the root
+
+        Returns:
+            int: Score from the side to move's point of view
+        """
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self._check_stop()
+
+        if board.game_status == STATE_WIN:
+            return -(WIN_SCORE - ply)
+        if board.game_status == STATE_DRAW:
+            return 0
+
+        key = board.zobrist_key
+        entry = self.memo.get(key)
+        if entry is not None:
+            flag, score, _ = entry
+            score = score_from_tt(score, ply)
+            if (flag == TT_EXACT or (flag == TT_LOWER and score >= beta)
+                    or (flag == TT_UPPER and score <= alpha)):
+                return score
+
+        score, moves = self._node_moves(board, ply)
+        if score is not None:
+            self._store(key, (TT_EXACT, score_to_tt(score, ply), moves[0]))
+            return score
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        best_move = None
+        for index in self._memo_first(board, moves):
+            board.make_move_index(index)
+            try:
+                score = -self._negamax(board, -beta, -alpha, ply + 1)
+            finally:
+                board.undo_move()
+            if score > best_score:
+                best_score = score
+                best_move = index
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            flag = TT_UPPER
+        elif best_score >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self._store(key, (flag, score_to_tt(best_score, ply), best_move))
+        return best_score
+
+    def _store(self, key, entry):
+        """Memoize a solved position, first clearing the memo if it is full."""
+        memo = self.memo
+        if len(memo) >= self.max_entries and key not in memo:
+            # Entries are only a cache, so dropping them mid-solve is safe
+            memo.clear()
+        memo[key] = entry
+
+    def _node_moves(self, board, ply):
+        """
+        Resolve forced positions, or list the moves worth searching.
+
+        Args:
+            board: Board instance of a game in progress
+            ply: Distance from the root
+
+        Returns:
+            tuple: (score, [best cell index]) when the position is decided
+            without search, else (None, live cell indices, most promising
+            first). A forced block is returned as the only move.
+        """
+        player = board.current_player
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        mine = board.line_counts[player]
+        theirs = board.line_counts[opponent]
+        cells = board.cells.tolist()
+        weights = {}
+        blocks = []
+
+        for line, own, other in zip(LINE_CELL_INDICES, mine, theirs):
+            if own and other:
+                continue
+            empty = [index for index in line if cells[index] == EMPTY]
+            if own == 3:
+                return WIN_SCORE - (ply + 1), empty
+            if other == 3:
+                if empty[0] not in blocks:
+                    blocks.append(empty[0])
+                continue
+            weight = _LINE_WEIGHTS[own or other]
+            for index in empty:
+                weights[index] = weights.get(index, 0) + weight
+
+        if len(blocks) >= 2:
+            # Only one threat can be blocked; the opponent completes the other
+            return -(WIN_SCORE - (ply + 2)), blocks
+        if blocks:
+            return None, blocks
+        return None, sorted(weights, key=lambda index: -weights[index])
+
+    def _memo_first(self, board, moves):
+        """Yield moves with the memo's best move for the position first."""
+        entry = self.memo.get(board.zobrist_key)
+        best = entry[2] if entry is not None else None
+        if best in moves:
+            yield best
+        for index in moves:
+            if index != best:
+                yield index
+
+    def _check_stop(self):
+        """Raise SearchTimeout if the node budget or deadline ran out or a stop was requested."""
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+        nodes_left = None if self.node_limit is None else self.node_limit - self.nodes
+        self.next_check = self.nodes + check_interval(self.deadline, nodes_left)
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchTimeout()
+
+
+def count_live_lines(board):
+    """
+    Count lines that either player can still complete.
+
+    Args:
+        board: Board instance
+
+    Returns:
+        int: Lines holding pieces of at most one player
+    """
+    return sum(1 for own, other in zip(board.line_counts[PLAYER_X], board.line_counts[PLAYER_O])
+               if not (own and other))
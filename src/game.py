@@ -5,23 +5,42 @@ Orchestrates board logic and UI
 
 import pygame
 from src.board import Board
+from src.clock import GameClock
+from src.game_records import save_game
 from src.ui import GameUI
 from src.constants import *
 
 
+# Cube view rotation per arrow key: (yaw, pitch) degrees
+CUBE_ROTATE_KEYS = {
+    pygame.K_LEFT: (-CUBE_YAW_STEP, 0),
+    pygame.K_RIGHT: (CUBE_YAW_STEP, 0),
+    pygame.K_UP: (0, CUBE_PITCH_STEP),
+    pygame.K_DOWN: (0, -CUBE_PITCH_STEP),
+}
+
+
 class Game:
     """
     Main game controller for LogiQube.
     Handles game loop, events, and coordinates between Board and UI.
     """
 
-    def __init__(self):
-        """Initialize the game."""
+    def __init__(self, time_control=None):
+        """
+        Initialize the game.
+
+        Args:
+            time_control: (initial seconds, increment seconds) for timed
+                games, or None for no clock
+        """
         self.board = Board()
         self.ui = GameUI()
         self.running = True
         self.mode = MODE_HUMAN_VS_HUMAN  # Default mode
         self.ai_difficulty = None
+        self.clock = GameClock(*time_control) if time_control is not None else None
+        self.ui.game_clock = self.clock
 
     def handle_events(self):
         """Handle pygame events."""
@@ -41,6 +60,18 @@ class Game:
                 # C key to toggle coordinate display (debug)
                 elif event.key == pygame.K_c:
                     self.ui.show_coordinates = not self.ui.show_coordinates
+                # H key to toggle the win-rate heatmap
+                elif event.key == pygame.K_h:
+                    self.ui.show_heatmap = not self.ui.show_heatmap
+                # T key to toggle the threat overlay
+                elif event.key == pygame.K_t:
+                    self.ui.show_threats = not self.ui.show_threats
+                # V key to switch between the planes and the isometric cube
+                elif event.key == pygame.K_v:
+                    self.ui.toggle_view()
+                # Arrow keys rotate the cube view
+                elif event.key in CUBE_ROTATE_KEYS and self.ui.view_mode == VIEW_CUBE:
+                    self.ui.get_cube_view().rotate(*CUBE_ROTATE_KEYS[event.key])
                 # ESC to quit
                 elif event.key == pygame.K_ESCAPE:
                     self.running = False
@@ -56,26 +87,60 @@ class Game:
         Args:
             mouse_pos: (x, y) tuple of mouse position
         """
-        # Get board position from mouse
-        position = self.ui.get_position_from_mouse(mouse_pos)
+        # Get board cell from mouse
+        index = self.ui.get_index_from_mouse(mouse_pos)
 
-        if position is None:
+        if index is None:
             return
 
-        x, y, z = position
+        # A move made after the flag fell does not count
+        self.check_clock()
 
         # Try to make the move
-        if self.board.make_move(x, y, z):
+        mover = self.board.current_player
+        if self.board.make_move_index(index):
             # Move was successful
+            if self.clock is not None:
+                if self.board.game_status == STATE_PLAYING:
+                    self.clock.press(mover)
+                else:
+                    self.clock.stop()
+
             if self.board.game_status == STATE_WIN:
                 print(f"Player {self.board.winner} wins!")
                 print(f"Winning line: {self.board.winning_line}")
+            elif self.board.draw_reason == DRAW_DEAD:
+                print("Game is a draw - no line can be completed by either player!")
             elif self.board.game_status == STATE_DRAW:
                 print("Game is a draw!")
 
+            if self.board.game_status != STATE_PLAYING:
+                self.record_game()
+
+    def check_clock(self):
+        """End the game as a loss on time if the player to move has run out."""
+        if self.clock is None or self.board.game_status != STATE_PLAYING:
+            return
+        player = self.clock.flagged()
+        if player is not None:
+            self.clock.stop()
+            self.board.flag_fall(player)
+            print(f"Player {self.board.winner} wins on time!")
+            self.record_game()
+
+    def record_game(self):
+        """Append the finished game to the game records file for later analysis."""
+        try:
+            save_game(self.board, GAME_RECORDS_FILE, mode=self.mode)
+        except OSError as e:
+            print(f"Could not save game record: {e}")
+
     def reset_game(self):
         """Reset the game to initial state."""
         self.board.reset()
+        if self.clock is not None:
+            self.clock.reset()
+            self.clock.start(PLAYER_X)
         print("Game reset!")
 
     def render(self):
@@ -109,8 +174,8 @@ class Game:
         """Draw game instructions on screen."""
         instructions = [
             "Click any empty cell to place your marker",
-            "Press R to reset game",
-            "Press ESC to quit"
+            "Press R to reset game, H to toggle the win-rate heatmap, T to show threats",
+            "Press V for the 3D cube view (arrow keys rotate), ESC to quit"
         ]
 
         y_start = WINDOW_HEIGHT - 150
@@ -128,10 +193,16 @@ class Game:
         print("  • Click to place marker")
         print("  • R - Reset game")
         print("  • C - Toggle coordinates (debug)")
+        print("  • H - Toggle win-rate heatmap")
+        print("  • T - Toggle threat overlay")
+        print("  • V - Switch to/from the 3D cube view (arrow keys rotate)")
         print("  • ESC - Quit")
         print("\nGame started! Player X goes first.\n")
 
+        if self.clock is not None:
+            self.clock.start(PLAYER_X)
         while self.running:
+            self.check_clock()
             self.handle_events()
             self.render()
 
@@ -0,0 +1,75 @@
+"""
+LogiQube - Game Records
+Finished games stored one JSON object per line, so large collections can be
+appended to cheaply and streamed back without loading them whole.
+"""
+
+import json
+import time
+
+from src.constants import PLAYER_X, PLAYER_O, STATE_WIN, STATE_DRAW
+
+RESULT_NAMES = {PLAYER_X: "X", PLAYER_O: "O"}
+
+
+def game_record(board, **metadata):
+    """
+    Build a record of a board's game.
+
+    Args:
+        board: Board instance
+        **metadata: Extra fields (e.g. mode="human_vs_human")
+
+    Returns:
+        dict: JSON-serializable record
+    """
+    if board.game_status == STATE_WIN:
+        result = RESULT_NAMES[board.winner]
+    elif board.game_status == STATE_DRAW:
+        result = "draw"
+    else:
+        result = None  # Unfinished
+
+    record = {
+        "moves": [[x, y, z] for x, y, z, _ in board.move_history],
+        "result": result,
+        "timestamp": time.time(),
+    }
+    record.update(metadata)
+    return record
+
+
+def save_game(board, path, **metadata):
+    """
+    Append a board's game to a records file.
+
+    Args:
+        board: Board instance
+        path: JSON lines file
+        **metadata: Extra fields stored with the game
+    """
+    with open(path, "a") as f:
+        f.write(json.dumps(game_record(board, **metadata)) + "\n")
+
+
+def iter_games(path):
+    """
+    Stream game records from a file, skipping blank or truncated lines.
+
+    Args:
+        path: JSON lines file
+
+    Yields:
+        dict: Game records with "moves" as (x, y, z) tuples
+    """
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # A crash mid-append leaves a partial last line
+            record["moves"] = [tuple(move) for move in record["moves"]]
+            yield record
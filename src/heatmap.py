@@ -0,0 +1,188 @@
+"""
+LogiQube - Monte Carlo Heatmap
+Estimates, for every empty cell, how often the side to move wins after
+playing there, using batches of vectorized random playouts run on a
+background thread so the UI never waits for them.
+
+A playout is played all at once: the remaining empty cells get a random
+fill order (optionally biased toward cells on more lines), the players
+alternate along that order, and the winner is whoever owns the line that is
+completed earliest in it. This is equivalent to playing the moves one by one
+and stopping at the first win, but needs no Python loop per move.
+"""
+
+import threading
+
+import numpy as np
+
+from src.constants import EMPTY, PLAYER_X, PLAYER_O, STATE_PLAYING
+from src.winning_lines import NUM_CELLS, LINE_INDEX_ARRAY, CELL_LINE_INDICES
+
+BATCH_PLAYOUTS = 64  # Playouts per candidate cell in each background batch
+TARGET_PLAYOUTS = 2000  # Playouts per cell after which the heatmap stops refining
+
+# Fill-order weight of each cell in weighted playouts: lines through it
+CELL_WEIGHTS = np.array([len(lines) for lines in CELL_LINE_INDICES], dtype=np.float64)
+_NEVER = NUM_CELLS  # Completion time of a line nobody completes
+
+
+def run_playouts(cells, mover, candidates, playouts, rng, weighted=True):
+    """
+    Play random games from a position, starting with each candidate move.
+
+    Args:
+        cells: (64,) position, not yet won
+        mover: Side to move
+        candidates: Empty cell indices to try as the first move
+        playouts: Games per candidate
+        rng: np.random.Generator
+        weighted: Prefer cells on more lines (7-line cells about 1.75x as likely
+            to be picked next as 4-line cells) instead of uniform random play
+
+    Returns:
+        tuple: (wins, draws) arrays with one count per candidate, for mover
+    """
+    cells = np.asarray(cells, dtype=np.int8)
+    candidates = np.asarray(candidates, dtype=np.intp)
+    opponent = PLAYER_O if mover == PLAYER_X else PLAYER_X
+    games = len(candidates) * playouts
+    rows = np.arange(games)
+    first = np.repeat(candidates, playouts)
+    occupied = cells != EMPTY
+
+    # Fill order: sort random keys, the first move forced to the front
+    if weighted:
+        # Gumbel top-k: sorting log-weights plus Gumbel noise samples without replacement
+        keys = -(np.log(CELL_WEIGHTS) + rng.gumbel(size=(games, NUM_CELLS)))
+    else:
+        keys = rng.random((games, NUM_CELLS))
+    keys[:, occupied] = np.inf
+    keys[rows, first] = -np.inf
+    order = np.argsort(keys, axis=1)
+
+    # times[g, c]: ply at which cell c is filled in game g (-1 if already occupied)
+    times = np.empty((games, NUM_CELLS), dtype=np.int16)
+    times[rows[:, None], order] = np.arange(NUM_CELLS, dtype=np.int16)
+    times[:, occupied] = -1
+    owners = np.where(times % 2 == 0, mover, opponent).astype(np.int8)
+    owners[:, occupied] = cells[occupied]
+
+    line_times = times[:, LINE_INDEX_ARRAY].max(axis=2)
+    line_owners = owners[:, LINE_INDEX_ARRAY]
+    finish = {}
+    for player in (mover, opponent):
+        complete = (line_owners == player).all(axis=2)
+        finish[player] = np.where(complete, line_times, _NEVER).min(axis=1)
+
+    won = (finish[mover] < finish[opponent]).reshape(len(candidates), playouts)
+    drawn = ((finish[mover] == _NEVER) & (finish[opponent] == _NEVER)).reshape(len(candidates), playouts)
+    return won.sum(axis=1), drawn.sum(axis=1)
+
+
+class HeatmapAnalyzer:
+    """
+    Background thread refining per-cell win rates for the current position.
+    """
+
+    def __init__(self, batch_playouts=BATCH_PLAYOUTS, target_playouts=TARGET_PLAYOUTS, weighted=True, seed=None):
+        """
+        Initialize the analyzer (call start() to begin working).
+
+        Args:
+            batch_playouts: Playouts per cell in each batch
+            target_playouts: Playouts per cell after which refinement stops
+            weighted: Use line-weighted instead of uniform playouts
+            seed: Random seed
+        """
+        self.batch_playouts = batch_playouts
+        self.target_playouts = target_playouts
+        self.weighted = weighted
+        self.rng = np.random.default_rng(seed)
+
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.key = None  # (zobrist key, move count) of the analyzed position
+        self.cells = None
+        self.mover = None
+        self.candidates = None
+        self.wins = np.zeros(NUM_CELLS)
+        self.draws = np.zeros(NUM_CELLS)
+        self.playouts = 0  # Per candidate, for the current position
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Start the background thread."""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._work_loop, name="heatmap", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the background thread."""
+        with self.lock:
+            self.running = False
+            self.changed.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def set_position(self, board):
+        """
+        Analyze board's position from now on (no-op if it is unchanged).
+
+        Args:
+            board: Board instance
+        """
+        key = (board.zobrist_key, board.move_count)
+        with self.lock:
+            if key == self.key:
+                return
+            self.key = key
+            self.wins[:] = 0
+            self.draws[:] = 0
+            self.playouts = 0
+            if board.game_status == STATE_PLAYING:
+                self.cells = board.cells.copy()
+                self.mover = board.current_player
+                self.candidates = np.flatnonzero(self.cells == EMPTY)
+            else:
+                self.cells = None
+            self.changed.notify_all()
+
+    def get_rates(self):
+        """
+        Current estimates, for drawing.
+
+        Returns:
+            tuple: ((64,) win rates for the side to move, counting draws as
+            half, NaN for occupied cells or before the first batch; playouts
+            per cell so far)
+        """
+        with self.lock:
+            rates = np.full(NUM_CELLS, np.nan)
+            if self.cells is not None and self.playouts:
+                rates[self.candidates] = ((self.wins[self.candidates] + 0.5 * self.draws[self.candidates])
+                                          / self.playouts)
+            return rates, self.playouts
+
+    def _work_loop(self):
+        """Run playout batches while there is an unconverged position."""
+        while True:
+            with self.lock:
+                while self.running and (self.cells is None or self.playouts >= self.target_playouts):
+                    self.changed.wait()
+                if not self.running:
+                    return
+                key, cells, mover, candidates = self.key, self.cells, self.mover, self.candidates
+
+            # NumPy releases the GIL in its sorts and gathers, so the UI keeps drawing
+            wins, draws = run_playouts(cells, mover, candidates, self.batch_playouts, self.rng, self.weighted)
+
+            with self.lock:
+                if key == self.key:  # Discard batches for a position that has since changed
+                    self.wins[candidates] += wins
+                    self.draws[candidates] += draws
+                    self.playouts += self.batch_playouts
@@ -0,0 +1,608 @@
+"""
+LogiQube - Crash-Safe Game Journal
+Append-only log of every accepted move across many concurrent game sessions,
+so a hosting process can rebuild all live boards after a crash.
+
+Each move, undo or session close is one fixed-size binary frame
+(type, session id, ply, cell index, CRC32). A background thread writes and
+fsyncs frames in groups: the first frame of a group waits at most max_delay
+seconds for others to join it, so one fsync covers every move made in that
+window. Callers that need durability block until their frame's group is on
+disk.
+
+Every compact_every frames the live sessions are written to a snapshot and
+the journal restarts empty. Snapshot and journal carry an epoch number, so a
+crash midway through compaction never replays moves twice.
+
+Usage:
+    python -m src.journal /tmp/journal --sessions 1000 --moves 100000 --threads 16
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+
+from src.board import Board
+from src.constants import STATE_PLAYING
+from src.winning_lines import position_to_index
+
+DEFAULT_MAX_DELAY = 0.002  # Seconds the first frame of a group waits for company
+DEFAULT_MAX_BATCH = 4096  # Frames that trigger an fsync without waiting
+DEFAULT_COMPACT_EVERY = 1_000_000  # Frames between snapshots
+
+JOURNAL_FILE = "journal.bin"
+SNAPSHOT_FILE = "snapshot.bin"
+
+# Frame types
+FRAME_MOVE = 1
+FRAME_UNDO = 2
+FRAME_CLOSE = 3
+
+_JOURNAL_HEADER = struct.Struct("<4sQ")  # magic, epoch
+_JOURNAL_MAGIC = b"LQJN"
+_FRAME_BODY = struct.Struct("<BIBB")  # type, session, ply, cell
+_FRAME = struct.Struct("<BIBBI")  # body + CRC32 of the body
+_SNAPSHOT_HEADER = struct.Struct("<4sQI")  # magic, epoch, session count
+_SNAPSHOT_MAGIC = b"LQSN"
+_SNAPSHOT_SESSION = struct.Struct("<IB")  # session, move count (cells follow)
+
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+
+class JournalError(Exception):
+    """Raised when a journal or snapshot file is unreadable or inconsistent."""
+
+
+def _encode_frame(frame_type, session, ply, cell):
+    """Pack one frame."""
+    body = _FRAME_BODY.pack(frame_type, session, ply, cell)
+    return body + struct.pack("<I", zlib.crc32(body))
+
+
+def _fsync_directory(directory):
+    """Make a rename inside directory durable (no-op where unsupported)."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def apply_frame(sessions, frame_type, session, ply, cell):
+    """
+    Apply one frame to a session table.
+
+    Args:
+        sessions: Dict of session id to list of cell indices played
+        frame_type: FRAME_MOVE, FRAME_UNDO or FRAME_CLOSE
+        session: Session id
+        ply: Ply of the move made or taken back
+        cell: Cell index of the move (FRAME_MOVE only)
+
+    Raises:
+        JournalError: If the frame does not follow from the session's state
+    """
+    if frame_type == FRAME_CLOSE:
+        sessions.pop(session, None)
+        return
+
+    moves = sessions.setdefault(session, [])
+    if frame_type == FRAME_MOVE and ply == len(moves):
+        moves.append(cell)
+    elif frame_type == FRAME_UNDO and ply == len(moves) - 1:
+        moves.pop()
+    else:
+        raise JournalError(f"frame type {frame_type} at ply {ply} does not follow session {session} "
+                           f"with {len(moves)} moves")
+
+
+def read_snapshot(path):
+    """
+    Load a snapshot file.
+
+    Args:
+        path: Snapshot file
+
+    Returns:
+        tuple: (epoch, sessions), or (0, {}) if the file does not exist
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return 0, {}
+
+    if len(data) < _SNAPSHOT_HEADER.size + 4 or zlib.crc32(data[:-4]) != struct.unpack("<I", data[-4:])[0]:
+        raise JournalError(f"snapshot {path} is corrupt")
+    magic, epoch, count = _SNAPSHOT_HEADER.unpack_from(data)
+    if magic != _SNAPSHOT_MAGIC:
+        raise JournalError(f"{path} is not a LogiQube snapshot")
+
+    sessions = {}
+    offset = _SNAPSHOT_HEADER.size
+    for _ in range(count):
+        session, length = _SNAPSHOT_SESSION.unpack_from(data, offset)
+        offset += _SNAPSHOT_SESSION.size
+        sessions[session] = list(data[offset:offset + length])
+        offset += length
+    return epoch, sessions
+
+
+def write_snapshot(path, epoch, sessions):
+    """
+    Atomically replace a snapshot file.
+
+    Args:
+        path: Snapshot file
+        epoch: Epoch of the journal that will follow this snapshot
+        sessions: Dict of session id to list of cell indices
+    """
+    parts = [_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, epoch, len(sessions))]
+    for session, moves in sessions.items():
+        parts.append(_SNAPSHOT_SESSION.pack(session, len(moves)))
+        parts.append(bytes(moves))
+    data = b"".join(parts)
+    data += struct.pack("<I", zlib.crc32(data))
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def read_journal(path):
+    """
+    Read every intact frame of a journal file.
+
+    A crash mid-write can leave a torn frame at the end; reading stops at the
+    first frame that is short or fails its checksum.
+
+    Args:
+        path: Journal file
+
+    Returns:
+        tuple: (epoch or None if the file is missing or headerless,
+        list of (type, session, ply, cell) frames, byte length of the intact prefix)
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None, [], 0
+
+    if len(data) < _JOURNAL_HEADER.size:
+        return None, [], 0
+    magic, epoch = _JOURNAL_HEADER.unpack_from(data)
+    if magic != _JOURNAL_MAGIC:
+        raise JournalError(f"{path} is not a LogiQube journal")
+
+    frames = []
+    offset = _JOURNAL_HEADER.size
+    while offset + _FRAME.size <= len(data):
+        frame_type, session, ply, cell, checksum = _FRAME.unpack_from(data, offset)
+        if zlib.crc32(data[offset:offset + _FRAME_BODY.size]) != checksum:
+            break
+        frames.append((frame_type, session, ply, cell))
+        offset += _FRAME.size
+    return epoch, frames, offset
+
+
+class GameJournal:
+    """
+    Group-committed move journal for many concurrent game sessions.
+
+    Safe to call from any number of threads. Session ids are unsigned 32-bit
+    integers chosen by the caller; a finished or abandoned session should be
+    closed so it drops out of the next snapshot.
+    """
+
+    def __init__(self, directory, max_delay=DEFAULT_MAX_DELAY, max_batch=DEFAULT_MAX_BATCH,
+                 compact_every=DEFAULT_COMPACT_EVERY):
+        """
+        Open (or create) a journal directory, recovering any earlier state.
+
+        Args:
+            directory: Directory holding the journal and snapshot files
+            max_delay: Longest a frame waits for others before its group is fsynced
+            max_batch: Frames that make a group fsync immediately
+            compact_every: Frames written between snapshot compactions
+        """
+        self.directory = directory
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.compact_every = compact_every
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        os.makedirs(directory, exist_ok=True)
+
+        self.epoch, self.sessions = self._recover()
+
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.buffer = bytearray()
+        self.buffered_frames = 0
+        self.batch_started = 0.0
+        self.appended = 0  # Sequence number of the last frame appended
+        self.durable = 0  # Sequence number of the last frame on disk
+        self.since_compaction = 0
+        self.fsyncs = 0
+        self.closing = False
+        self.error = None
+
+        self.writer = threading.Thread(target=self._write_loop, name="journal-writer", daemon=True)
+        self.writer.start()
+
+    def _recover(self):
+        """
+        Rebuild the session table from the snapshot and journal, and reopen
+        the journal for appending after its last intact frame.
+
+        Returns:
+            tuple: (epoch, sessions)
+        """
+        epoch, sessions = read_snapshot(self.snapshot_path)
+        journal_epoch, frames, length = read_journal(self.journal_path)
+
+        if journal_epoch is not None and journal_epoch > epoch:
+            raise JournalError(f"journal epoch {journal_epoch} is newer than snapshot epoch {epoch}")
+        if journal_epoch == epoch:
+            for frame in frames:
+                apply_frame(sessions, *frame)
+            self.file = open(self.journal_path, "r+b")
+            self.file.truncate(length)  # Drop a torn final frame
+            self.file.seek(length)
+        else:
+            # Missing, or already folded into the snapshot by an interrupted compaction
+            self.file = self._new_journal(epoch)
+        return epoch, sessions
+
+    def _new_journal(self, epoch):
+        """Atomically replace the journal with an empty one for epoch."""
+        temporary = self.journal_path + ".tmp"
+        f = open(temporary, "w+b")
+        f.write(_JOURNAL_HEADER.pack(_JOURNAL_MAGIC, epoch))
+        f.flush()
+        os.fsync(f.fileno())
+        os.replace(temporary, self.journal_path)
+        _fsync_directory(self.directory)
+        return f
+
+    def boards(self):
+        """
+        Rebuild a Board for every live session.
+
+        Returns:
+            dict: Session id to Board
+        """
+        with self.lock:
+            sessions = {session: list(moves) for session, moves in self.sessions.items()}
+        return {session: replay(Board(), session, moves) for session, moves in sessions.items()}
+
+    def session_moves(self, session):
+        """
+        Cells played so far in a live session.
+
+        Args:
+            session: Session id
+
+        Returns:
+            list: Cell indices in move order (empty for an unknown session)
+        """
+        with self.lock:
+            return list(self.sessions.get(session, ()))
+
+    def record_move(self, session, ply, index, wait=True):
+        """
+        Journal an accepted move.
+
+        Args:
+            session: Session id
+            ply: Number of moves made before this one
+            index: Flat cell index of the move
+            wait: Block until the move is on disk
+
+        Returns:
+            int: Sequence number of the frame (see wait_durable)
+        """
+        return self._append(FRAME_MOVE, session, ply, index, wait)
+
+    def record_undo(self, session, ply, wait=True):
+        """
+        Journal a move being taken back.
+
+        Args:
+            session: Session id
+            ply: Ply of the move taken back
+            wait: Block until the undo is on disk
+
+        Returns:
+            int: Sequence number of the frame
+        """
+        return self._append(FRAME_UNDO, session, ply, 0, wait)
+
+    def close_session(self, session, wait=True):
+        """
+        Journal the end of a session; it will not be rebuilt after a restart.
+
+        Args:
+            session: Session id
+            wait: Block until the close is on disk
+
+        Returns:
+            int: Sequence number of the frame
+        """
+        return self._append(FRAME_CLOSE, session, 0, 0, wait)
+
+    def _append(self, frame_type, session, ply, cell, wait):
+        """Buffer one frame for the writer thread."""
+        frame = _encode_frame(frame_type, session, ply, cell)
+        with self.lock:
+            if self.error is not None:
+                raise JournalError("journal writer failed") from self.error
+            if self.closing:
+                raise JournalError("journal is closed")
+            apply_frame(self.sessions, frame_type, session, ply, cell)
+            if not self.buffered_frames:
+                self.batch_started = time.monotonic()
+            self.buffer += frame
+            self.buffered_frames += 1
+            self.appended += 1
+            sequence = self.appended
+            # Wake the writer for a new group, or early for a full one
+            if self.buffered_frames == 1 or self.buffered_frames >= self.max_batch:
+                self.changed.notify_all()
+        if wait:
+            self.wait_durable(sequence)
+        return sequence
+
+    def wait_durable(self, sequence):
+        """
+        Block until every frame up to sequence is on disk.
+
+        Args:
+            sequence: Value returned by record_move, record_undo or close_session
+        """
+        with self.lock:
+            while self.durable < sequence and self.error is None:
+                self.changed.wait()
+            if self.durable < sequence:
+                raise JournalError("journal writer failed") from self.error
+
+    def sync(self):
+        """Block until everything journaled so far is on disk."""
+        with self.lock:
+            sequence = self.appended
+        self.wait_durable(sequence)
+
+    def _write_loop(self):
+        """Writer thread: fsync buffered frames in groups, compacting periodically."""
+        try:
+            while True:
+                with self.lock:
+                    while not self.buffered_frames and not self.closing:
+                        self.changed.wait()
+                    if not self.buffered_frames:
+                        return
+                    # Give the group until its latency bound to fill up
+                    deadline = self.batch_started + self.max_delay
+                    while self.buffered_frames < self.max_batch and not self.closing:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.changed.wait(remaining)
+
+                    data = bytes(self.buffer)
+                    frames = self.buffered_frames
+                    sequence = self.appended
+                    self.buffer.clear()
+                    self.buffered_frames = 0
+
+                # Appends continue into the next group while this one is written
+                self.file.write(data)
+                self.file.flush()
+                _fdatasync(self.file.fileno())
+
+                with self.lock:
+                    self.fsyncs += 1
+                    self.durable = sequence
+                    self.since_compaction += frames
+                    if self.since_compaction >= self.compact_every:
+                        self._compact_locked()
+                    self.changed.notify_all()
+        except BaseException as e:
+            with self.lock:
+                self.error = e
+                self.changed.notify_all()
+            raise
+
+    def compact(self):
+        """Snapshot the live sessions now and start an empty journal."""
+        self.sync()
+        with self.lock:
+            self._compact_locked()
+            self.changed.notify_all()
+
+    def _compact_locked(self):
+        """
+        Write a snapshot and restart the journal (lock held).
+
+        Frames still buffered are covered by the snapshot, so they are
+        dropped rather than written to either journal.
+        """
+        epoch = self.epoch + 1
+        write_snapshot(self.snapshot_path, epoch, self.sessions)
+        self.file.close()
+        self.file = self._new_journal(epoch)
+        self.epoch = epoch
+        self.buffer.clear()
+        self.buffered_frames = 0
+        self.durable = self.appended
+        self.since_compaction = 0
+
+    def close(self):
+        """Flush everything to disk and stop the writer thread."""
+        with self.lock:
+            if self.closing:
+                return
+            self.closing = True
+            self.changed.notify_all()
+        self.writer.join()
+        self.file.close()
+        if self.error is not None:
+            raise JournalError("journal writer failed") from self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def replay(board, session, moves):
+    """
+    Play a session's recorded moves onto a fresh board without journaling them.
+
+    Args:
+        board: Empty Board (or JournaledBoard)
+        session: Session id, for error messages
+        moves: Cell indices in move order
+
+    Returns:
+        Board: The same board
+
+    Raises:
+        JournalError: If a recorded move is illegal
+    """
+    for ply, cell in enumerate(moves):
+        if not Board.make_move_index(board, cell):
+            raise JournalError(f"session {session} ply {ply}: cell {cell} is illegal")
+    return board
+
+
+class JournaledBoard(Board):
+    """
+    Board that journals every accepted move and undo under a session id.
+
+    Board and journal never disagree: a move or undo the journal refuses is
+    rolled back before the error propagates, and a reset closes the
+    session in the journal before the board is cleared, so the next game
+    under the same id starts again from ply 0.
+    """
+
+    def __init__(self, journal, session, wait=True):
+        """
+        Initialize an empty board bound to a journal session.
+
+        Args:
+            journal: GameJournal
+            session: Session id
+            wait: Block on each move until it is durable
+        """
+        self.journal = journal
+        self.session = session
+        self.wait = wait
+        super().__init__()
+
+    @classmethod
+    def restore(cls, journal, session, wait=True):
+        """
+        Rebuild a recovered session's board so play can continue on it.
+
+        Args:
+            journal: GameJournal the session was recovered from
+            session: Session id
+            wait: Block on each move until it is durable
+
+        Returns:
+            JournaledBoard: Board at the session's last journaled position
+        """
+        return replay(cls(journal, session, wait), session, journal.session_moves(session))
+
+    def reset(self):
+        # Board.__init__ resets before any move exists: nothing to journal then
+        if getattr(self, "move_count", 0):
+            self.journal.close_session(self.session, self.wait)
+        super().reset()
+
+    def make_move_index(self, index):
+        ply = self.move_count
+        if not super().make_move_index(index):
+            return False
+        try:
+            self.journal.record_move(self.session, ply, index, self.wait)
+        except BaseException:
+            super().undo_move()
+            raise
+        return True
+
+    def undo_move(self):
+        if not self.move_history:
+            return False
+        x, y, z, _ = self.move_history[-1]
+        if not super().undo_move():
+            return False
+        try:
+            self.journal.record_undo(self.session, self.move_count, self.wait)
+        except BaseException:
+            super().make_move_index(position_to_index(x, y, z))
+            raise
+        return True
+
+
+def main():
+    """Command-line entry point: measure durable move throughput."""
+    import argparse
+    import random
+
+    parser = argparse.ArgumentParser(description="LogiQube game journal benchmark")
+    parser.add_argument("directory", help="journal directory (created if missing)")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--moves", type=int, default=100000)
+    parser.add_argument("--threads", type=int, default=16, help="concurrent callers waiting on fsync")
+    parser.add_argument("--max-delay", type=float, default=DEFAULT_MAX_DELAY)
+    args = parser.parse_args()
+
+    journal = GameJournal(args.directory, max_delay=args.max_delay)
+    print(f"Recovered {len(journal.sessions)} live sessions")
+    # Continue numbering after any recovered sessions so their plies stay consistent
+    first_session = max(journal.sessions, default=-1) + 1
+
+    def play(thread_number):
+        rng = random.Random(thread_number)
+        sessions = {}
+        for _ in range(args.moves // args.threads):
+            session = first_session + thread_number + args.threads * rng.randrange(
+                max(1, args.sessions // args.threads))
+            board = sessions.get(session)
+            if board is None or board.game_status != STATE_PLAYING:
+                if board is not None:
+                    journal.close_session(session)
+                board = sessions[session] = Board()
+            cell = rng.choice(board.get_empty_indices())
+            ply = board.move_count
+            board.make_move_index(cell)
+            journal.record_move(session, ply, cell)
+
+    start_time = time.perf_counter()
+    threads = [threading.Thread(target=play, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start_time
+    journal.close()
+
+    moves = args.moves // args.threads * args.threads
+    print(f"{moves} durable moves in {seconds:.2f}s with {journal.fsyncs} fsyncs: "
+          f"{seconds / moves * 1e6:.0f}us per move, {moves / journal.fsyncs:.0f} moves per fsync")
+
+
+if __name__ == "__main__":
+    main()
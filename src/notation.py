@@ -0,0 +1,178 @@
+"""
+LogiQube - Position Notation
+Compact one-line text forms of a position, and bulk conversion between
+notation strings and (N, 64) int8 cell arrays.
+
+Position notation lists the 64 cells in flat index order (index =
+x + 4y + 16z) as '.', 'X' or 'O', then a space and the side to move:
+
+    X....O.......................................................... X
+
+Strings of just the 64 cells are also accepted; the side to move is then
+the one implied by the piece counts. A side given for a game in progress
+must match the piece counts; a finished game may name either side (Board
+writes the player who moved last). Move notation is the game's cell
+indices joined by commas ("21,42,0"), which also keeps the move order.
+
+The bulk functions never loop over characters in Python: strings are
+encoded to fixed-width bytes, viewed as a uint8 matrix and mapped through
+a 256-entry lookup table (and back), so millions of positions convert in
+seconds.
+"""
+
+import numpy as np
+
+from src.constants import EMPTY, PLAYER_X, PLAYER_O
+from src.winning_lines import NUM_CELLS, LINE_INDEX_ARRAY
+
+NOTATION_LENGTH = NUM_CELLS + 2  # Cells, a space and the side to move
+CELL_CHARS = {EMPTY: ".", PLAYER_X: "X", PLAYER_O: "O"}
+
+# Byte -> cell value ('x' and 'o' accepted too), -1 for any other byte
+_CELL_LOOKUP = np.full(256, -1, dtype=np.int8)
+for _value, _char in CELL_CHARS.items():
+    _CELL_LOOKUP[ord(_char)] = _value
+    _CELL_LOOKUP[ord(_char.lower())] = _value
+# Cell value -> byte
+_CHAR_CODES = np.array([ord(CELL_CHARS[value]) for value in (EMPTY, PLAYER_X, PLAYER_O)], dtype=np.uint8)
+# Everything move notation may contain
+_MOVE_CHARS = set("0123456789, ")
+
+
+def side_to_move(cells):
+    """
+    Side to move implied by the piece counts.
+
+    Args:
+        cells: (N, 64) or (64,) int8 array
+
+    Returns:
+        np.ndarray or int: PLAYER_X where both sides have as many pieces,
+        else PLAYER_O
+    """
+    cells = np.asarray(cells)
+    balance = (cells == PLAYER_X).sum(axis=-1) - (cells == PLAYER_O).sum(axis=-1)
+    return np.where(balance == 0, PLAYER_X, PLAYER_O).astype(np.int8)
+
+
+def notation_to_cells(strings):
+    """
+    Parse position notation strings in bulk.
+
+    Args:
+        strings: Sequence (or array) of N position strings, each 64 cell
+            characters optionally followed by a space and the side to move
+
+    Returns:
+        tuple: ((N, 64) int8 cells, (N,) int8 side to move)
+
+    Raises:
+        ValueError: Naming the first malformed string: wrong length, a bad
+            character, piece counts no game can reach, or a side to move
+            that contradicts the piece counts of a game in progress
+    """
+    # One byte past the longest valid string, so longer strings stand out
+    raw = np.asarray(strings, dtype=f"S{NOTATION_LENGTH + 1}")
+    if raw.ndim != 1:
+        raise ValueError("expected a sequence of position strings")
+    data = raw.view(np.uint8).reshape(len(raw), NOTATION_LENGTH + 1)
+
+    cells = _CELL_LOOKUP[data[:, :NUM_CELLS]]
+    has_side = data[:, NUM_CELLS] == ord(" ")
+    sides = _CELL_LOOKUP[data[:, NUM_CELLS + 1]]
+    bad = (cells < 0).any(axis=1) | (data[:, NOTATION_LENGTH] != 0)
+    bad |= np.where(has_side, sides <= EMPTY, (data[:, NUM_CELLS] != 0) | (data[:, NUM_CELLS + 1] != 0))
+    if bad.any():
+        row = int(np.flatnonzero(bad)[0])
+        raise ValueError(f"{_label(raw, row)} is not {NUM_CELLS} cell characters of '.', 'X' or 'O' "
+                         f"optionally followed by ' X' or ' O': {strings[row]!r}")
+
+    balance = (cells == PLAYER_X).sum(axis=1) - (cells == PLAYER_O).sum(axis=1)
+    bad = (balance < 0) | (balance > 1)
+    if bad.any():
+        row = int(np.flatnonzero(bad)[0])
+        raise ValueError(f"{_label(raw, row)}: X must have as many pieces as O, or one more")
+
+    implied = np.where(balance == 0, PLAYER_X, PLAYER_O).astype(np.int8)
+    # Only rows naming the other side need the (costlier) game-over test
+    mismatched = np.flatnonzero(has_side & (sides != implied))
+    if len(mismatched):
+        playing = ~_finished(cells[mismatched])
+        if playing.any():
+            row = int(mismatched[playing][0])
+            raise ValueError(f"{_label(raw, row)}: {CELL_CHARS[int(sides[row])]} cannot be to move "
+                             f"in a game in progress with these piece counts")
+    return cells, np.where(has_side, sides, implied).astype(np.int8)
+
+
+def _label(raw, row):
+    """Name a string in error messages ("position" alone when only one was given)."""
+    return "position" if len(raw) == 1 else f"position {row}"
+
+
+def _finished(cells):
+    """
+    Whether each position's game is over: a completed line, a full board,
+    or no line left that one player could still complete.
+
+    Args:
+        cells: (N, 64) int8 array
+
+    Returns:
+        np.ndarray: (N,) bool
+    """
+    line_cells = cells[:, LINE_INDEX_ARRAY]
+    has_x = (line_cells == PLAYER_X).any(axis=2)
+    has_o = (line_cells == PLAYER_O).any(axis=2)
+    won = ((line_cells == PLAYER_X).all(axis=2) | (line_cells == PLAYER_O).all(axis=2)).any(axis=1)
+    full = (cells != EMPTY).all(axis=1)
+    dead = (has_x & has_o).all(axis=1)
+    return won | full | dead
+
+
+def cells_to_notation(cells, sides=None):
+    """
+    Write position notation strings in bulk.
+
+    Args:
+        cells: (N, 64) array of EMPTY, PLAYER_X and PLAYER_O
+        sides: (N,) side to move per position, or None for the side implied
+            by the piece counts
+
+    Returns:
+        list: N position strings
+    """
+    cells = np.asarray(cells)
+    if sides is None:
+        sides = side_to_move(cells)
+    data = np.empty((len(cells), NOTATION_LENGTH), dtype=np.uint8)
+    data[:, :NUM_CELLS] = _CHAR_CODES[cells]
+    data[:, NUM_CELLS] = ord(" ")
+    data[:, NUM_CELLS + 1] = _CHAR_CODES[np.asarray(sides)]
+    return data.view(f"S{NOTATION_LENGTH}").ravel().astype(f"U{NOTATION_LENGTH}").tolist()
+
+
+def parse_move_notation(text):
+    """
+    Parse move notation.
+
+    Args:
+        text: Cell indices joined by commas; empty for no moves
+
+    Returns:
+        list: Flat cell indices, in move order
+
+    Raises:
+        ValueError: If an entry is not a cell index
+    """
+    if not text.strip():
+        return []
+    moves = [int(entry) for entry in text.split(",")]
+    if any(not 0 <= index < NUM_CELLS for index in moves):
+        raise ValueError(f"cell indices must be 0-{NUM_CELLS - 1}: {text!r}")
+    return moves
+
+
+def is_move_notation(text):
+    """Whether text is move notation rather than position notation."""
+    return set(text) <= _MOVE_CHARS
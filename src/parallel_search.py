@@ -0,0 +1,304 @@
+"""
+LogiQube - Lazy-SMP Parallel Search
+Several worker processes search the same root at staggered depths and share
+one lock-free transposition table placed in shared memory.
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.board import Board
+from src.search import Searcher, SearchResult, WIN_THRESHOLD
+
+# Entries in the shared transposition table (power of two)
+DEFAULT_TT_ENTRIES = 1 << 20
+
+# Packed entry layout inside the 64-bit data word
+_SCORE_BITS = 32
+_DEPTH_BITS = 8
+_FLAG_BITS = 2
+_MOVE_BITS = 7
+_SCORE_OFFSET = 1 << (_SCORE_BITS - 1)
+_NO_MOVE = 64
+_MASK_64 = (1 << 64) - 1
+
+
+class SharedTranspositionTable:
+    """
+    Transposition table stored in multiprocessing.shared_memory.
+
+    Each entry is two 64-bit words: the packed data and the position key
+    XOR-ed with that data. Readers recompute key ^ data and discard entries
+    that do not match, so a torn write from a concurrent writer can never be
+    mistaken for a valid entry and no locking is needed.
+    """
+
+    def __init__(self, shm, num_entries, owner):
+        """
+        Wrap an existing shared memory block (use create() or attach()).
+
+        Args:
+            shm: SharedMemory instance
+            num_entries: Number of entries (power of two)
+            owner: True if this process created the block and must unlink it
+        """
+        self.shm = shm
+        self.num_entries = num_entries
+        self.mask = num_entries - 1
+        self.owner = owner
+        self.checks = np.ndarray((num_entries,), dtype=np.uint64, buffer=shm.buf)
+        self.data = np.ndarray((num_entries,), dtype=np.uint64, buffer=shm.buf,
+                               offset=num_entries * 8)
+
+    @classmethod
+    def create(cls, num_entries=DEFAULT_TT_ENTRIES):
+        """
+        Allocate a new zeroed table.
+
+        Args:
+            num_entries: Number of entries, must be a power of two
+
+        Returns:
+            SharedTranspositionTable: Table owned by the calling process
+        """
+        if num_entries <= 0 or num_entries & (num_entries - 1):
+            raise ValueError(f"num_entries must be a power of two, got {num_entries}")
+        shm = shared_memory.SharedMemory(create=True, size=num_entries * 16)
+        table = cls(shm, num_entries, owner=True)
+        table.checks[:] = 0
+        table.data[:] = 0
+        return table
+
+    @classmethod
+    def attach(cls, name, num_entries):
+        """
+        Attach to a table created by another process.
+
+        Args:
+            name: Shared memory block name
+            num_entries: Number of entries the table was created with
+
+        Returns:
+            SharedTranspositionTable: Table view that does not own the block
+        """
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, num_entries, owner=False)
+
+    @property
+    def name(self):
+        """Name of the underlying shared memory block."""
+        return self.shm.name
+
+    def probe(self, key):
+        """
+        Look up a position.
+
+        Args:
+            key: Zobrist key of the position
+
+        Returns:
+            tuple: (depth, flag, score, move) or None if absent or corrupt
+        """
+        index = key & self.mask
+        data = int(self.data[index])
+        if data == 0 or int(self.checks[index]) ^ data != key:
+            return None
+        return _unpack(data)
+
+    def store(self, key, depth, flag, score, move):
+        """
+        Store a search result, replacing shallower entries for the same key
+        and any entry for a different key.
+
+        Args:
+            key: Zobrist key of the position
+            depth: Remaining depth the score was searched to
+            flag: TT_EXACT, TT_LOWER or TT_UPPER
+            score: Score from the side to move's point of view
+            move: Best (x, y, z) move found, or None
+        """
+        index = key & self.mask
+        old_data = int(self.data[index])
+        if old_data and int(self.checks[index]) ^ old_data == key:
+            if _unpack(old_data)[0] > depth:
+                return
+
+        data = _pack(depth, flag, score, move)
+        self.data[index] = data
+        self.checks[index] = (key ^ data) & _MASK_64
+
+    def close(self):
+        """Detach from the block, and free it if this process created it."""
+        # Drop the ndarray views first so the buffer can be released
+        self.checks = None
+        self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _pack(depth, flag, score, move):
+    """Pack an entry into a non-zero 64-bit word."""
+    move_index = _NO_MOVE if move is None else move[0] + 4 * move[1] + 16 * move[2]
+    word = score + _SCORE_OFFSET
+    word |= min(depth, (1 << _DEPTH_BITS) - 1) << _SCORE_BITS
+    word |= flag << (_SCORE_BITS + _DEPTH_BITS)
+    word |= move_index << (_SCORE_BITS + _DEPTH_BITS + _FLAG_BITS)
+    # Top bit marks the word as used so an all-zero slot is always empty
+    return word | (1 << 63)
+
+
+def _unpack(word):
+    """Unpack a 64-bit word into (depth, flag, score, move)."""
+    score = (word & ((1 << _SCORE_BITS) - 1)) - _SCORE_OFFSET
+    depth = (word >> _SCORE_BITS) & ((1 << _DEPTH_BITS) - 1)
+    flag = (word >> (_SCORE_BITS + _DEPTH_BITS)) & ((1 << _FLAG_BITS) - 1)
+    move_index = (word >> (_SCORE_BITS + _DEPTH_BITS + _FLAG_BITS)) & ((1 << _MOVE_BITS) - 1)
+    move = None if move_index == _NO_MOVE else (move_index % 4, (move_index // 4) % 4, move_index // 16)
+    return depth, flag, score, move
+
+
+def _worker(worker_id, tt_name, tt_entries, moves, max_depth, time_limit, stop_event, results):
+    """
+    Worker process: rebuild the root position and search it by iterative
+    deepening, reporting every completed depth.
+
+    Odd-numbered workers start one ply deeper so the workers do not all
+    search the same iteration at the same time.
+    """
+    tt = SharedTranspositionTable.attach(tt_name, tt_entries)
+    try:
+        board = Board()
+        for x, y, z in moves:
+            board.make_move(x, y, z)
+
+        searcher = Searcher(tt=tt, stop_event=stop_event)
+        start_depth = min(1 + worker_id % 2, max_depth)
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+
+        for depth in range(start_depth, max_depth + 1):
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                break
+            # One iteration per call so each finished depth is reported at once
+            result = searcher.search(board, depth, time_limit=remaining, start_depth=depth)
+            if result is None:
+                break
+            results.put((worker_id, result.depth, result.move, result.score, result.nodes))
+            if abs(result.score) >= WIN_THRESHOLD:
+                break
+    finally:
+        tt.close()
+        results.put((worker_id, None, None, None, None))
+
+
+def parallel_search(board, max_depth, time_limit=None, workers=None, tt_entries=DEFAULT_TT_ENTRIES):
+    """
+    Search a position with several worker processes sharing one transposition table.
+
+    Args:
+        board: Board instance (not modified)
+        max_depth: Deepest iteration to search
+        time_limit: Seconds allowed, or None for no limit
+        workers: Number of worker processes (defaults to the CPU count)
+        tt_entries: Shared transposition table size (power of two)
+
+    Returns:
+        SearchResult: The first proven win or loss reported by any worker
+        (which stops the others), else the result of the deepest completed
+        iteration across all workers (nodes summed over workers), or None
+        if no iteration finished
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    moves = [(x, y, z) for x, y, z, _ in board.move_history]
+    start_time = time.perf_counter()
+    context = mp.get_context()
+    stop_event = context.Event()
+    results = context.Queue()
+    tt = SharedTranspositionTable.create(tt_entries)
+    processes = []
+
+    try:
+        for worker_id in range(workers):
+            process = context.Process(
+                target=_worker,
+                args=(worker_id, tt.name, tt_entries, moves, max_depth, time_limit, stop_event, results),
+                daemon=True,
+            )
+            process.start()
+            processes.append(process)
+
+        best = None
+        proven = False  # Whether best is a proven win or loss
+        nodes_by_worker = {}
+        finished = 0
+        while finished < workers:
+            try:
+                worker_id, depth, move, score, nodes = results.get(timeout=0.1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+
+            if depth is None:
+                finished += 1
+                continue
+
+            nodes_by_worker[worker_id] = nodes_by_worker.get(worker_id, 0) + nodes
+            if abs(score) >= WIN_THRESHOLD:
+                # A proven win or loss is exact: keep it and stop the other workers
+                if not proven:
+                    best = (depth, move, score)
+                    proven = True
+                stop_event.set()
+            elif not proven and (best is None or depth > best[0]):
+                # Deeper wins; at equal depth keep the first reported result
+                best = (depth, move, score)
+
+            # Once any worker completes the full depth the others are redundant
+            if depth >= max_depth:
+                stop_event.set()
+
+        stop_event.set()
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        tt.close()
+
+    if best is None:
+        return None
+
+    depth, move, score = best
+    return SearchResult(move, score, depth, sum(nodes_by_worker.values()),
+                        time.perf_counter() - start_time)
+
+
+def main():
+    """Compare single-process and parallel search from the empty board."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="LogiQube Lazy-SMP search benchmark")
+    parser.add_argument("--time", type=float, default=5.0, help="seconds per search")
+    parser.add_argument("--depth", type=int, default=32, help="maximum depth")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    args = parser.parse_args()
+
+    board = Board()
+    single = Searcher().search(board, args.depth, time_limit=args.time)
+    print(f"single:   {single}")
+    parallel = parallel_search(board, args.depth, time_limit=args.time, workers=args.workers)
+    print(f"parallel: {parallel}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+LogiQube - Perft Tree Counting
+Counts the nodes of the full game tree to a fixed depth, measuring raw move
+generation and make/unmake speed independently of any evaluation, and
+serving as a correctness oracle for alternative board backends.
+
+Usage:
+    python -m src.perft --depth 3
+    python -m src.perft --depth 2 --moves "0,0,0 1,1,1" --unique --divide
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.bitboard import BitBoard
+from src.board import Board
+from src.constants import BOARD_SIZE, STATE_PLAYING
+from src.symmetry import NUM_CELLS, canonical_key
+
+# Board implementations perft can run on
+BACKENDS = {
+    "board": Board,
+    "bitboard": BitBoard,
+}
+
+
+def position_cells(board):
+    """
+    Flattened cell values of any backend, rebuilt from its move history.
+
+    Args:
+        board: Board or alternative backend
+
+    Returns:
+        np.ndarray: (64,) int8 array (index = x + 4y + 16z)
+    """
+    cells = np.zeros(NUM_CELLS, dtype=np.int8)
+    for x, y, z, player in board.move_history:
+        cells[x + BOARD_SIZE * y + BOARD_SIZE * BOARD_SIZE * z] = player
+    return cells
+
+
+def perft(board, depth, unique=None):
+    """
+    Count leaf nodes of the game tree below a position.
+
+    A node is a leaf when it is depth plies below the start or when the game
+    is over there (a win found by check_win, or a full board).
+
+    Args:
+        board: Board or alternative backend (restored on return)
+        depth: Plies to expand
+        unique: Optional set; canonical keys of the depth-d positions are added
+
+    Returns:
+        int: Number of leaf nodes
+    """
+    if depth == 0 or board.game_status != STATE_PLAYING:
+        if unique is not None and depth == 0:
+            unique.add(canonical_key(position_cells(board)))
+        return 1
+
+    nodes = 0
+    for x, y, z in board.get_empty_positions():
+        board.make_move(x, y, z)
+        nodes += perft(board, depth - 1, unique)
+        board.undo_move()
+    return nodes
+
+
+def _perft_subtree(args):
+    """
+    Worker: perft below one root move.
+
+    Args:
+        args: (backend name, move list, depth, count unique)
+
+    Returns:
+        tuple: (nodes, unique keys or None)
+    """
+    backend, moves, depth, count_unique = args
+    board = BACKENDS[backend]()
+    for move in moves:
+        board.make_move(*move)
+    unique = set() if count_unique else None
+    return perft(board, depth, unique), unique
+
+
+def divide(moves, depth, backend="board", count_unique=False, workers=None):
+    """
+    Run perft with each root move's subtree in its own process.
+
+    Args:
+        moves: Move list leading to the start position
+        depth: Plies to expand (at least 1)
+        backend: Key into BACKENDS
+        count_unique: Also count depth-d positions unique up to cube symmetry
+        workers: Worker processes (defaults to the CPU count)
+
+    Returns:
+        dict: "nodes", per-move "divide" counts, "unique" (or None),
+        "seconds" and "nodes_per_second"
+    """
+    board = BACKENDS[backend]()
+    for move in moves:
+        if not board.make_move(*move):
+            raise ValueError(f"Illegal move {move}")
+
+    start_time = time.perf_counter()
+    if depth == 0 or board.game_status != STATE_PLAYING:
+        unique = set() if count_unique else None
+        nodes = perft(board, depth, unique)
+        counts = {}
+    else:
+        root_moves = board.get_empty_positions()
+        tasks = [(backend, list(moves) + [move], depth - 1, count_unique) for move in root_moves]
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_perft_subtree, tasks))
+
+        counts = {move: nodes for move, (nodes, _) in zip(root_moves, results)}
+        nodes = sum(counts.values())
+        unique = None
+        if count_unique:
+            unique = set()
+            for _, keys in results:
+                unique.update(keys)
+    seconds = time.perf_counter() - start_time
+
+    return {
+        "nodes": nodes,
+        "divide": counts,
+        "unique": len(unique) if unique is not None else None,
+        "seconds": seconds,
+        "nodes_per_second": nodes / seconds if seconds > 0 else 0.0,
+    }
+
+
+def parse_moves(text):
+    """
+    Parse a move list such as "0,0,0 1,1,1".
+
+    Args:
+        text: Space-separated x,y,z triples
+
+    Returns:
+        list: (x, y, z) tuples
+    """
+    return [tuple(int(value) for value in move.split(",")) for move in text.split()]
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="LogiQube perft")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--moves", default="", help='start position, e.g. "0,0,0 1,1,1"')
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="board")
+    parser.add_argument("--unique", action="store_true", help="count positions unique up to symmetry")
+    parser.add_argument("--divide", action="store_true", help="print counts per root move")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    report = divide(parse_moves(args.moves), args.depth, args.backend, args.unique, args.workers)
+    if args.divide:
+        for move, nodes in report["divide"].items():
+            print(f"{move}: {nodes}")
+    print(f"perft({args.depth}) = {report['nodes']}")
+    if report["unique"] is not None:
+        print(f"unique positions = {report['unique']}")
+    print(f"{report['seconds']:.2f}s, {report['nodes_per_second']:.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+LogiQube - Persistent Position Cache
+On-disk cache of engine results keyed by symmetry-canonical position
+(see src/symmetry.py), stored in a local SQLite file.
+
+Entries are (best_move, score, depth, proven) tuples: best_move is a cell
+index in the canonical orientation (or None), score is from the side to
+move's point of view, and proven marks exact (win/loss/draw) results.
+
+The database runs in WAL mode so any number of worker processes can read
+while one writes. Each process must open its own PositionCache; connections
+cannot be shared across fork.
+"""
+
+import sqlite3
+import time
+
+DEFAULT_MAX_ENTRIES = 5_000_000
+DEFAULT_BATCH_SIZE = 1000  # Buffered writes before a bulk insert
+SQLITE_TIMEOUT = 30.0  # Seconds to wait for another process's write lock
+_SQL_VARIABLE_LIMIT = 500  # Keys per SELECT ... IN (...) statement
+
+
+class PositionCache:
+    """
+    Bounded SQLite position cache with batched writes and LRU-style eviction.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Open (or create) a cache file.
+
+        Args:
+            path: SQLite database file
+            max_entries: Entries kept before the least recently used are evicted
+            batch_size: Buffered puts and touches that trigger a flush
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path, timeout=SQLITE_TIMEOUT)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS positions ("
+            " key BLOB PRIMARY KEY,"
+            " best_move INTEGER,"
+            " score INTEGER NOT NULL,"
+            " depth INTEGER NOT NULL,"
+            " proven INTEGER NOT NULL,"
+            " last_used INTEGER NOT NULL"
+            ") WITHOUT ROWID")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS positions_last_used ON positions (last_used)")
+        self.connection.commit()
+
+        self.pending = {}  # key -> entry awaiting insert
+        self.touched = set()  # keys read since the last flush
+        self.estimated_count = self._count()
+
+    def get(self, key):
+        """
+        Look up one position.
+
+        Args:
+            key: Canonical position key (bytes)
+
+        Returns:
+            tuple: (best_move, score, depth, proven) or None
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys, min_depth=0):
+        """
+        Look up several positions.
+
+        Args:
+            keys: Iterable of canonical keys
+            min_depth: Ignore unproven entries searched shallower than this
+
+        Returns:
+            dict: Key to entry for the usable cached keys
+        """
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), _SQL_VARIABLE_LIMIT):
+            chunk = keys[start:start + _SQL_VARIABLE_LIMIT]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT key, best_move, score, depth, proven FROM positions WHERE key IN ({placeholders})",
+                chunk)
+            for key, best_move, score, depth, proven in rows:
+                found[bytes(key)] = (best_move, score, depth, bool(proven))
+
+        # Buffered entries not yet written take part as if they were
+        for key in keys:
+            entry = self.pending.get(key)
+            if entry is not None and _supersedes(entry, found.get(key)):
+                found[key] = entry
+
+        found = {key: entry for key, entry in found.items() if entry[3] or entry[2] >= min_depth}
+        self.touched.update(found)
+        if len(self.touched) >= self.batch_size:
+            self.flush()
+        return found
+
+    def put(self, key, entry):
+        """
+        Buffer one entry for writing.
+
+        Args:
+            key: Canonical position key
+            entry: (best_move, score, depth, proven)
+        """
+        self.put_many([(key, entry)])
+
+    def put_many(self, items):
+        """
+        Buffer several entries, flushing in bulk once the batch fills.
+
+        Args:
+            items: Iterable of (key, entry) pairs
+        """
+        for key, entry in items:
+            if _supersedes(entry, self.pending.get(key)):
+                self.pending[key] = entry
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered entries and access times in one transaction, then evict if over size."""
+        if not self.pending and not self.touched:
+            return
+
+        now = time.time_ns()
+        rows = [(key, best_move, score, depth, int(proven), now)
+                for key, (best_move, score, depth, proven) in self.pending.items()]
+        touched = [(now, key) for key in self.touched if key not in self.pending]
+
+        with self.connection:
+            # Same rule as _supersedes, applied against the stored row
+            self.connection.executemany(
+                "INSERT INTO positions (key, best_move, score, depth, proven, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET"
+                "  best_move = excluded.best_move, score = excluded.score,"
+                "  depth = excluded.depth, proven = excluded.proven, last_used = excluded.last_used"
+                " WHERE excluded.proven OR (NOT positions.proven AND excluded.depth >= positions.depth)",
+                rows)
+            self.connection.executemany("UPDATE positions SET last_used = ? WHERE key = ?", touched)
+
+        self.estimated_count += len(rows)
+        self.pending.clear()
+        self.touched.clear()
+
+        if self.estimated_count > self.max_entries:
+            self.evict()
+
+    def evict(self):
+        """Delete the least recently used entries beyond max_entries."""
+        count = self._count()
+        excess = count - self.max_entries
+        if excess > 0:
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM positions WHERE key IN"
+                    " (SELECT key FROM positions ORDER BY last_used LIMIT ?)", (excess,))
+            count -= excess
+        self.estimated_count = count
+
+    def _count(self):
+        """Exact number of stored entries."""
+        return self.connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def __len__(self):
+        self.flush()
+        return self._count()
+
+    def close(self):
+        """Flush buffered writes and close the database."""
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _supersedes(entry, existing):
+    """
+    Whether entry should replace existing: proven results always win,
+    otherwise the deeper search does.
+    """
+    if existing is None or entry[3]:
+        return True
+    return not existing[3] and entry[2] >= existing[2]
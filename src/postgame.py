@@ -0,0 +1,314 @@
+"""
+LogiQube - Post-Game Analysis
+Streams stored games, searches every position before and after each move
+in a process pool, and annotates missed wins, allowed double threats and
+blunders.
+
+Positions are deduplicated by symmetry-canonical key across all games and
+searched once, so common openings cost a dictionary lookup after the first
+game that reaches them.
+
+Usage:
+    python -m src.postgame game_records.jsonl --output annotations.jsonl
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.board import Board
+from src.constants import PLAYER_X, PLAYER_O, STATE_PLAYING, STATE_WIN
+from src.game_records import RESULT_NAMES, iter_games
+from src.position_cache import PositionCache
+from src.search import Searcher, WIN_SCORE, WIN_THRESHOLD
+from src.symmetry import canonical_form
+from src.winning_lines import NUM_CELLS, index_to_position, position_to_index
+
+DEFAULT_DEPTH = 3
+CHUNK_SIZE = 200  # Games analyzed together (and sharing one dispatch to the pool)
+BLUNDER_THRESHOLD = 50  # Evaluation drop that marks a move as a blunder
+
+# Per-process searcher so each worker keeps its transposition table between tasks
+_searcher = None
+
+
+class AnalysisCache:
+    """
+    In-memory cache of search results keyed by canonical position.
+
+    Entries are (best_move, score, depth, proven) tuples where best_move is a
+    cell index in the canonical orientation (or None) and score is from the
+    side to move's point of view.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def get_many(self, keys, min_depth=0):
+        """
+        Look up several positions.
+
+        Args:
+            keys: Iterable of canonical keys
+            min_depth: Ignore unproven entries searched shallower than this
+
+        Returns:
+            dict: Key to entry for the usable cached keys
+        """
+        found = {}
+        for key in keys:
+            entry = self.entries.get(key)
+            if entry is not None and (entry[3] or entry[2] >= min_depth):
+                found[key] = entry
+        return found
+
+    def put_many(self, items):
+        """
+        Store several entries.
+
+        Args:
+            items: Iterable of (key, entry) pairs
+        """
+        self.entries.update(items)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def search_position(args):
+    """
+    Worker: search one position.
+
+    Args:
+        args: (moves, depth)
+
+    Returns:
+        tuple: (best_move or None, score, depth, proven) with best_move as (x, y, z)
+    """
+    global _searcher
+    moves, depth = args
+    if _searcher is None:
+        _searcher = Searcher()
+
+    board = Board()
+    for move in moves:
+        board.make_move(*move)
+
+    if board.game_status == STATE_WIN:
+        return None, -WIN_SCORE, 0, True  # Side to move has lost
+    if board.game_status != STATE_PLAYING:
+        return None, 0, 0, True
+
+    result = _searcher.search(board, depth)
+    return result.move, result.score, result.depth, abs(result.score) >= WIN_THRESHOLD
+
+
+def game_tactics(moves):
+    """
+    Worker: immediate wins and double-threat moves for both players at every ply.
+
+    Args:
+        moves: Move list of one game
+
+    Returns:
+        list: One dict per position (len(moves) + 1) mapping "wins" and
+        "forks" to {player: set of (x, y, z)}
+    """
+    board = Board()
+    tactics = []
+    for ply in range(len(moves) + 1):
+        tactics.append({
+            "wins": {p: set(board.get_winning_moves(p)) for p in (PLAYER_X, PLAYER_O)},
+            "forks": {p: set(board.get_fork_moves(p)) for p in (PLAYER_X, PLAYER_O)},
+        })
+        if ply < len(moves):
+            board.make_move(*moves[ply])
+    return tactics
+
+
+def game_positions(moves):
+    """
+    Canonical key and orientation of every position in a game.
+
+    Args:
+        moves: Move list
+
+    Returns:
+        list: (key, perm) per position, from the empty board to the final one
+    """
+    cells = np.zeros(NUM_CELLS, dtype=np.int8)
+    positions = [canonical_form(cells)]
+    for ply, (x, y, z) in enumerate(moves):
+        cells[position_to_index(x, y, z)] = PLAYER_X if ply % 2 == 0 else PLAYER_O
+        positions.append(canonical_form(cells))
+    return positions
+
+
+def annotate_game(record, positions, entries, tactics):
+    """
+    Annotate every move of a game.
+
+    Args:
+        record: Game record
+        positions: From game_positions
+        entries: Canonical key to cache entry for every position of the game
+        tactics: From game_tactics
+
+    Returns:
+        dict: The record with an "annotations" list added
+    """
+    moves = record["moves"]
+    annotations = []
+
+    for ply, move in enumerate(moves):
+        player = PLAYER_X if ply % 2 == 0 else PLAYER_O
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        key_before, perm_before = positions[ply]
+        best_before, score_before, _, _ = entries[key_before]
+        # The next position is scored for the opponent; negate for the mover
+        score_after = -entries[positions[ply + 1][0]][1]
+        before = tactics[ply]
+        after = tactics[ply + 1]
+
+        tags = []
+        if before["wins"][player] and move not in before["wins"][player]:
+            tags.append("missed_win")
+        elif score_before >= WIN_THRESHOLD and score_after < WIN_THRESHOLD:
+            tags.append("missed_forced_win")
+
+        game_over = ply == len(moves) - 1 and record.get("result") is not None
+        if not game_over and not after["wins"][player] and (
+                len(after["wins"][opponent]) >= 2 or after["forks"][opponent]):
+            tags.append("allowed_double_threat")
+
+        if score_before - score_after >= BLUNDER_THRESHOLD or (
+                score_before > -WIN_THRESHOLD and score_after <= -WIN_THRESHOLD):
+            tags.append("blunder")
+
+        annotations.append({
+            "ply": ply,
+            "player": RESULT_NAMES[player],
+            "move": list(move),
+            "best_move": None if best_before is None else list(index_to_position(int(perm_before[best_before]))),
+            "score_before": score_before,
+            "score_after": score_after,
+            "tags": tags,
+        })
+
+    annotated = dict(record)
+    annotated["moves"] = [list(move) for move in moves]
+    annotated["annotations"] = annotations
+    return annotated
+
+
+class PostGameAnalyzer:
+    """
+    Batch analyzer sharing one position cache across every game it sees.
+    """
+
+    def __init__(self, depth=DEFAULT_DEPTH, workers=None, cache=None, chunk_size=CHUNK_SIZE):
+        """
+        Initialize the analyzer.
+
+        Args:
+            depth: Search depth per position
+            workers: Worker processes (defaults to the CPU count)
+            cache: Object with get_many/put_many, e.g. a PositionCache for a
+                persistent cache (defaults to an in-memory AnalysisCache)
+            chunk_size: Games read and dispatched together
+        """
+        self.depth = depth
+        self.cache = cache if cache is not None else AnalysisCache()
+        self.chunk_size = chunk_size
+        self.pool = ProcessPoolExecutor(workers)
+        self.positions_searched = 0
+        self.positions_seen = 0
+
+    def analyze(self, records):
+        """
+        Annotate a stream of game records.
+
+        Args:
+            records: Iterable of game records
+
+        Yields:
+            dict: Annotated records, in input order
+        """
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                yield from self._analyze_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield from self._analyze_chunk(chunk)
+
+    def _analyze_chunk(self, records):
+        """Search every position of a chunk not already cached, then annotate."""
+        all_positions = [game_positions(record["moves"]) for record in records]
+
+        # First occurrence of each position: its key, orientation and move prefix
+        wanted = {}
+        for record, positions in zip(records, all_positions):
+            for ply, (key, perm) in enumerate(positions):
+                if key not in wanted:
+                    wanted[key] = (perm, record["moves"][:ply])
+        self.positions_seen += len(wanted)
+
+        entries = self.cache.get_many(wanted, min_depth=self.depth)
+        missing = [key for key in wanted if key not in entries]
+        tasks = [(wanted[key][1], self.depth) for key in missing]
+        new_entries = []
+        for key, (move, score, depth, proven) in zip(missing, self.pool.map(search_position, tasks,
+                                                                              chunksize=16)):
+            if move is not None:
+                # Store the best move in the canonical orientation
+                perm = wanted[key][0]
+                move = int(np.flatnonzero(perm == position_to_index(*move))[0])
+            new_entries.append((key, (move, score, depth, proven)))
+        self.cache.put_many(new_entries)
+        entries.update(new_entries)
+        self.positions_searched += len(new_entries)
+
+        tactics = self.pool.map(game_tactics, [record["moves"] for record in records])
+        for record, positions, game in zip(records, all_positions, tactics):
+            yield annotate_game(record, positions, entries, game)
+
+    def close(self):
+        """Shut down the worker pool."""
+        self.pool.shutdown()
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="LogiQube post-game analysis")
+    parser.add_argument("games", help="game records file (JSON lines)")
+    parser.add_argument("--output", help="annotated output file (default: stdout)")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", help="persistent position cache file (SQLite)")
+    args = parser.parse_args()
+
+    cache = PositionCache(args.cache) if args.cache else None
+    analyzer = PostGameAnalyzer(depth=args.depth, workers=args.workers, cache=cache)
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for annotated in analyzer.analyze(iter_games(args.games)):
+            output.write(json.dumps(annotated) + "\n")
+    finally:
+        analyzer.close()
+        if cache is not None:
+            cache.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Searched {analyzer.positions_searched} of {analyzer.positions_seen} positions "
+          f"(the rest were cached)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
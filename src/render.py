@@ -0,0 +1,272 @@
+"""
+LogiQube - Offscreen Replay Rendering
+Renders recorded games to PNG thumbnails, PNG frame sequences or animated
+GIFs without a display, using the same plane layout as the game window.
+
+Rendering runs on plain surfaces with SDL's dummy video driver. The static
+background (title, planes, grid) and the X and O sprites are drawn once per
+process and reused for every frame of every game: a frame is the previous
+frame plus one blitted sprite and a redrawn status line, so no frame is
+drawn from scratch.
+
+GIF output needs Pillow, an optional dependency (pip install Pillow, see
+the README); PNG output needs only pygame.
+
+Usage:
+    python -m src.render game_records.jsonl renders/ --mode thumbnail --scale 0.25 --workers 8
+    python -m src.render game_records.jsonl renders/ --mode gif --scale 0.5 --limit 100
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from concurrent.futures import ProcessPoolExecutor
+
+from src.board import Board
+from src.constants import *
+from src.ui import GameUI
+from src.winning_lines import position_to_index
+
+RENDER_MODES = ("thumbnail", "frames", "gif")
+DEFAULT_FRAME_MS = 400  # GIF delay between moves
+FINAL_FRAME_MS = 2000  # GIF delay on the final position
+STATUS_HEIGHT = 120  # Band at the bottom holding the status text
+
+# Per-process renderer, so sprites and background are built once per worker
+_renderer = None
+
+
+class ReplayRenderer:
+    """
+    Draws the positions of a game onto one reusable offscreen surface.
+    """
+
+    def __init__(self, scale=1.0):
+        """
+        Build the background and sprites.
+
+        Args:
+            scale: Output size relative to the game window
+        """
+        self.scale = scale
+        self.size = (max(1, round(WINDOW_WIDTH * scale)), max(1, round(WINDOW_HEIGHT * scale)))
+        self.ui = GameUI(pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)))
+        self.frame = self.ui.screen
+
+        # Background: the empty board with the status band cleared
+        self.ui.draw_board(Board())
+        self.status_rect = pygame.Rect(0, WINDOW_HEIGHT - STATUS_HEIGHT - 40, WINDOW_WIDTH, STATUS_HEIGHT)
+        self.frame.fill(COLOR_BG, self.status_rect)
+        self.background = self.frame.copy()
+
+        # Sprites: an empty cell of the background with a piece drawn on it
+        empty_cell = self.background.subsurface(self.ui.get_cell_rect(0)).copy()
+        self.sprites = {}
+        for player, draw in ((PLAYER_X, self.ui._draw_x), (PLAYER_O, self.ui._draw_o)):
+            sprite = empty_cell.copy()
+            draw(sprite.get_rect(), sprite)
+            self.sprites[player] = sprite
+        self.cell_rects = [self.ui.get_cell_rect(index) for index in range(64)]
+
+    def frames(self, moves):
+        """
+        Replay a game, yielding the frame after each position.
+
+        The same surface is yielded every time and updated in place; copy
+        or save it before advancing.
+
+        Args:
+            moves: (x, y, z) moves, as in game records
+
+        Yields:
+            pygame.Surface: Output-sized frame, from the empty board to the final position
+        """
+        board = Board()
+        self.frame.blit(self.background, (0, 0))
+        self._draw_status(board)
+        yield self._output()
+        for move in moves:
+            index = position_to_index(*move)
+            player = board.current_player
+            board.make_move_index(index)
+            self.frame.blit(self.sprites[player], self.cell_rects[index])
+            self._draw_status(board)
+            if board.game_status == STATE_WIN:
+                self.ui.draw_winning_line(board)
+            yield self._output()
+
+    def render_final(self, moves):
+        """
+        Draw only the final position of a game.
+
+        Args:
+            moves: (x, y, z) moves
+
+        Returns:
+            pygame.Surface: Output-sized frame (reused by the next call)
+        """
+        board = Board()
+        self.frame.blit(self.background, (0, 0))
+        for move in moves:
+            index = position_to_index(*move)
+            self.frame.blit(self.sprites[board.current_player], self.cell_rects[index])
+            board.make_move_index(index)
+        self._draw_status(board)
+        self.ui.draw_winning_line(board)
+        return self._output()
+
+    def _draw_status(self, board):
+        """Redraw the status band for board."""
+        self.frame.blit(self.background, self.status_rect, self.status_rect)
+        self.ui._draw_status(board)
+
+    def _output(self):
+        """The current frame at output size."""
+        if self.scale == 1.0:
+            return self.frame
+        return pygame.transform.smoothscale(self.frame, self.size)
+
+    def save_thumbnail(self, moves, path):
+        """Save the final position of a game as a PNG."""
+        pygame.image.save(self.render_final(moves), path)
+
+    def save_frames(self, moves, directory):
+        """
+        Save every position of a game as numbered PNGs.
+
+        Returns:
+            int: Frames written
+        """
+        os.makedirs(directory, exist_ok=True)
+        count = 0
+        for count, frame in enumerate(self.frames(moves), 1):
+            pygame.image.save(frame, os.path.join(directory, f"frame_{count - 1:03d}.png"))
+        return count
+
+    def save_gif(self, moves, path, frame_ms=DEFAULT_FRAME_MS):
+        """
+        Save a game as an animated GIF.
+
+        Frames share one palette taken from the background and pieces, so
+        they are quantized without dithering and compress well.
+
+        Raises:
+            ImportError: If Pillow is not installed
+        """
+        Image = _require_pillow()
+
+        def to_image(surface):
+            return Image.frombytes("RGB", surface.get_size(), pygame.image.tobytes(surface, "RGB"))
+
+        palette = to_image(self._palette_source()).quantize(colors=64)
+        images = [to_image(frame).quantize(palette=palette, dither=Image.Dither.NONE)
+                  for frame in self.frames(moves)]
+        durations = [frame_ms] * (len(images) - 1) + [FINAL_FRAME_MS]
+        images[0].save(path, save_all=True, append_images=images[1:], duration=durations, loop=0,
+                       optimize=False)
+
+    def _palette_source(self):
+        """An output-sized frame containing every color a replay can show."""
+        board = Board()
+        self.frame.blit(self.background, (0, 0))
+        for player, index in ((PLAYER_X, 0), (PLAYER_O, 1)):
+            self.frame.blit(self.sprites[player], self.cell_rects[index])
+        self._draw_status(board)
+        pygame.draw.rect(self.frame, COLOR_WIN_LINE, self.cell_rects[2], 4)
+        return self._output()
+
+
+def _require_pillow():
+    """
+    Import Pillow's Image module for GIF output.
+
+    Raises:
+        ImportError: If Pillow is not installed
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("GIF output requires Pillow (pip install Pillow)") from None
+    return Image
+
+
+def _init_worker(scale):
+    """Pool initializer: build this process's renderer."""
+    global _renderer
+    _renderer = ReplayRenderer(scale)
+
+
+def _render_game(task):
+    """Worker: render one game; returns the path written."""
+    number, moves, output_dir, mode = task
+    if mode == "thumbnail":
+        path = os.path.join(output_dir, f"game_{number:06d}.png")
+        _renderer.save_thumbnail(moves, path)
+    elif mode == "frames":
+        path = os.path.join(output_dir, f"game_{number:06d}")
+        _renderer.save_frames(moves, path)
+    else:
+        path = os.path.join(output_dir, f"game_{number:06d}.gif")
+        _renderer.save_gif(moves, path)
+    return path
+
+
+def render_games(games, output_dir, mode="thumbnail", scale=0.5, workers=None):
+    """
+    Render many games in a process pool.
+
+    Args:
+        games: Iterable of game records (dicts with "moves")
+        output_dir: Directory for the output files (created if missing)
+        mode: "thumbnail" (final position PNG), "frames" (a PNG per
+            position) or "gif" (animated replay)
+        scale: Output size relative to the game window
+        workers: Worker processes (defaults to the CPU count)
+
+    Returns:
+        list: Paths written, in game order
+
+    Raises:
+        ImportError: For "gif" without Pillow, before any worker starts
+    """
+    if mode not in RENDER_MODES:
+        raise ValueError(f"unknown render mode {mode!r}")
+    if mode == "gif":
+        _require_pillow()
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = ((number, record["moves"], output_dir, mode) for number, record in enumerate(games))
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(scale,)) as pool:
+        return list(pool.map(_render_game, tasks, chunksize=16))
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+    import sys
+    import time
+    from itertools import islice
+
+    from src.game_records import iter_games
+
+    parser = argparse.ArgumentParser(description="LogiQube offscreen replay renderer")
+    parser.add_argument("records", help="game records file (JSON lines)")
+    parser.add_argument("output", help="output directory")
+    parser.add_argument("--mode", choices=RENDER_MODES, default="thumbnail")
+    parser.add_argument("--scale", type=float, default=0.5, help="size relative to the game window")
+    parser.add_argument("--limit", type=int, default=None, help="render only the first N games")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    paths = render_games(islice(iter_games(args.records), args.limit), args.output, args.mode, args.scale,
+                         args.workers)
+    elapsed = time.perf_counter() - start_time
+    print(f"Rendered {len(paths)} games in {elapsed:.1f}s "
+          f"({len(paths) / elapsed * 60:.0f} per minute)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
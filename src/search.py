@@ -0,0 +1,398 @@
+"""
+LogiQube - Game Tree Search
+Iterative-deepening negamax with alpha-beta pruning and a transposition table
+"""
+
+import time
+from src.constants import STATE_WIN, STATE_DRAW
+from src.evaluation import evaluate
+from src.telemetry import SearchStats
+from src.winning_lines import CELL_POSITIONS
+
+# Score of a won position; wins found sooner score higher
+WIN_SCORE = 100000
+# Scores beyond this are wins/losses at a known distance
+WIN_THRESHOLD = WIN_SCORE - 1000
+
+# Transposition table entry bounds
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+
+# How many nodes to search between node limit / stop checks
+CHECK_INTERVAL = 1024
+# Nodes between checks while a deadline is set. A node takes about 20us on
+# an idle core but far longer when many searches share it, so checking only
+# every CHECK_INTERVAL nodes can overshoot a deadline by 100ms or more.
+DEADLINE_CHECK_INTERVAL = 64
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the deadline passes or a stop is requested."""
+
+
+class TranspositionTable:
+    """
+    In-process transposition table keyed by the board's Zobrist hash.
+    """
+
+    def __init__(self):
+        """Initialize an empty table."""
+        self.entries = {}
+
+    def probe(self, key):
+        """
+        Look up a position.
+
+        Args:
+            key: Zobrist key of the position
+
+        Returns:
+            tuple: (depth, flag, score, move) or None if not stored
+        """
+        return self.entries.get(key)
+
+    def store(self, key, depth, flag, score, move):
+        """
+        Store a search result, keeping the deeper of old and new entries.
+
+        Args:
+            key: Zobrist key of the position
+            depth: Remaining depth the score was searched to
+            flag: TT_EXACT, TT_LOWER or TT_UPPER
+            score: Score from the side to move's point of view
+            move: Best (x, y, z) move found, or None
+        """
+        existing = self.entries.get(key)
+        if existing is None or depth >= existing[0]:
+            self.entries[key] = (depth, flag, score, move)
+
+    def clear(self):
+        """Remove all entries."""
+        self.entries.clear()
+
+
+class SearchResult:
+    """
+    Outcome of a search: the chosen move and how it was found.
+    """
+
+    def __init__(self, move, score, depth, nodes, elapsed, stats=None, candidates=None):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.stats = stats  # SearchStats when the searcher collects telemetry
+        # Root moves scoring within the requested margin of the best, as (move, score)
+        self.candidates = candidates if candidates is not None else [(move, score)]
+
+    def __repr__(self):
+        return (f"SearchResult(move={self.move}, score={self.score}, depth={self.depth}, "
+                f"nodes={self.nodes}, elapsed={self.elapsed:.3f})")
+
+
+class Searcher:
+    """
+    Alpha-beta searcher operating directly on a Board via make_move/undo_move.
+    """
+
+    def __init__(self, tt=None, stop_event=None, collect_stats=False, endgame=None):
+        """
+        Initialize the searcher.
+
+        Args:
+            tt: Transposition table (anything with probe/store); a private
+                TranspositionTable is created if None
+            stop_event: Optional multiprocessing/threading Event that aborts
+                the search when set
+            collect_stats: Attach a fresh SearchStats to every search
+            endgame: EndgameSolver that takes over once it applies to the
+                position, or None to always search heuristically
+        """
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.endgame = endgame
+        self.stop_event = stop_event
+        self.collect_stats = collect_stats
+        self.stats = None
+        self.nodes = 0
+        self.deadline = None
+        self.node_limit = None
+        self.next_check = CHECK_INTERVAL
+        self.root_margin = 0
+        self.root_scores = []
+        self.deadline_hit = False  # Whether the last search ran out of time
+
+    def search(self, board, max_depth, time_limit=None, start_depth=1, node_limit=None, root_margin=0,
+               soft_time_limit=None):
+        """
+        Search the position by iterative deepening.
+
+        Args:
+            board: Board instance (restored to its original state on return)
+            max_depth: Deepest iteration to search
+            time_limit: Seconds allowed, or None for no limit
+            start_depth: First iteration depth
+            node_limit: Nodes allowed, or None for no limit. Unlike the time
+                limit this stops at the same point on every run.
+            root_margin: Score exactly every root move within this margin of
+                the best (reported as SearchResult.candidates)
+            soft_time_limit: Seconds after which no new iteration is started
+                (the time limit still stops one in progress)
+
+        Returns:
+            SearchResult: Result of the deepest completed iteration (or of
+            the endgame solver), or None if the game is over or not even the
+            first iteration completed
+        """
+        start_time = time.perf_counter()
+        self.nodes = 0
+        self.deadline = start_time + time_limit if time_limit is not None else None
+        self.node_limit = node_limit
+        self.next_check = check_interval(self.deadline, node_limit)
+        self.root_margin = root_margin
+        self.deadline_hit = False
+        self.stats = stats = SearchStats() if self.collect_stats else None
+        previous_board_stats = board.stats
+        board.stats = stats
+        result = None
+
+        try:
+            if self.endgame is not None and self.endgame.applies(board):
+                result = self._solve_endgame(board, start_time, time_limit, root_margin)
+                if result is not None:
+                    return result
+
+            for depth in range(start_depth, max_depth + 1):
+                depth_start = time.perf_counter()
+                depth_nodes = self.nodes
+                try:
+                    move, score = self.search_root(board, depth)
+                except SearchTimeout:
+                    break
+                if move is None:
+                    break
+
+                now = time.perf_counter()
+                if stats is not None:
+                    stats.record_depth(depth, now - depth_start, self.nodes - depth_nodes)
+                candidates = sorted((entry for entry in self.root_scores if entry[1] >= score - root_margin),
+                                    key=lambda entry: -entry[1])
+                result = SearchResult(move, score, depth, self.nodes, now - start_time, stats, candidates)
+
+                # A proven win or loss will not change with more depth
+                if abs(score) >= WIN_THRESHOLD:
+                    break
+                if soft_time_limit is not None and now - start_time >= soft_time_limit:
+                    break
+        finally:
+            board.stats = previous_board_stats
+            if stats is not None:
+                stats.nodes = self.nodes
+                stats.finish()
+
+        return result
+
+    def _solve_endgame(self, board, start_time, time_limit, root_margin):
+        """
+        Solve the position exactly with the endgame solver, within its share
+        of the node and time budget.
+
+        Returns:
+            SearchResult: Exact result (depth is the number of empty cells),
+            or None if the solver ran out of budget or the game is over
+        """
+        endgame = self.endgame
+        node_limit = None if self.node_limit is None else int(self.node_limit * endgame.budget_share)
+        deadline = None if time_limit is None else start_time + time_limit * endgame.budget_share
+        try:
+            index, score, scores = endgame.solve(board, root_margin, node_limit, deadline, self.stop_event)
+        except SearchTimeout:
+            return None
+        finally:
+            self.nodes += endgame.nodes
+        if index is None:
+            return None
+        candidates = [(CELL_POSITIONS[cell], cell_score) for cell, cell_score in scores]
+        return SearchResult(CELL_POSITIONS[index], score, len(board.get_empty_indices()), self.nodes,
+                            time.perf_counter() - start_time, self.stats, candidates)
+
+    def search_root(self, board, depth):
+        """
+        Search all root moves to a fixed depth.
+
+        Args:
+            board: Board instance
+            depth: Depth in plies
+
+        Returns:
+            tuple: (best_move, score) or (None, score) if there are no moves
+        """
+        alpha = -WIN_SCORE - 1
+        beta = WIN_SCORE + 1
+        best_move = None
+        best_score = alpha
+        # Root moves are searched with alpha lowered by the margin, so scores
+        # within the margin of the best are exact rather than upper bounds
+        root_scores = []
+
+        for move in self._ordered_moves(board):
+            board.make_move(*move)
+            try:
+                score = -self._negamax(board, depth - 1, -beta, -(alpha - self.root_margin), 1)
+            finally:
+                board.undo_move()
+            root_scores.append((move, score))
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+
+        self.root_scores = root_scores
+
+        if best_move is not None:
+            self.tt.store(board.zobrist_key, depth, TT_EXACT, best_score, best_move)
+
+        return best_move, best_score
+
+    def _negamax(self, board, depth, alpha, beta, ply):
+        """
+        Negamax alpha-beta search.
+
+        Args:
+            board: Board instance
+            depth: Remaining depth in plies
+            alpha, beta: Search window
+            ply: Distance from the root
+
+        Returns:
+            int: Score from the side to move's point of view
+        """
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self._check_stop()
+
+        # Terminal positions: the previous move ended the game
+        if board.game_status == STATE_WIN:
+            return -(WIN_SCORE - ply)
+        if board.game_status == STATE_DRAW:
+            return 0
+
+        if depth <= 0:
+            return evaluate(board, board.current_player)
+
+        stats = self.stats
+        original_alpha = alpha
+        key = board.zobrist_key
+        entry = self.tt.probe(key)
+        tt_move = None
+        if stats is not None:
+            stats.tt_probes += 1
+        if entry is not None:
+            if stats is not None:
+                stats.tt_hits += 1
+            entry_depth, flag, score, tt_move = entry
+            if entry_depth >= depth:
+                score = score_from_tt(score, ply)
+                if (flag == TT_EXACT or (flag == TT_LOWER and score >= beta)
+                        or (flag == TT_UPPER and score <= alpha)):
+                    if stats is not None:
+                        stats.tt_cutoffs += 1
+                    return score
+
+        best_score = -WIN_SCORE - 1
+        best_move = None
+
+        for move_index, move in enumerate(self._ordered_moves(board, tt_move)):
+            board.make_move(*move)
+            try:
+                score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.undo_move()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if stats is not None:
+                    stats.record_cutoff(move_index)
+                break
+
+        if best_score <= original_alpha:
+            flag = TT_UPPER
+        elif best_score >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self.tt.store(key, depth, flag, score_to_tt(best_score, ply), best_move)
+
+        return best_score
+
+    def _ordered_moves(self, board, tt_move=None):
+        """
+        Yield moves with the transposition table move first, then the
+        board's staged forcing-first order.
+
+        Args:
+            board: Board instance
+            tt_move: Move suggested by the transposition table, or None
+
+        Yields:
+            tuple: (x, y, z) moves
+        """
+        if tt_move is not None and board.is_valid_move(*tt_move):
+            yield tt_move
+        for move in board.generate_moves():
+            if move != tt_move:
+                yield move
+
+    def _check_stop(self):
+        """Raise SearchTimeout if the node budget or deadline ran out or a stop was requested."""
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+        nodes_left = None if self.node_limit is None else self.node_limit - self.nodes
+        self.next_check = self.nodes + check_interval(self.deadline, nodes_left)
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.deadline_hit = True
+            raise SearchTimeout()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchTimeout()
+
+
+def check_interval(deadline, nodes_left=None):
+    """
+    Nodes to search before the next stop check.
+
+    Args:
+        deadline: Deadline of the search, or None
+        nodes_left: Nodes left in the budget, or None for no limit
+
+    Returns:
+        int: DEADLINE_CHECK_INTERVAL with a deadline, else CHECK_INTERVAL,
+        capped by the nodes left
+    """
+    interval = CHECK_INTERVAL if deadline is None else DEADLINE_CHECK_INTERVAL
+    return interval if nodes_left is None else min(interval, nodes_left)
+
+
+def score_to_tt(score, ply):
+    """Convert a win/loss score to be relative to the stored node."""
+    if score >= WIN_THRESHOLD:
+        return score + ply
+    if score <= -WIN_THRESHOLD:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    """Convert a stored win/loss score back to be relative to the root."""
+    if score >= WIN_THRESHOLD:
+        return score - ply
+    if score <= -WIN_THRESHOLD:
+        return score + ply
+    return score
+
@@ -0,0 +1,520 @@
+"""
+LogiQube - Distributed Exact Solver
+Proves the game-theoretic value (win/loss/draw with distance) of a position
+by splitting the tree below it into independent work units that any number
+of worker processes, on one or more machines, solve from a shared directory.
+
+The coordinator expands the tree split_depth plies deep, merging positions
+that are equal up to cube symmetry, so each distinct subtree becomes one
+work unit. Units are JSON files that workers claim by atomically renaming
+them from pending/ to claimed/; a worker keeps its claim's modification time
+fresh while solving and writes the result to done/. Claims whose worker
+died are returned to pending/ once their lease expires, by the coordinator
+on start and by any worker that finds the queue empty. Finished results
+are imported into a PositionCache (see src/position_cache.py), which,
+together with done/, is the checkpoint: restarting the coordinator re-queues
+only units that are neither solved nor in progress, and later solves of
+other positions reuse every proven subtree.
+
+Directory layout:
+    manifest.json     root moves and split depth
+    pending/          unit files waiting for a worker
+    claimed/          units being solved (<unit>.<worker>.json)
+    done/             solved units
+    results.sqlite    PositionCache of proven positions
+
+Usage:
+    python -m src.solve run /shared/solve --moves "0,0,0 1,1,1 3,3,3" --split 2 --workers 8
+    python -m src.solve worker /shared/solve       (on other machines)
+    python -m src.solve status /shared/solve
+"""
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+
+from src.board import Board
+from src.constants import STATE_PLAYING, STATE_WIN
+from src.endgame import EndgameSolver
+from src.position_cache import PositionCache
+from src.search import WIN_SCORE
+from src.symmetry import canonical_form
+from src.winning_lines import index_to_position, position_to_index
+
+MANIFEST_FILE = "manifest.json"
+RESULTS_FILE = "results.sqlite"
+DEFAULT_SPLIT_DEPTH = 2
+LEASE_SECONDS = 60.0  # Claims untouched for this long are assumed abandoned
+POLL_SECONDS = 0.5  # Idle workers' wait between queue scans
+
+
+def parent_score(child_score):
+    """
+    Convert an exact score of a child position to its parent's view.
+
+    Scores are WIN_SCORE - distance for a win in distance plies, its
+    negation for a loss and 0 for a draw; one ply further away, the winner
+    changes sides and the distance grows by one.
+
+    Args:
+        child_score: Exact score from the child's side to move
+
+    Returns:
+        int: Exact score from the parent's side to move
+    """
+    if child_score > 0:
+        return -child_score + 1
+    if child_score < 0:
+        return -child_score - 1
+    return 0
+
+
+def describe_score(score):
+    """Human-readable form of an exact score, e.g. "win in 7"."""
+    if score == 0:
+        return "draw"
+    distance = WIN_SCORE - abs(score)
+    return f"{'win' if score > 0 else 'loss'} in {distance}"
+
+
+def solve_board(board, solver=None):
+    """
+    Solve a position exactly on this process.
+
+    Args:
+        board: Board instance (restored on return)
+        solver: EndgameSolver whose memo is reused across calls, or None
+            for a fresh one
+
+    Returns:
+        tuple: (score, best move index or None, nodes)
+    """
+    if board.game_status == STATE_WIN:
+        return -WIN_SCORE, None, 0
+    if board.game_status != STATE_PLAYING:
+        return 0, None, 0
+    solver = solver if solver is not None else EndgameSolver()
+    best, score, _ = solver.solve(board)
+    return score, best, solver.nodes
+
+
+def _unit_name(key):
+    """File name stem of the unit for a canonical key."""
+    return hashlib.sha1(key).hexdigest()[:20]
+
+
+def _write_json(path, data):
+    """Write a JSON file atomically."""
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+
+class SolveCoordinator:
+    """
+    Splits a solve into work units, tracks them and assembles the result.
+    """
+
+    def __init__(self, directory, moves=(), split_depth=DEFAULT_SPLIT_DEPTH):
+        """
+        Open (or create) a solve directory.
+
+        An existing manifest takes precedence over moves and split_depth, so
+        a restarted coordinator continues the same solve.
+
+        Args:
+            directory: Shared solve directory
+            moves: Cell indices leading to the position to solve
+            split_depth: Plies expanded by the coordinator before units start
+        """
+        self.directory = directory
+        for name in ("pending", "claimed", "done"):
+            os.makedirs(os.path.join(directory, name), exist_ok=True)
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        else:
+            manifest = {"version": 1, "moves": [int(move) for move in moves], "split_depth": split_depth}
+            _write_json(manifest_path, manifest)
+        self.moves = manifest["moves"]
+        self.split_depth = manifest["split_depth"]
+        self.cache = PositionCache(os.path.join(directory, RESULTS_FILE))
+        self.nodes = {}  # Canonical key -> node dict of the split tree
+        self.root = None
+
+    def prepare(self):
+        """
+        Build the split tree and queue every unit that is not yet solved,
+        queued or claimed.
+
+        Returns:
+            int: Units newly queued
+        """
+        self._build()
+        queued = 0
+        for key, node in self.nodes.items():
+            if node["score"] is not None or node["children"] is not None:
+                continue
+            name = _unit_name(key)
+            if self._unit_state(name) is None:
+                _write_json(os.path.join(self.directory, "pending", f"{name}.json"),
+                            {"key": key.hex(), "moves": node["moves"]})
+                queued += 1
+        return queued
+
+    def _build(self):
+        """Import solved units and build the split tree, without queueing anything."""
+        self.collect()
+        board = Board()
+        for move in self.moves:
+            board.make_move_index(move)
+        self.nodes = {}
+        self.root = self._expand(board, self.split_depth)
+
+    def _expand(self, board, depth, moves=()):
+        """Add board's position (reached by moves) and its subtree to self.nodes; return its key."""
+        key = canonical_form(board.cells)[0]
+        if key in self.nodes:
+            return key
+        node = self.nodes[key] = {"moves": list(moves), "children": None, "score": None}
+
+        if board.game_status == STATE_WIN:
+            node["score"] = -WIN_SCORE
+        elif board.game_status != STATE_PLAYING:
+            node["score"] = 0
+        else:
+            entry = self.cache.get(key)
+            if entry is not None and entry[3]:
+                node["score"] = entry[1]
+            elif depth > 0:
+                node["children"] = []
+                for index in board.get_empty_indices():
+                    board.make_move_index(index)
+                    try:
+                        child = self._expand(board, depth - 1, moves + (index,))
+                    finally:
+                        board.undo_move()
+                    node["children"].append((index, child))
+        return key
+
+    def _unit_state(self, name):
+        """Where a unit is: "done", "pending", "claimed" or None."""
+        if os.path.exists(os.path.join(self.directory, "done", f"{name}.json")):
+            return "done"
+        if os.path.exists(os.path.join(self.directory, "pending", f"{name}.json")):
+            return "pending"
+        for claim in os.listdir(os.path.join(self.directory, "claimed")):
+            if claim.startswith(name + "."):
+                return "claimed"
+        return None
+
+    def requeue_stale(self, lease=LEASE_SECONDS):
+        """
+        Return claims whose worker stopped refreshing them to the queue.
+
+        Args:
+            lease: Seconds after which an untouched claim is abandoned
+
+        Returns:
+            int: Units requeued
+        """
+        return requeue_stale(self.directory, lease)
+
+    def collect(self):
+        """
+        Import solved units into the results table.
+
+        Returns:
+            int: Results imported
+        """
+        done = os.path.join(self.directory, "done")
+        items = []
+        for name in os.listdir(done):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(done, name)) as f:
+                result = json.load(f)
+            items.append((bytes.fromhex(result["key"]),
+                          (result["best_move"], result["score"], result["depth"], True)))
+        self.cache.put_many(items)
+        self.cache.flush()
+        return len(items)
+
+    def status(self):
+        """
+        Count units by state.
+
+        Returns:
+            dict: pending, claimed and done counts
+        """
+        return {name: sum(entry.endswith(".json") for entry in os.listdir(os.path.join(self.directory, name)))
+                for name in ("pending", "claimed", "done")}
+
+    def result(self):
+        """
+        Back solved units up the split tree to the root.
+
+        Proven values of interior positions are stored in the results table
+        too, so later solves that reach them stop there.
+
+        Only reads the units: nothing is queued, so it is safe to call while
+        (or instead of) running the solve.
+
+        Returns:
+            dict: score and best_move (cell index) of the root, and the exact
+            score of every root move, or None while units are outstanding
+        """
+        if self.root is None:
+            self._build()
+        else:
+            self.collect()
+        keys = list(self.nodes)
+        entries = self.cache.get_many(keys)
+        values = {}
+
+        def value(key):
+            if key in values:
+                return values[key]
+            node = self.nodes[key]
+            if node["score"] is not None:
+                score = node["score"]
+            elif node["children"] is None:
+                entry = entries.get(key)
+                score = entry[1] if entry is not None and entry[3] else None
+            else:
+                child_scores = [value(child) for _, child in node["children"]]
+                score = None if None in child_scores else max(parent_score(s) for s in child_scores)
+                if score is not None:
+                    best = node["children"][child_scores.index(max(child_scores, key=parent_score))][0]
+                    perm = canonical_form(self._board(node["moves"]).cells)[1]
+                    canonical_best = int(np.flatnonzero(perm == best)[0])
+                    self.cache.put(key, (canonical_best, score, 0, True))
+            values[key] = score
+            return score
+
+        score = value(self.root)
+        self.cache.flush()
+        if score is None:
+            return None
+        root = self.nodes[self.root]
+        if root["children"] is None:
+            entry = entries.get(self.root) or self.cache.get(self.root)
+            best_move = None
+            if entry is not None and entry[0] is not None:
+                best_move = int(canonical_form(self._board(()).cells)[1][entry[0]])
+            return {"score": score, "best_move": best_move, "moves": {}}
+        move_scores = {move: parent_score(values[child]) for move, child in root["children"]}
+        best_move = max(move_scores, key=move_scores.get)
+        return {"score": score, "best_move": best_move, "moves": move_scores}
+
+    def _board(self, moves):
+        """Board after the root moves plus moves."""
+        board = Board()
+        for move in self.moves + list(moves):
+            board.make_move_index(move)
+        return board
+
+    def close(self):
+        """Close the results table."""
+        self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def requeue_stale(directory, lease=LEASE_SECONDS):
+    """
+    Return claims whose worker stopped refreshing them to the queue.
+
+    Args:
+        directory: Shared solve directory
+        lease: Seconds after which an untouched claim is abandoned
+
+    Returns:
+        int: Units requeued
+    """
+    claimed = os.path.join(directory, "claimed")
+    requeued = 0
+    now = time.time()
+    for claim in os.listdir(claimed):
+        path = os.path.join(claimed, claim)
+        try:
+            if now - os.path.getmtime(path) < lease:
+                continue
+            name = claim.split(".", 1)[0]
+            os.replace(path, os.path.join(directory, "pending", f"{name}.json"))
+            requeued += 1
+        except FileNotFoundError:
+            pass  # Finished or requeued meanwhile
+    return requeued
+
+
+def run_worker(directory, worker_id=None, max_units=None, wait=False, lease=LEASE_SECONDS):
+    """
+    Claim and solve units from a solve directory until none are left.
+
+    Args:
+        directory: Shared solve directory
+        worker_id: Name used in claim files (defaults to host and pid)
+        max_units: Stop after this many units, or None
+        wait: Keep polling for new units instead of exiting when idle
+        lease: The coordinator's lease; claims are refreshed three times per
+            lease, and other workers' claims older than it are requeued
+            whenever the queue is empty
+
+    Returns:
+        int: Units solved
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        root_moves = json.load(f)["moves"]
+    pending = os.path.join(directory, "pending")
+    solver = EndgameSolver()  # Memo shared by this worker's units
+    solved = 0
+
+    while max_units is None or solved < max_units:
+        claim = None
+        for name in sorted(os.listdir(pending)):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(directory, "claimed", f"{name[:-5]}.{worker_id}.json")
+            try:
+                os.rename(os.path.join(pending, name), path)  # Atomic: one worker wins each unit
+            except FileNotFoundError:
+                continue
+            os.utime(path)
+            claim = (name[:-5], path)
+            break
+        if claim is None:
+            # Take over units whose worker died before giving up or waiting
+            if requeue_stale(directory, lease):
+                continue
+            if not wait:
+                break
+            time.sleep(POLL_SECONDS)
+            continue
+
+        name, path = claim
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(lease / 3):
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    return
+
+        thread = threading.Thread(target=heartbeat, daemon=True)
+        thread.start()
+        try:
+            with open(path) as f:
+                unit = json.load(f)
+            board = Board()
+            for move in root_moves + unit["moves"]:
+                board.make_move_index(move)
+            start_time = time.perf_counter()
+            score, best, nodes = solve_board(board, solver)
+            perm = canonical_form(board.cells)[1]
+            _write_json(os.path.join(directory, "done", f"{name}.json"), {
+                "key": unit["key"],
+                "score": score,
+                "best_move": None if best is None else int(np.flatnonzero(perm == best)[0]),
+                "depth": len(board.get_empty_indices()),
+                "nodes": nodes,
+                "elapsed": time.perf_counter() - start_time,
+                "worker": worker_id,
+            })
+        finally:
+            stop.set()
+            thread.join()
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        solved += 1
+
+    return solved
+
+
+def _worker_process(directory, worker_id):
+    """Process entry point for local workers."""
+    run_worker(directory, worker_id)
+
+
+def solve(directory, moves=(), split_depth=DEFAULT_SPLIT_DEPTH, workers=None):
+    """
+    Solve a position with local worker processes (resuming any earlier run).
+
+    Args:
+        directory: Solve directory
+        moves: Cell indices leading to the position (ignored when resuming)
+        split_depth: Plies expanded into units (ignored when resuming)
+        workers: Local worker processes (defaults to the CPU count)
+
+    Returns:
+        dict: See SolveCoordinator.result
+    """
+    import multiprocessing
+
+    with SolveCoordinator(directory, moves, split_depth) as coordinator:
+        coordinator.prepare()
+        coordinator.requeue_stale()
+        processes = [multiprocessing.Process(target=_worker_process, args=(directory, f"local{i}"))
+                     for i in range(workers or os.cpu_count() or 1)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return coordinator.result()
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+
+    from src.perft import parse_moves
+
+    parser = argparse.ArgumentParser(description="LogiQube distributed exact solver")
+    parser.add_argument("command", choices=("run", "prepare", "worker", "status"))
+    parser.add_argument("directory", help="shared solve directory")
+    parser.add_argument("--moves", default="", help='position to solve, e.g. "0,0,0 1,1,1"')
+    parser.add_argument("--split", type=int, default=DEFAULT_SPLIT_DEPTH, help="plies expanded into units")
+    parser.add_argument("--workers", type=int, default=None, help="local worker processes (run)")
+    parser.add_argument("--wait", action="store_true", help="keep polling for units (worker)")
+    args = parser.parse_args()
+    moves = [position_to_index(*move) for move in parse_moves(args.moves)]
+
+    if args.command == "worker":
+        print(f"Solved {run_worker(args.directory, wait=args.wait)} units")
+        return
+    if args.command == "run":
+        result = solve(args.directory, moves, args.split, args.workers)
+    else:
+        if args.command == "status" and not os.path.exists(os.path.join(args.directory, MANIFEST_FILE)):
+            parser.error(f"no solve in {args.directory}")
+        with SolveCoordinator(args.directory, moves, args.split) as coordinator:
+            if args.command == "prepare":
+                print(f"Queued {coordinator.prepare()} units")
+                return
+            print(coordinator.status())
+            result = coordinator.result()
+
+    if result is None:
+        print("Unsolved units remain")
+    else:
+        print(f"Value: {describe_score(result['score'])}")
+        if result["best_move"] is not None:
+            print(f"Best move: {index_to_position(result['best_move'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+LogiQube - Cube Symmetries
+The 48 rotations and reflections of the cube, used to map equivalent
+positions onto one canonical key.
+"""
+
+from itertools import permutations, product
+
+import numpy as np
+from src.constants import BOARD_SIZE
+from src.winning_lines import NUM_CELLS, index_to_position, position_to_index
+
+
+def generate_symmetries():
+    """
+    Generate every axis permutation combined with every set of axis flips.
+
+    Each symmetry is an index permutation perm over the flattened board
+    (index = x + 4y + 16z) such that transformed[j] = cells[perm[j]].
+
+    Returns:
+        np.ndarray: (48, 64) array of cell index permutations, identity first
+    """
+    last = BOARD_SIZE - 1
+    symmetries = []
+    for axes in permutations(range(3)):
+        for flips in product((False, True), repeat=3):
+            perm = []
+            for index in range(NUM_CELLS):
+                coords = index_to_position(index)
+                source = [coords[axes[axis]] for axis in range(3)]
+                source = [last - c if flip else c for c, flip in zip(source, flips)]
+                perm.append(position_to_index(*source))
+            symmetries.append(perm)
+    return np.array(symmetries, dtype=np.intp)
+
+
+def canonical_form(cells):
+    """
+    Find the canonical (lexicographically smallest) orientation of a position.
+
+    Args:
+        cells: Flattened board, 64 values (EMPTY, PLAYER_X, PLAYER_O)
+
+    Returns:
+        tuple: (key, perm) where key is the canonical position as bytes and
+        perm is the index permutation producing it; cell j of the canonical
+        position is cell perm[j] of the original
+    """
+    variants = np.asarray(cells, dtype=np.int8)[SYMMETRIES]
+    keys = [variant.tobytes() for variant in variants]
+    best = min(range(len(keys)), key=keys.__getitem__)
+    return keys[best], SYMMETRIES[best]
+
+
+def canonical_key(cells):
+    """
+    Get the symmetry-canonical key of a position.
+
+    Args:
+        cells: Flattened board, 64 values
+
+    Returns:
+        bytes: Key shared by all 48 symmetric variants of the position
+    """
+    return canonical_form(cells)[0]
+
+
+SYMMETRIES = generate_symmetries()
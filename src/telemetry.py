@@ -0,0 +1,177 @@
+"""
+LogiQube - Engine Telemetry
+Per-search counters collected by the search and board layers, exportable as
+JSON lines or Prometheus text-format files.
+
+Collection is opt-in: Searcher and Board only touch a stats object when one
+is attached, so a disabled search pays a single None check per hook.
+"""
+
+import json
+import os
+import time
+
+# Move index buckets for cutoff counting; later moves share the last bucket
+CUTOFF_BUCKETS = 16
+
+# Move generator stages (see Board.generate_moves)
+MOVEGEN_STAGES = ("wins", "blocks", "double_threats", "remaining")
+
+
+class SearchStats:
+    """
+    Counters for one search.
+    """
+
+    def __init__(self):
+        """Initialize all counters to zero."""
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.nodes = 0
+        self.forcing_nodes = 0  # Nodes where a win or forced block existed
+        self.cutoffs = [0] * CUTOFF_BUCKETS  # Beta cutoffs by move index
+        self.tt_probes = 0
+        self.tt_hits = 0  # Probes that found an entry for the position
+        self.tt_cutoffs = 0  # Probes whose entry ended the node outright
+        self.movegen_stages = [0] * len(MOVEGEN_STAGES)  # Times each stage was computed
+        self.depths = []  # (depth, seconds, nodes) per completed iteration
+
+    def record_cutoff(self, move_index):
+        """Count a beta cutoff caused by the move at move_index."""
+        self.cutoffs[min(move_index, CUTOFF_BUCKETS - 1)] += 1
+
+    def record_depth(self, depth, seconds, nodes):
+        """Record a completed iterative-deepening iteration."""
+        self.depths.append((depth, seconds, nodes))
+
+    def finish(self):
+        """Stop the search timer."""
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def nodes_per_second(self):
+        """Search speed over the whole search."""
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        """Fraction of transposition table probes that found an entry."""
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        """Fraction of cutoffs produced by the first move tried (move ordering quality)."""
+        total = sum(self.cutoffs)
+        return self.cutoffs[0] / total if total else 0.0
+
+    @property
+    def effective_branching_factor(self):
+        """Node growth between the last two completed iterations."""
+        if len(self.depths) < 2 or self.depths[-2][2] == 0:
+            return 0.0
+        return self.depths[-1][2] / self.depths[-2][2]
+
+    def to_dict(self):
+        """
+        Get all counters and derived metrics.
+
+        Returns:
+            dict: JSON-serializable statistics
+        """
+        return {
+            "elapsed": self.elapsed,
+            "nodes": self.nodes,
+            "nodes_per_second": self.nodes_per_second,
+            "forcing_nodes": self.forcing_nodes,
+            "cutoffs": list(self.cutoffs),
+            "first_move_cutoff_rate": self.first_move_cutoff_rate,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "tt_cutoffs": self.tt_cutoffs,
+            "tt_hit_rate": self.tt_hit_rate,
+            "effective_branching_factor": self.effective_branching_factor,
+            "movegen_stages": dict(zip(MOVEGEN_STAGES, self.movegen_stages)),
+            "depths": [{"depth": d, "seconds": s, "nodes": n} for d, s, n in self.depths],
+        }
+
+
+def write_jsonl(stats, path, **labels):
+    """
+    Append one search's statistics as a JSON line.
+
+    Args:
+        stats: SearchStats instance
+        path: File to append to
+        **labels: Extra fields to include (e.g. level="hard")
+    """
+    record = {"timestamp": time.time()}
+    record.update(labels)
+    record.update(stats.to_dict())
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def format_prometheus(stats, **labels):
+    """
+    Render one search's statistics in the Prometheus text exposition format.
+
+    Args:
+        stats: SearchStats instance
+        **labels: Labels attached to every sample
+
+    Returns:
+        str: Metrics text
+    """
+    base = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+
+    def sample(name, value, extra=""):
+        label_text = ",".join(part for part in (base, extra) if part)
+        return f"logiqube_search_{name}{{{label_text}}} {value}" if label_text else \
+            f"logiqube_search_{name} {value}"
+
+    lines = []
+
+    def gauge(name, help_text, value):
+        lines.append(f"# HELP logiqube_search_{name} {help_text}")
+        lines.append(f"# TYPE logiqube_search_{name} gauge")
+        lines.append(sample(name, value))
+
+    gauge("seconds", "Wall-clock time of the last search", stats.elapsed)
+    gauge("nodes", "Nodes searched by the last search", stats.nodes)
+    gauge("nodes_per_second", "Search speed of the last search", stats.nodes_per_second)
+    gauge("forcing_nodes", "Nodes with a win or forced block available", stats.forcing_nodes)
+    gauge("tt_probes", "Transposition table probes", stats.tt_probes)
+    gauge("tt_hits", "Transposition table probes that found an entry", stats.tt_hits)
+    gauge("tt_hit_rate", "Fraction of probes that found an entry", stats.tt_hit_rate)
+    gauge("effective_branching_factor", "Node growth between the last two iterations",
+          stats.effective_branching_factor)
+    gauge("depth", "Deepest completed iteration", stats.depths[-1][0] if stats.depths else 0)
+
+    lines.append("# HELP logiqube_search_cutoffs Beta cutoffs by move index")
+    lines.append("# TYPE logiqube_search_cutoffs gauge")
+    for index, count in enumerate(stats.cutoffs):
+        lines.append(sample("cutoffs", count, f'move_index="{index}"'))
+
+    lines.append("# HELP logiqube_search_depth_seconds Time spent per iteration depth")
+    lines.append("# TYPE logiqube_search_depth_seconds gauge")
+    for depth, seconds, _ in stats.depths:
+        lines.append(sample("depth_seconds", seconds, f'depth="{depth}"'))
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(stats, path, **labels):
+    """
+    Write one search's statistics as a Prometheus textfile-collector file.
+
+    The file is replaced atomically so a scraper never sees a partial write.
+
+    Args:
+        stats: SearchStats instance
+        path: Destination .prom file
+        **labels: Labels attached to every sample
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(format_prometheus(stats, **labels))
+    os.replace(temp_path, path)
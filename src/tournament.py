@@ -0,0 +1,391 @@
+"""
+LogiQube - Round-Robin Tournament
+Plays every pair of engine configurations against each other in a process
+pool, checkpointing each finished game so an interrupted run resumes where it
+stopped, and reports a crosstable with Bayesian Elo ratings.
+
+Each pairing plays games in color-swapped pairs from the same random
+opening, so neither side benefits from moving first more often. Games are
+submitted longest first (by node budget), so the slow pairings start early
+and short ones fill the gaps, rather than the pool idling behind one long
+match at the end. Game keys include a hash of both players' settings, so a
+checkpoint written with other settings under the same names is not reused.
+
+Usage:
+    python -m src.tournament --player easy=easy --player medium=medium \\
+        --player d3:nodes=5000,max_depth=3 --games 20 --checkpoint tournament.jsonl
+"""
+
+import json
+import math
+import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+
+import numpy as np
+
+from src.ai import AIPlayer, DIFFICULTY_LEVELS
+from src.board import Board
+from src.constants import AI_EASY, AI_MEDIUM, AI_HARD, PLAYER_X, PLAYER_O, STATE_PLAYING, STATE_WIN
+
+DEFAULT_GAMES_PER_PAIR = 10
+OPENING_PLIES = 2  # Random moves before the engines take over, shared by each color-swapped pair
+
+# Priors of the Bayesian Elo fit (Elo points)
+RATING_PRIOR = 400.0  # Standard deviation of ratings around 0
+ADVANTAGE_PRIOR = 100.0  # Standard deviation of the first-move advantage around 0
+DRAW_ELO_MEAN = 100.0  # Expected "draw width"
+DRAW_ELO_PRIOR = 100.0
+_ELO_SCALE = math.log(10) / 400
+
+
+def parse_player(spec):
+    """
+    Parse a command-line player spec.
+
+    Formats:
+        name=level                       a DIFFICULTY_LEVELS entry
+        name:key=value,key=value         custom settings on top of medium
+
+    Args:
+        spec: Player spec string
+
+    Returns:
+        dict: {"name": ..., "settings": {...}}
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    if ":" in spec:
+        name, options = spec.split(":", 1)
+        settings = dict(DIFFICULTY_LEVELS[AI_MEDIUM])
+        for option in options.split(","):
+            key, value = option.split("=", 1)
+            if key not in settings:
+                raise ValueError(f"unknown setting {key!r} in {spec!r}")
+            settings[key] = None if value == "none" else (float(value) if key == "time_limit" else int(value))
+    else:
+        name, level = spec.split("=", 1) if "=" in spec else (spec, spec)
+        if level not in DIFFICULTY_LEVELS:
+            raise ValueError(f"unknown level {level!r} in {spec!r}")
+        settings = dict(DIFFICULTY_LEVELS[level])
+    return {"name": name, "settings": settings}
+
+
+def schedule(players, games_per_pair):
+    """
+    List every game of the tournament, longest first.
+
+    Args:
+        players: Player dicts
+        games_per_pair: Games per pairing (rounded up to an even number)
+
+    Returns:
+        list: Game dicts with key, x, o (player dicts), opening seed and cost
+    """
+    games = []
+    for first, second in combinations(players, 2):
+        pairing = settings_hash(first, second)
+        for number in range(games_per_pair + games_per_pair % 2):
+            x, o = (first, second) if number % 2 == 0 else (second, first)
+            games.append({
+                "key": f"{first['name']}|{second['name']}|{number}|{pairing}",
+                "x": x,
+                "o": o,
+                # crc32 rather than hash(): string hashes change between runs, breaking resume
+                "opening": zlib.crc32(f"{first['name']}|{second['name']}|{number // 2}".encode()),
+                "cost": x["settings"]["nodes"] + o["settings"]["nodes"],
+            })
+    games.sort(key=lambda game: -game["cost"])
+    return games
+
+
+def settings_hash(*players):
+    """
+    Short stable hash of the players' settings and the opening length.
+
+    Args:
+        players: Player dicts
+
+    Returns:
+        str: 8 hex digits
+    """
+    settings = [player["settings"] for player in players] + [OPENING_PLIES]
+    return f"{zlib.crc32(json.dumps(settings, sort_keys=True).encode()):08x}"
+
+
+def play_game(game):
+    """
+    Worker: play one tournament game.
+
+    Args:
+        game: Game dict from schedule()
+
+    Returns:
+        dict: Checkpoint record with the key, player names, score for X
+        (1, 0.5 or 0) and moves
+    """
+    board = Board()
+    rng = random.Random(game["opening"])
+    for _ in range(OPENING_PLIES):
+        board.make_move(*rng.choice(board.get_empty_positions()))
+
+    players = {
+        PLAYER_X: AIPlayer(seed=game["opening"], settings=game["x"]["settings"]),
+        PLAYER_O: AIPlayer(seed=game["opening"] + 1, settings=game["o"]["settings"]),
+    }
+    while board.game_status == STATE_PLAYING:
+        board.make_move(*players[board.current_player].choose_move(board))
+
+    if board.game_status == STATE_WIN:
+        score = 1.0 if board.winner == PLAYER_X else 0.0
+    else:
+        score = 0.5
+    return {
+        "key": game["key"],
+        "x": game["x"]["name"],
+        "o": game["o"]["name"],
+        "score": score,
+        "moves": [[x, y, z] for x, y, z, _ in board.move_history],
+    }
+
+
+def load_checkpoint(path):
+    """
+    Read finished games, skipping a line truncated by a crash.
+
+    Args:
+        path: Checkpoint file (JSON lines), or None
+
+    Returns:
+        dict: Game key to record
+    """
+    finished = {}
+    if path is None:
+        return finished
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                finished[record["key"]] = record
+    except FileNotFoundError:
+        pass
+    return finished
+
+
+def truncate_partial_line(path):
+    """
+    Cut a line truncated by a crash off the end of a checkpoint, so records
+    appended on resume start on a line of their own.
+
+    Args:
+        path: Checkpoint file (missing files are left alone)
+    """
+    try:
+        with open(path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+    except FileNotFoundError:
+        pass
+
+
+def run_tournament(players, games_per_pair=DEFAULT_GAMES_PER_PAIR, checkpoint=None, workers=None,
+                   progress=None):
+    """
+    Play all games not already in the checkpoint.
+
+    Args:
+        players: Player dicts (see parse_player)
+        games_per_pair: Games per pairing
+        checkpoint: JSON lines file finished games are appended to, or None
+        workers: Worker processes (defaults to the CPU count)
+        progress: Optional callable(done, total) after each game
+
+    Returns:
+        list: Records of every game in the schedule
+    """
+    names = [player["name"] for player in players]
+    if len(set(names)) != len(names):
+        raise ValueError("player names must be unique")
+
+    games = schedule(players, games_per_pair)
+    finished = load_checkpoint(checkpoint)
+    pending = [game for game in games if game["key"] not in finished]
+
+    if pending:
+        output = None
+        if checkpoint is not None:
+            truncate_partial_line(checkpoint)
+            output = open(checkpoint, "a")
+        try:
+            with ProcessPoolExecutor(workers) as pool:
+                futures = [pool.submit(play_game, game) for game in pending]
+                for future in as_completed(futures):
+                    record = future.result()
+                    finished[record["key"]] = record
+                    if output is not None:
+                        output.write(json.dumps(record) + "\n")
+                        output.flush()
+                    if progress is not None:
+                        progress(len(finished), len(games))
+        finally:
+            if output is not None:
+                output.close()
+
+    return [finished[game["key"]] for game in games]
+
+
+def _log_posterior_gradient(params, x_index, o_index, scores, count):
+    """Gradient of the Bayesian Elo log posterior (see bayes_elo)."""
+    ratings, advantage, draw_elo = params[:count], params[count], params[count + 1]
+    delta = ratings[x_index] - ratings[o_index] + advantage
+    p_win = 1 / (1 + np.exp(-_ELO_SCALE * (delta - draw_elo)))
+    p_loss = 1 / (1 + np.exp(-_ELO_SCALE * (-delta - draw_elo)))
+    p_draw = np.maximum(1 - p_win - p_loss, 1e-12)
+    d_win = _ELO_SCALE * p_win * (1 - p_win)
+    d_loss = _ELO_SCALE * p_loss * (1 - p_loss)
+
+    # Derivatives of each game's log likelihood with respect to delta and draw_elo
+    won = scores == 1.0
+    lost = scores == 0.0
+    drawn = ~won & ~lost
+    g_delta = np.where(won, d_win / p_win, 0.0) - np.where(lost, d_loss / p_loss, 0.0) \
+        + np.where(drawn, (d_loss - d_win) / p_draw, 0.0)
+    g_draw = -np.where(won, d_win / p_win, 0.0) - np.where(lost, d_loss / p_loss, 0.0) \
+        + np.where(drawn, (d_win + d_loss) / p_draw, 0.0)
+
+    gradient = np.zeros_like(params)
+    np.add.at(gradient, x_index, g_delta)
+    np.add.at(gradient, o_index, -g_delta)
+    gradient[:count] -= ratings / RATING_PRIOR ** 2
+    gradient[count] = g_delta.sum() - advantage / ADVANTAGE_PRIOR ** 2
+    gradient[count + 1] = g_draw.sum() - (draw_elo - DRAW_ELO_MEAN) / DRAW_ELO_PRIOR ** 2
+    return gradient
+
+
+def bayes_elo(records, names, iterations=50):
+    """
+    Maximum a posteriori Elo ratings in the BayesElo model.
+
+    The model has a rating per player, a first-move advantage and a draw
+    width: X beats O with probability f(rX - rO + advantage - draw_elo), loses
+    with probability f(rO - rX - advantage - draw_elo) and draws otherwise,
+    where f is the Elo logistic curve. Gaussian priors keep ratings finite for
+    players who won or lost everything. Fitted by Newton's method, with the
+    Hessian taken from finite differences of the analytic gradient; its
+    inverse gives the reported uncertainties.
+
+    Args:
+        records: Game records with x, o and score
+        names: Player names
+        iterations: Newton steps
+
+    Returns:
+        dict: ratings (name -> Elo, mean 0), errors (name -> 1 sd),
+        advantage and draw_elo
+    """
+    count = len(names)
+    index = {name: i for i, name in enumerate(names)}
+    x_index = np.array([index[record["x"]] for record in records], dtype=np.intp)
+    o_index = np.array([index[record["o"]] for record in records], dtype=np.intp)
+    scores = np.array([record["score"] for record in records], dtype=np.float64)
+
+    params = np.zeros(count + 2)
+    params[count + 1] = DRAW_ELO_MEAN
+
+    def hessian(at):
+        step = 1e-3
+        base = _log_posterior_gradient(at, x_index, o_index, scores, count)
+        columns = []
+        for i in range(len(at)):
+            shifted = at.copy()
+            shifted[i] += step
+            columns.append((_log_posterior_gradient(shifted, x_index, o_index, scores, count) - base) / step)
+        matrix = np.array(columns)
+        return base, (matrix + matrix.T) / 2
+
+    for _ in range(iterations):
+        gradient, matrix = hessian(params)
+        step = np.linalg.solve(matrix, -gradient)
+        params += np.clip(step, -200, 200)  # Damp early steps far from the optimum
+        if np.abs(step).max() < 1e-6:
+            break
+
+    _, matrix = hessian(params)
+    covariance = np.linalg.inv(-matrix)
+    ratings = params[:count] - params[:count].mean()
+    return {
+        "ratings": {name: float(ratings[i]) for i, name in enumerate(names)},
+        "errors": {name: float(math.sqrt(max(covariance[i, i], 0.0))) for i, name in enumerate(names)},
+        "advantage": float(params[count]),
+        "draw_elo": float(params[count + 1]),
+    }
+
+
+def crosstable(records, names):
+    """
+    Format results as a text crosstable sorted by rating.
+
+    Args:
+        records: Game records
+        names: Player names
+
+    Returns:
+        str: Table with Elo, score and per-opponent win-draw-loss counts
+    """
+    elo = bayes_elo(records, names)
+    results = {(a, b): [0, 0, 0] for a in names for b in names}  # a's wins, draws, losses vs b
+    for record in records:
+        x, o, score = record["x"], record["o"], record["score"]
+        slot = {1.0: 0, 0.5: 1, 0.0: 2}[score]
+        results[(x, o)][slot] += 1
+        results[(o, x)][2 - slot] += 1
+
+    order = sorted(names, key=lambda name: -elo["ratings"][name])
+    width = max(8, max(len(name) for name in names))
+    lines = [f"{'#':>2} {'Player':<{width}} {'Elo':>6} {'+/-':>5} {'Score':>7}  "
+             + " ".join(f"{name[:width]:>{width}}" for name in order)]
+    for rank, name in enumerate(order, 1):
+        wins = sum(results[(name, other)][0] for other in names)
+        draws = sum(results[(name, other)][1] for other in names)
+        games = wins + draws + sum(results[(name, other)][2] for other in names)
+        score = (wins + 0.5 * draws) / games * 100 if games else 0.0
+        cells = []
+        for other in order:
+            cells.append("-" if other == name else "{}-{}-{}".format(*results[(name, other)]))
+        lines.append(f"{rank:>2} {name:<{width}} {elo['ratings'][name]:>6.0f} {elo['errors'][name]:>5.0f} "
+                     f"{score:>6.1f}%  " + " ".join(f"{cell:>{width}}" for cell in cells))
+    lines.append(f"First-move advantage {elo['advantage']:.0f} Elo, draw width {elo['draw_elo']:.0f} Elo")
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="LogiQube round-robin engine tournament")
+    parser.add_argument("--player", action="append", type=parse_player,
+                        help="name=level or name:key=value,... (repeatable, default: all levels)")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES_PER_PAIR, help="games per pairing")
+    parser.add_argument("--checkpoint", help="finished games file; rerun with it to resume")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    players = args.player or [parse_player(level) for level in (AI_EASY, AI_MEDIUM, AI_HARD)]
+
+    def progress(done, total):
+        print(f"\r{done}/{total} games", end="", file=sys.stderr, flush=True)
+
+    records = run_tournament(players, args.games, args.checkpoint, args.workers, progress)
+    print(file=sys.stderr)
+    print(crosstable(records, [player["name"] for player in players]))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,15 @@ LogiQube - Pygame User Interface
 Displays 4x4x4 board as 4 planes side-by-side
 """
 
+import math
 import pygame
 import sys
 from src.constants import *
 from src.board import Board
+from src.clock import format_time
+from src.cube_view import CubeView
+from src.heatmap import HeatmapAnalyzer
+from src.winning_lines import index_to_position, position_to_index
 
 
 class GameUI:
@@ -14,11 +19,20 @@ class GameUI:
     Handles all rendering and user interaction for LogiQube.
     """
 
-    def __init__(self):
-        """Initialize Pygame and UI components."""
+    def __init__(self, surface=None):
+        """
+        Initialize Pygame and UI components.
+
+        Args:
+            surface: Surface to draw on instead of opening a window (for
+                offscreen rendering, see src/render.py)
+        """
         pygame.init()
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("LogiQube - 4x4x4 Strategic Tic-Tac-Toe")
+        if surface is None:
+            self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+            pygame.display.set_caption("LogiQube - 4x4x4 Strategic Tic-Tac-Toe")
+        else:
+            self.screen = surface
         self.clock = pygame.time.Clock()
         self.font_large = pygame.font.Font(None, 48)
         self.font_medium = pygame.font.Font(None, 36)
@@ -30,6 +44,18 @@ class GameUI:
         # UI state
         self.hover_position = None  # (x, y, z) or None
         self.show_coordinates = False  # For debugging
+        self.show_heatmap = False  # Monte Carlo win-rate overlay
+        self.heatmap = None  # HeatmapAnalyzer, started the first time the overlay is shown
+        self.show_threats = False  # Winning, fork and open-2 cells of both players
+        self.view_mode = VIEW_PLANES
+        self.game_clock = None  # GameClock shown beside the status, for timed games
+        self.cube_view = None  # CubeView, created the first time the cube view is shown
+
+        # Threat overlay: highlight sprites drawn once, and the cells to mark,
+        # recomputed only when the position changes
+        self.threat_sprites = _make_threat_sprites()
+        self.threat_key = None  # (zobrist key, move count) the cached marks belong to
+        self.threat_marks = []  # (sprite, cell rect) pairs
 
     def _calculate_plane_positions(self):
         """
@@ -59,6 +85,22 @@ class GameUI:
         Returns:
             (x, y, z) tuple or None if not over a valid position
         """
+        index = self.get_index_from_mouse(mouse_pos)
+        return None if index is None else index_to_position(index)
+
+    def get_index_from_mouse(self, mouse_pos):
+        """
+        Convert mouse position to a flat cell index.
+
+        Args:
+            mouse_pos: (mouse_x, mouse_y) tuple
+
+        Returns:
+            int: Cell index (0-63), or None if not over a valid position
+        """
+        if self.view_mode == VIEW_CUBE:
+            return self.get_cube_view().pick(mouse_pos)
+
         mouse_x, mouse_y = mouse_pos
 
         # Check each plane
@@ -75,13 +117,29 @@ class GameUI:
                 x = (mouse_x - grid_x) // CELL_SIZE
                 y = (mouse_y - grid_y) // CELL_SIZE
 
-                return (x, y, z)
+                return position_to_index(x, y, z)
 
         return None
 
+    def get_cell_rect(self, index):
+        """
+        Screen rectangle of a cell.
+
+        Args:
+            index: Cell index (0-63)
+
+        Returns:
+            pygame.Rect
+        """
+        x, y, z = index_to_position(index)
+        plane_x, plane_y = self.plane_positions[z]
+        return pygame.Rect(plane_x + GRID_PADDING + x * CELL_SIZE, plane_y + GRID_PADDING + y * CELL_SIZE,
+                           CELL_SIZE, CELL_SIZE)
+
     def draw_board(self, board):
         """
-        Draw the entire game board with all 4 planes.
+        Draw the entire game board in the current view (the heatmap and
+        threat overlays are shown in the planes view only).
 
         Args:
             board: Board instance
@@ -94,20 +152,79 @@ class GameUI:
         title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 50))
         self.screen.blit(title, title_rect)
 
+        if self.view_mode == VIEW_CUBE:
+            hover = None if self.hover_position is None else position_to_index(*self.hover_position)
+            self.get_cube_view().draw(self.screen, board, hover)
+            self._draw_status(board)
+            return
+
+        # Latest heatmap estimates (refined in the background between frames)
+        heat = None
+        if self.show_heatmap:
+            if self.heatmap is None:
+                self.heatmap = HeatmapAnalyzer()
+                self.heatmap.start()
+            self.heatmap.set_position(board)
+            heat, _ = self.heatmap.get_rates()
+
         # Draw each plane
         for z in range(BOARD_SIZE):
-            self._draw_plane(board, z)
+            self._draw_plane(board, z, heat)
+
+        if self.show_threats:
+            self.screen.blits(self.get_threat_marks(board), doreturn=False)
 
         # Draw current player indicator
         self._draw_status(board)
 
-    def _draw_plane(self, board, z):
+    def toggle_view(self):
+        """Switch between the side-by-side planes and the isometric cube."""
+        self.view_mode = VIEW_CUBE if self.view_mode == VIEW_PLANES else VIEW_PLANES
+
+    def get_cube_view(self):
+        """The cube view, created on first use."""
+        if self.cube_view is None:
+            self.cube_view = CubeView(self.screen.get_size())
+        return self.cube_view
+
+    def get_threat_marks(self, board):
+        """
+        Highlights for every player's winning, fork and open-2 cells, cached
+        until the position changes.
+
+        Args:
+            board: Board instance
+
+        Returns:
+            list: (sprite, cell rect) pairs, ready for Surface.blits
+        """
+        key = (board.zobrist_key, board.move_count)
+        if key != self.threat_key:
+            self.threat_key = key
+            self.threat_marks = []
+            if board.game_status == STATE_PLAYING:
+                for player in (PLAYER_X, PLAYER_O):
+                    # Strongest kind first, so each cell is marked once per player
+                    marked = set()
+                    for kind, positions in ((THREAT_WIN, board.get_winning_moves(player)),
+                                            (THREAT_FORK, board.get_fork_moves(player)),
+                                            (THREAT_OPEN_TWO, board.get_threat_positions(player, 2))):
+                        for position in positions:
+                            index = position_to_index(*position)
+                            if index not in marked:
+                                marked.add(index)
+                                self.threat_marks.append((self.threat_sprites[player, kind],
+                                                          self.get_cell_rect(index)))
+        return self.threat_marks
+
+    def _draw_plane(self, board, z, heat=None):
         """
         Draw a single plane of the board.
 
         Args:
             board: Board instance
             z: Plane index (0-3)
+            heat: Optional (64,) win rates to shade empty cells by (NaN = none)
         """
         plane_x, plane_y = self.plane_positions[z]
 
@@ -136,6 +253,12 @@ class GameUI:
                     CELL_SIZE
                 )
 
+                # Draw heatmap shading
+                if heat is not None:
+                    rate = heat[position_to_index(x, y, z)]
+                    if not math.isnan(rate):
+                        pygame.draw.rect(self.screen, _heat_color(rate), cell_rect)
+
                 # Draw hover effect
                 if self.hover_position == (x, y, z) and board.is_valid_move(x, y, z):
                     pygame.draw.rect(self.screen, COLOR_HOVER, cell_rect)
@@ -155,21 +278,25 @@ class GameUI:
                     coord_text = self.font_small.render(f"{x},{y},{z}", True, COLOR_TEXT)
                     self.screen.blit(coord_text, (cell_rect.x + 2, cell_rect.y + 2))
 
-    def _draw_x(self, rect):
-        """Draw an X in the given cell rectangle."""
+    def _draw_x(self, rect, surface=None):
+        """Draw an X in the given cell rectangle (of surface, default the screen)."""
+        if surface is None:
+            surface = self.screen
         padding = 8
-        pygame.draw.line(self.screen, COLOR_X,
+        pygame.draw.line(surface, COLOR_X,
                         (rect.x + padding, rect.y + padding),
                         (rect.right - padding, rect.bottom - padding), 4)
-        pygame.draw.line(self.screen, COLOR_X,
+        pygame.draw.line(surface, COLOR_X,
                         (rect.right - padding, rect.y + padding),
                         (rect.x + padding, rect.bottom - padding), 4)
 
-    def _draw_o(self, rect):
-        """Draw an O in the given cell rectangle."""
+    def _draw_o(self, rect, surface=None):
+        """Draw an O in the given cell rectangle (of surface, default the screen)."""
+        if surface is None:
+            surface = self.screen
         center = rect.center
         radius = rect.width // 2 - 8
-        pygame.draw.circle(self.screen, COLOR_O, center, radius, 4)
+        pygame.draw.circle(surface, COLOR_O, center, radius, 4)
 
     def _draw_status(self, board):
         """
@@ -189,7 +316,10 @@ class GameUI:
             # Show winner
             winner_name = "X" if board.winner == PLAYER_X else "O"
             color = COLOR_X if board.winner == PLAYER_X else COLOR_O
-            text = self.font_medium.render(f"Player {winner_name} Wins!", True, color)
+            suffix = " on Time" if board.win_reason == WIN_ON_TIME else ""
+            text = self.font_medium.render(f"Player {winner_name} Wins{suffix}!", True, color)
+        elif board.draw_reason == DRAW_DEAD:
+            text = self.font_medium.render("Game Draw! (no winnable lines left)", True, COLOR_TEXT)
         else:  # STATE_DRAW
             text = self.font_medium.render("Game Draw!", True, COLOR_TEXT)
 
@@ -201,6 +331,23 @@ class GameUI:
         move_rect = move_text.get_rect(center=(WINDOW_WIDTH // 2, status_y + 40))
         self.screen.blit(move_text, move_rect)
 
+        if self.game_clock is not None:
+            self._draw_clocks(status_y)
+
+    def _draw_clocks(self, status_y):
+        """Draw both players' clocks either side of the status, the running one framed."""
+        for player, offset in ((PLAYER_X, -CLOCK_OFFSET), (PLAYER_O, CLOCK_OFFSET)):
+            seconds = self.game_clock.time_left(player)
+            name = "X" if player == PLAYER_X else "O"
+            color = COLOR_X if player == PLAYER_X else COLOR_O
+            if seconds < CLOCK_LOW_TIME:
+                color = COLOR_CLOCK_LOW
+            text = self.font_medium.render(f"{name}  {format_time(seconds)}", True, color)
+            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2 + offset, status_y))
+            self.screen.blit(text, text_rect)
+            if self.game_clock.running == player:
+                pygame.draw.rect(self.screen, color, text_rect.inflate(20, 10), 2)
+
     def draw_winning_line(self, board):
         """
         Highlight the winning line if game is won.
@@ -210,6 +357,9 @@ class GameUI:
         """
         if board.game_status != STATE_WIN or board.winning_line is None:
             return
+        if self.view_mode == VIEW_CUBE:
+            self.get_cube_view().draw_winning_line(self.screen, board)
+            return
 
         # Draw highlights on all cells in winning line
         for x, y, z in board.winning_line:
@@ -262,5 +412,33 @@ class GameUI:
 
     def quit(self):
         """Clean up and quit Pygame."""
+        if self.heatmap is not None:
+            self.heatmap.stop()
         pygame.quit()
         sys.exit()
+
+
+def _make_threat_sprites():
+    """
+    Pre-render the threat overlay's cell highlights.
+
+    X's marks are rings just inside the cell border and O's sit inside
+    those, so both players' marks on one cell stay visible.
+
+    Returns:
+        dict: (player, kind) to a transparent CELL_SIZE square surface
+    """
+    sprites = {}
+    for player, inset in ((PLAYER_X, 2), (PLAYER_O, 6)):
+        color = COLOR_X if player == PLAYER_X else COLOR_O
+        for kind, (width, alpha) in THREAT_STYLES.items():
+            sprite = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+            rect = pygame.Rect(inset, inset, CELL_SIZE - 2 * inset, CELL_SIZE - 2 * inset)
+            pygame.draw.rect(sprite, color + (alpha,), rect, width)
+            sprites[player, kind] = sprite
+    return sprites
+
+
+def _heat_color(rate):
+    """Blend from COLOR_HEAT_LOW to COLOR_HEAT_HIGH by win rate (0-1)."""
+    return tuple(int(low + (high - low) * rate) for low, high in zip(COLOR_HEAT_LOW, COLOR_HEAT_HIGH))
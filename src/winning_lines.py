@@ -4,10 +4,42 @@ Coordinates are in (x, y, z) format where:
 - x: column (0-3, left to right)
 - y: row (0-3, front to back)
 - z: plane/layer (0-3, bottom to top)
+
+Cells also have a flat index 0-63 (x + 4y + 16z, the C order of a
+[z][y][x] array), and every table here has an index-based counterpart.
 """
 
+import numpy as np
 from src.constants import BOARD_SIZE
 
+NUM_CELLS = BOARD_SIZE ** 3
+
+
+def position_to_index(x, y, z):
+    """
+    Convert (x, y, z) coordinates to a flat cell index.
+
+    Args:
+        x, y, z: Coordinates of the position
+
+    Returns:
+        int: Cell index in 0-63
+    """
+    return x + BOARD_SIZE * y + BOARD_SIZE * BOARD_SIZE * z
+
+
+def index_to_position(index):
+    """
+    Convert a flat cell index to (x, y, z) coordinates.
+
+    Args:
+        index: Cell index in 0-63
+
+    Returns:
+        tuple: (x, y, z)
+    """
+    return CELL_POSITIONS[index]
+
 
 def generate_winning_lines():
     """
@@ -130,9 +162,30 @@ def get_lines_containing_position(x, y, z):
     Returns:
         List of winning lines containing this position
     """
-    all_lines = WINNING_LINES
-    return [line for line in all_lines if (x, y, z) in line]
+    return POSITION_LINES[(x, y, z)]
+
+
+def build_position_lines(lines):
+    """
+    Build a lookup table of the winning lines passing through each position.
+
+    Args:
+        lines: List of winning lines
+
+    Returns:
+        dict: Maps each (x, y, z) position to the list of lines containing it
+    """
+    position_lines = {}
+    for z in range(BOARD_SIZE):
+        for y in range(BOARD_SIZE):
+            for x in range(BOARD_SIZE):
+                position_lines[(x, y, z)] = [line for line in lines if (x, y, z) in line]
+    return position_lines
+
 
+# (x, y, z) of each flat cell index
+CELL_POSITIONS = tuple((index % BOARD_SIZE, (index // BOARD_SIZE) % BOARD_SIZE, index // (BOARD_SIZE * BOARD_SIZE))
+                       for index in range(NUM_CELLS))
 
 # Generate and validate winning lines on module import
 WINNING_LINES = generate_winning_lines()
@@ -144,6 +197,31 @@ if not is_valid:
 # Print validation message for confirmation
 print(f"✓ {message}")
 
+# Lines through each position, precomputed so lookups never scan all 76 lines
+POSITION_LINES = build_position_lines(WINNING_LINES)
+
+# Winning lines as flat cell indices, and the same table as a (76, 4) array
+LINE_CELL_INDICES = tuple(tuple(position_to_index(x, y, z) for x, y, z in line) for line in WINNING_LINES)
+LINE_INDEX_ARRAY = np.array(LINE_CELL_INDICES, dtype=np.intp)
+
+# Indices into WINNING_LINES of the lines through each cell, in ascending order
+CELL_LINE_INDICES = tuple(
+    tuple(i for i, line in enumerate(LINE_CELL_INDICES) if cell in line) for cell in range(NUM_CELLS)
+)
+POSITION_LINE_INDICES = {CELL_POSITIONS[cell]: list(lines) for cell, lines in enumerate(CELL_LINE_INDICES)}
+
+# Cell where each pair of lines crosses, -1 if they don't (two distinct lines
+# share at most one cell, and a line is not paired with itself)
+LINE_INTERSECTIONS = tuple(
+    tuple(-1 if i == j else next((cell for cell in line if cell in other), -1)
+          for j, other in enumerate(LINE_CELL_INDICES))
+    for i, line in enumerate(LINE_CELL_INDICES)
+)
+
+# All cells ordered by centrality (number of lines through the cell).
+# The 8 corners and 8 inner-cube cells lie on 7 lines, every other cell on 4.
+CELLS_BY_CENTRALITY = sorted(range(NUM_CELLS), key=lambda cell: -len(CELL_LINE_INDICES[cell]))
+POSITIONS_BY_CENTRALITY = [CELL_POSITIONS[cell] for cell in CELLS_BY_CENTRALITY]
 
 # Export count breakdown for reference
 LINE_COUNTS = {
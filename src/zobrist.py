@@ -0,0 +1,39 @@
+"""
+LogiQube - Zobrist Hashing
+Random 64-bit keys used to hash board positions incrementally
+"""
+
+import numpy as np
+from src.constants import BOARD_SIZE, PLAYER_X, PLAYER_O
+
+# Fixed seed so every process (including search workers) derives identical keys
+ZOBRIST_SEED = 0x4C6F6769
+
+
+def generate_zobrist_keys(seed=ZOBRIST_SEED):
+    """
+    Generate one random 64-bit key per (player, position).
+
+    Side to move is not hashed: X always moves first, so it follows from
+    the number of pieces on the board.
+
+    Args:
+        seed: Random seed
+
+    Returns:
+        dict: Maps player to a [z][y][x] nested list of Python ints
+    """
+    rng = np.random.default_rng(seed)
+    keys = {}
+    for player in (PLAYER_X, PLAYER_O):
+        values = rng.integers(1, 2 ** 64, size=(BOARD_SIZE, BOARD_SIZE, BOARD_SIZE), dtype=np.uint64)
+        keys[player] = values.tolist()
+    return keys
+
+
+ZOBRIST_KEYS = generate_zobrist_keys()
+
+# Same keys flattened by cell index (x + 4y + 16z)
+ZOBRIST_CELL_KEYS = {
+    player: [key for plane in keys for row in plane for key in row] for player, keys in ZOBRIST_KEYS.items()
+}
@@ -9,7 +9,7 @@ sys.path.insert(0, '.')
 
 from src.board import Board
 from src.constants import PLAYER_X, PLAYER_O, STATE_WIN, STATE_DRAW, STATE_PLAYING
-from src.winning_lines import WINNING_LINES, LINE_COUNTS
+from src.winning_lines import WINNING_LINES, LINE_COUNTS, get_lines_containing_position
 
 
 def test_winning_lines():
@@ -228,6 +228,1329 @@ def test_move_validation():
     return True
 
 
+def test_staged_move_generator():
+    """Test that the lazy move generator yields forcing moves first."""
+    print("\n" + "=" * 60)
+    print("TESTING STAGED MOVE GENERATOR")
+    print("=" * 60)
+
+    board = Board()
+
+    # Empty board: all 64 cells, the 7-line cells first
+    moves = list(board.generate_moves())
+    assert len(moves) == 64, f"Expected 64 moves, got {len(moves)}"
+    assert len(set(moves)) == 64, "Moves should be unique"
+    assert all(len(get_lines_containing_position(*pos)) == 7 for pos in moves[:16]), \
+        "Corners and inner cube should come first"
+    print("✓ Empty board yields all 64 cells, most central first")
+
+    # X has three in row 0 of plane 0, O has three in row 1: X to move
+    for move in [(0, 0, 0), (0, 1, 0), (1, 0, 0), (1, 1, 0), (2, 0, 0), (2, 1, 0)]:
+        board.make_move(*move)
+    generator = board.generate_moves()
+    assert next(generator) == (3, 0, 0), "Winning move should come first"
+    assert next(generator) == (3, 1, 0), "Forced block should come second"
+    print("✓ Win yielded first, block second")
+
+    return True
+
+
+def test_search_and_undo():
+    """Test that the search finds forced moves and leaves the board untouched."""
+    print("\n" + "=" * 60)
+    print("TESTING SEARCH AND UNDO")
+    print("=" * 60)
+
+    from src.search import Searcher, WIN_THRESHOLD
+
+    board = Board()
+    for move in [(0, 0, 0), (0, 1, 0), (1, 0, 0), (1, 1, 0), (2, 0, 0), (2, 1, 0)]:
+        board.make_move(*move)
+    key = board.zobrist_key
+
+    result = Searcher().search(board, 3)
+    assert result.move == (3, 0, 0), f"Expected winning move (3, 0, 0), got {result.move}"
+    assert result.score >= WIN_THRESHOLD, "Winning move should score as a win"
+    assert board.move_count == 6 and board.zobrist_key == key, "Search should restore the board"
+    print(f"✓ Search found win: {result}")
+
+    board.make_move(3, 0, 0)
+    assert board.game_status == STATE_WIN
+    assert board.undo_move(), "Undo should succeed"
+    assert board.game_status == STATE_PLAYING and board.current_player == PLAYER_X
+    assert board.zobrist_key == key, "Undo should restore the hash"
+    print("✓ Undo restores game state and hash")
+
+    return True
+
+
+def test_parallel_search():
+    """Test the shared-memory transposition table and Lazy-SMP search."""
+    print("\n" + "=" * 60)
+    print("TESTING PARALLEL SEARCH")
+    print("=" * 60)
+
+    from src.parallel_search import SharedTranspositionTable, parallel_search
+    from src.search import TT_LOWER, WIN_THRESHOLD
+
+    tt = SharedTranspositionTable.create(1024)
+    try:
+        key = (1 << 63) | 12345
+        tt.store(key, 5, TT_LOWER, -321, (1, 2, 3))
+        assert tt.probe(key) == (5, TT_LOWER, -321, (1, 2, 3)), "Entry should round-trip"
+        assert tt.probe(key ^ (1 << 40)) is None, "Different key in same slot should miss"
+        tt.data[key & tt.mask] ^= 1  # Simulate a torn write
+        assert tt.probe(key) is None, "Corrupt entry should fail its checksum"
+    finally:
+        tt.close()
+    print("✓ Shared entries round-trip and corrupt entries are rejected")
+
+    board = Board()
+    for move in [(0, 0, 0), (0, 1, 0), (1, 0, 0), (1, 1, 0), (2, 0, 0)]:
+        board.make_move(*move)
+    result = parallel_search(board, 2, workers=2, tt_entries=1 << 12)
+    assert result.move == (3, 0, 0), f"O must block at (3, 0, 0), got {result.move}"
+    assert board.move_count == 5, "Parallel search should not modify the board"
+    print(f"✓ Parallel search found block: {result}")
+
+    # A proven win stops every worker, long before the maximum depth
+    board.make_move(3, 3, 3)
+    result = parallel_search(board, 30, workers=2, tt_entries=1 << 12)
+    assert result.score >= WIN_THRESHOLD and result.move == (3, 0, 0), "X should complete its row"
+    print(f"✓ Proven win ends the parallel search: {result}")
+
+    return True
+
+
+def test_analysis_server():
+    """Test batched, cached position analysis over JSON-RPC."""
+    print("\n" + "=" * 60)
+    print("TESTING ANALYSIS SERVER")
+    print("=" * 60)
+
+    import asyncio
+    import json
+    from src.analysis_server import (INVALID_PARAMS, AnalysisServer, AnalysisService, parse_position,
+                                     replay_moves)
+
+    # X holds three of row 0 in plane 0, O to move must block at (3, 0, 0)
+    moves = [[0, 0, 0], [0, 1, 0], [1, 0, 0], [1, 1, 0], [2, 0, 0]]
+    # The same position mirrored in x, as a 64-character string
+    mirrored = ["."] * 64
+    for i, (x, y, z) in enumerate(moves):
+        mirrored[(3 - x) + 4 * y + 16 * z] = "X" if i % 2 == 0 else "O"
+    mirrored = "".join(mirrored)
+
+    async def scenario():
+        service = AnalysisService(batch_window=0.05)
+        server = AnalysisServer(service, port=0)
+        port = await server.start()
+        try:
+            positions = [replay_moves(moves), parse_position(mirrored)] * 10
+            results = await asyncio.gather(*(service.analyze(cells) for cells in positions))
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(json.dumps({"jsonrpc": "2.0", "id": 7, "method": "analyze",
+                                     "params": {"position": mirrored}}).encode() + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            writer.close()
+            return results, response, service.get_stats()
+        finally:
+            await server.close()
+
+    results, response, stats = asyncio.run(scenario())
+
+    assert results[0]["best_move"] == (3, 0, 0), f"Expected block, got {results[0]['best_move']}"
+    assert results[0]["winning_moves"]["X"] == [(3, 0, 0)]
+    assert results[1]["best_move"] == (0, 0, 0), "Mirrored position should be answered mirrored"
+    assert stats["batches"] == 1 and stats["positions_evaluated"] == 1, \
+        f"20 symmetric requests should share one evaluation: {stats}"
+    print(f"✓ Concurrent requests coalesced: {stats}")
+
+    assert response["id"] == 7 and response["result"]["best_move"] == [0, 0, 0]
+    print("✓ JSON-RPC round trip over TCP")
+
+    for bad in ([["a", 0, 0]], [[1.0, 0, 0]], [[True, 0, 0]]):
+        response = asyncio.run(AnalysisServer().handle_request(
+            json.dumps({"jsonrpc": "2.0", "id": 8, "method": "analyze", "params": {"moves": bad}})))
+        assert response["error"]["code"] == INVALID_PARAMS, f"{bad} should be invalid params: {response}"
+    print("✓ Non-integer move coordinates rejected as invalid params")
+
+    return True
+
+
+def test_search_telemetry():
+    """Test per-search statistics and their exports."""
+    print("\n" + "=" * 60)
+    print("TESTING SEARCH TELEMETRY")
+    print("=" * 60)
+
+    import json
+    import os
+    import tempfile
+    from src.search import Searcher
+    from src.telemetry import write_jsonl, write_prometheus
+
+    board = Board()
+    assert Searcher().search(board, 2).stats is None, "Stats should be off by default"
+
+    result = Searcher(collect_stats=True).search(board, 3)
+    stats = result.stats
+    assert stats.nodes == result.nodes > 0
+    assert [depth for depth, _, _ in stats.depths] == [1, 2, 3]
+    assert stats.tt_probes >= stats.tt_hits > 0
+    assert sum(stats.cutoffs) > 0 and stats.movegen_stages[0] > 0
+    assert board.stats is None, "Board stats hook should be detached after the search"
+    print(f"✓ Collected {stats.nodes} nodes, EBF {stats.effective_branching_factor:.1f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        jsonl_path = os.path.join(directory, "search.jsonl")
+        prom_path = os.path.join(directory, "search.prom")
+        write_jsonl(stats, jsonl_path, level="hard")
+        write_prometheus(stats, prom_path, level="hard")
+        with open(jsonl_path) as f:
+            record = json.loads(f.readline())
+        with open(prom_path) as f:
+            metrics = f.read()
+
+    assert record["level"] == "hard" and record["nodes"] == stats.nodes
+    assert f'logiqube_search_nodes{{level="hard"}} {stats.nodes}' in metrics
+    print("✓ JSON lines and Prometheus exports written")
+
+    return True
+
+
+def test_differential_backends():
+    """Test the bitboard backend against Board and the divergence minimizer."""
+    print("\n" + "=" * 60)
+    print("TESTING DIFFERENTIAL BACKEND HARNESS")
+    print("=" * 60)
+
+    import random
+    from src.bitboard import BitBoard
+    from src.difftest import GAME_KINDS, find_divergence, generate_game, minimize
+
+    rng = random.Random(2024)
+    for game_number in range(30):
+        moves = generate_game(rng, GAME_KINDS[game_number % len(GAME_KINDS)])
+        divergence = find_divergence(moves, BitBoard)
+        assert divergence is None, f"BitBoard diverged: {divergence} in {moves}"
+    print("✓ BitBoard matches Board on 30 random and adversarial games")
+
+    class NoBodyDiagonals(BitBoard):
+        """Broken backend that never detects wins on the 4 corner-to-corner diagonals."""
+
+        def make_move(self, x, y, z):
+            accepted = super().make_move(x, y, z)
+            if accepted and self.winning_line in WINNING_LINES[72:]:
+                self.game_status = STATE_PLAYING
+                self.winner = None
+                self.winning_line = None
+                self.current_player = PLAYER_O if self.current_player == PLAYER_X else PLAYER_X
+            return accepted
+
+    while True:
+        moves = generate_game(rng, "diagonal")
+        if find_divergence(moves, NoBodyDiagonals) is not None:
+            break
+    reproducer = minimize(moves, NoBodyDiagonals)
+    ply, field, _, _ = find_divergence(reproducer, NoBodyDiagonals)
+    assert len(reproducer) == 7 and ply == 6, f"Expected a 7-move reproducer, got {reproducer}"
+    print(f"✓ Broken backend caught and minimized to {len(reproducer)} moves ({field} at ply {ply})")
+
+    return True
+
+
+def test_perft():
+    """Test perft node counts, terminal handling and symmetry-unique counts."""
+    print("\n" + "=" * 60)
+    print("TESTING PERFT")
+    print("=" * 60)
+
+    from src.perft import divide, perft
+
+    assert perft(Board(), 2) == 64 * 63, "Depth 2 should visit every ordered pair of cells"
+    unique = set()
+    assert perft(Board(), 1, unique) == 64 and len(unique) == 4, \
+        "64 first moves fall into 4 symmetry classes (corner, inner, edge, face)"
+    print("✓ perft(2) = 4032, 4 unique first moves")
+
+    # X to move with a win available: the win is a leaf, the other 57 moves expand
+    moves = [(0, 0, 0), (0, 1, 0), (1, 0, 0), (1, 1, 0), (2, 0, 0), (2, 1, 0)]
+    report = divide(moves, 2, backend="bitboard", workers=2)
+    assert report["nodes"] == 1 + 57 * 57, f"Unexpected count {report['nodes']}"
+    assert report["divide"][(3, 0, 0)] == 1, "Winning move should end its subtree"
+    assert report["nodes"] == divide(moves, 2, backend="board", workers=2)["nodes"], \
+        "Backends should agree"
+    print(f"✓ perft(2) after 6 moves = {report['nodes']} on both backends")
+
+    return True
+
+
+def test_postgame_analysis():
+    """Test game records and post-game blunder annotation."""
+    print("\n" + "=" * 60)
+    print("TESTING POST-GAME ANALYSIS")
+    print("=" * 60)
+
+    import os
+    import tempfile
+    from src.game_records import iter_games, save_game
+    from src.postgame import PostGameAnalyzer
+
+    # O fails to block at ply 5, X then misses the win, O wins
+    moves = [(0, 0, 0), (0, 1, 0), (1, 0, 0), (1, 1, 0), (2, 0, 0), (2, 1, 0), (0, 0, 3), (3, 1, 0)]
+    board = Board()
+    for move in moves:
+        board.make_move(*move)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.jsonl")
+        save_game(board, path, mode="test")
+        save_game(board, path, mode="test")
+        records = list(iter_games(path))
+    assert len(records) == 2 and records[0]["moves"] == moves and records[0]["result"] == "O"
+    print("✓ Game records round-trip")
+
+    analyzer = PostGameAnalyzer(depth=2, workers=2)
+    try:
+        annotated = list(analyzer.analyze(records))
+    finally:
+        analyzer.close()
+
+    tags = [annotation["tags"] for annotation in annotated[0]["annotations"]]
+    assert "blunder" in tags[5], f"Missing block should be a blunder: {tags[5]}"
+    assert "missed_win" in tags[6], f"Ignoring the win should be flagged: {tags[6]}"
+    assert annotated[0]["annotations"][6]["best_move"] == [3, 0, 0]
+    assert annotated[1]["annotations"] == annotated[0]["annotations"]
+    assert analyzer.positions_searched == len(moves) + 1, "Repeated game should be fully cached"
+    print(f"✓ Annotated blunder at ply 5 and missed win at ply 6 ({analyzer.positions_searched} searches)")
+
+    return True
+
+
+def test_position_cache():
+    """Test the persistent SQLite position cache."""
+    print("\n" + "=" * 60)
+    print("TESTING PERSISTENT POSITION CACHE")
+    print("=" * 60)
+
+    import os
+    import tempfile
+    import time
+    from src.position_cache import PositionCache
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.sqlite")
+        keys = [bytes([i]) * 64 for i in range(5)]
+
+        with PositionCache(path, max_entries=4, batch_size=2) as cache:
+            cache.put_many([(keys[0], (5, 10, 3, False)), (keys[1], (None, -99999, 0, True))])
+            cache.put(keys[0], (7, 12, 2, False))  # Shallower result must not replace deeper
+            assert cache.get(keys[0]) == (5, 10, 3, False)
+            assert cache.get_many(keys[:2], min_depth=4) == {keys[1]: (None, -99999, 0, True)}, \
+                "Shallow unproven entries should miss, proven ones always hit"
+            time.sleep(0.01)
+            cache.get(keys[0])  # Touch: keys[0] is now more recent than keys[1]
+            cache.flush()
+            time.sleep(0.01)
+            cache.put_many((key, (1, 0, 1, False)) for key in keys[2:])
+            cache.flush()
+            assert len(cache) == 4, f"Cache should be bounded to 4 entries, has {len(cache)}"
+            assert cache.get(keys[1]) is None, "Least recently used entry should be evicted"
+        print("✓ Batched writes, depth-aware replacement and LRU eviction")
+
+        # A second connection (e.g. another worker process) sees the data
+        with PositionCache(path) as reader:
+            assert reader.get(keys[0]) == (5, 10, 3, False)
+        print("✓ Entries persist across connections")
+
+    return True
+
+
+def test_dead_draw():
+    """Test early draw detection once every line holds both players."""
+    print("\n" + "=" * 60)
+    print("TESTING DEAD DRAW DETECTION")
+    print("=" * 60)
+
+    from src.constants import DRAW_DEAD
+
+    # Both players spread out, blocking lines without completing any
+    moves = [(1, 1, 2), (2, 2, 1), (0, 3, 0), (0, 0, 0), (2, 1, 1), (3, 0, 3), (3, 3, 3),
+             (1, 2, 2), (1, 2, 3), (3, 3, 0), (2, 0, 3), (1, 1, 1), (3, 0, 0), (2, 3, 3),
+             (0, 0, 1), (0, 0, 3), (2, 2, 0), (0, 3, 1), (3, 2, 1), (2, 1, 0), (0, 2, 2),
+             (0, 1, 3), (2, 3, 1), (0, 2, 0), (1, 0, 1), (3, 1, 1), (3, 0, 2), (3, 3, 2),
+             (0, 1, 0), (1, 3, 0), (2, 2, 2), (2, 0, 2), (3, 1, 3), (1, 0, 3), (1, 3, 3),
+             (3, 2, 3), (0, 2, 3), (0, 1, 2), (1, 2, 0), (1, 3, 1), (1, 3, 2), (3, 0, 1)]
+    board = Board()
+    for move in moves[:-1]:
+        assert board.make_move(*move)
+    assert board.game_status == STATE_PLAYING, "One line should still be winnable"
+    board.make_move(*moves[-1])
+    assert board.draw_reason == DRAW_DEAD
+
+    assert board.game_status == STATE_DRAW and board.move_count < 64, \
+        "Dead draw should end the game before the board is full"
+    assert all(board.count_in_line(line, PLAYER_X) and board.count_in_line(line, PLAYER_O)
+               for line in WINNING_LINES), "Every line should hold both players"
+    assert board.live_lines == {PLAYER_X: 0, PLAYER_O: 0}
+    print(f"✓ Dead draw declared after {board.move_count} moves")
+
+    board.undo_move()
+    assert board.game_status == STATE_PLAYING and board.draw_reason is None
+    assert board.live_lines[PLAYER_X] + board.live_lines[PLAYER_O] > 0, "Undo should revive a line"
+    assert board.line_counts[PLAYER_X] == [board.count_in_line(line, PLAYER_X) for line in WINNING_LINES]
+    print("✓ Undo restores live line counts")
+
+    return True
+
+
+def test_flat_index_api():
+    """Test the flat cell-index API against the (x, y, z) wrappers."""
+    print("\n" + "=" * 60)
+    print("TESTING FLAT INDEX API")
+    print("=" * 60)
+
+    from src.winning_lines import (NUM_CELLS, LINE_CELL_INDICES, index_to_position,
+                                   position_to_index)
+
+    assert all(position_to_index(*index_to_position(i)) == i for i in range(NUM_CELLS))
+    assert position_to_index(1, 2, 3) == 1 + 4 * 2 + 16 * 3
+    assert all(tuple(position_to_index(*pos) for pos in line) == indices
+               for line, indices in zip(WINNING_LINES, LINE_CELL_INDICES))
+    print("✓ Index conversions and line tables agree")
+
+    board = Board()
+    assert board.board.base is board.cells and board.cells.dtype.name == "int8"
+    assert board.make_move_index(position_to_index(2, 1, 0))
+    assert board.board[0][1][2] == PLAYER_X and board.get_position_value(2, 1, 0) == PLAYER_X
+    assert not board.make_move_index(position_to_index(2, 1, 0)), "Occupied cell should be rejected"
+    assert not board.make_move_index(NUM_CELLS), "Out of range index should be rejected"
+    assert board.move_history == [(2, 1, 0, PLAYER_X)]
+    assert board.get_empty_indices() == [position_to_index(*pos) for pos in board.get_empty_positions()]
+    print("✓ make_move_index matches make_move")
+
+    # Body diagonal through the index API
+    board = Board()
+    for x_move, o_move in [(0, 1), (21, 2), (42, 3)]:
+        board.make_move_index(x_move)
+        board.make_move_index(o_move)
+    board.make_move_index(63)
+    assert board.game_status == STATE_WIN and board.winning_line == WINNING_LINES[72]
+    assert board.check_win(3, 3, 3) == (True, WINNING_LINES[72])
+    print(f"✓ Win detected on {board.winning_line}")
+
+    return True
+
+
+def test_game_journal():
+    """Test journaling moves and rebuilding boards after a simulated crash."""
+    print("\n" + "=" * 60)
+    print("TESTING GAME JOURNAL")
+    print("=" * 60)
+
+    import os
+    import tempfile
+    from src.journal import GameJournal, JournaledBoard, JournalError, JOURNAL_FILE, SNAPSHOT_FILE
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal = GameJournal(directory, max_delay=0.001)
+        first = JournaledBoard(journal, 1)
+        second = JournaledBoard(journal, 2)
+        finished = JournaledBoard(journal, 3)
+        for index in (0, 21, 5):
+            first.make_move_index(index)
+        first.undo_move()
+        first.make_move(3, 3, 3)
+        second.make_move(1, 1, 1)
+        finished.make_move(0, 0, 0)
+        journal.close_session(3)
+
+        # Crash: the journal is never closed, and the last write was torn
+        with open(os.path.join(directory, JOURNAL_FILE), "ab") as f:
+            f.write(b"\x01\x02\x00")
+        journal = GameJournal(directory)
+        recovered = journal.boards()
+        journal.close()
+        assert sorted(recovered) == [1, 2], "Closed sessions should not be rebuilt"
+        assert recovered[1].move_history == first.move_history
+        assert recovered[1].zobrist_key == first.zobrist_key
+        assert recovered[2].move_history == second.move_history
+        print(f"✓ Rebuilt {len(recovered)} live boards from the journal, ignoring a torn frame")
+
+        journal = GameJournal(directory, compact_every=4)
+        board = JournaledBoard.restore(journal, 2)
+        for index in (0, 1, 2, 3, 4):
+            board.make_move_index(index)
+        journal.close()
+        assert os.path.exists(os.path.join(directory, SNAPSHOT_FILE)), "Compaction should write a snapshot"
+        with GameJournal(directory) as reopened:
+            recovered = reopened.boards()
+        assert recovered[2].move_history == board.move_history
+        assert recovered[1].move_history == first.move_history
+        print(f"✓ Snapshot compaction preserved every session ({journal.fsyncs} fsyncs)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        with GameJournal(directory, max_delay=0.001) as journal:
+            board = JournaledBoard(journal, 4)
+            board.make_move(0, 0, 0)
+            board.make_move(1, 0, 0)
+            board.reset()
+            board.make_move(2, 0, 0)
+            assert journal.session_moves(4) == [2], "A reset should start the session again"
+
+            # A second board on the same session: the journal refuses its move
+            other = JournaledBoard(journal, 4)
+            try:
+                other.make_move(3, 0, 0)
+                assert False, "The journal should refuse a move out of sequence"
+            except JournalError:
+                pass
+            assert other.move_count == 0 and journal.session_moves(4) == [2], \
+                "A refused move should be rolled back"
+        with GameJournal(directory) as reopened:
+            assert reopened.boards()[4].move_history == board.move_history
+        print("✓ Reset journaled, refused moves rolled back")
+
+    return True
+
+
+def test_spectator_broadcast():
+    """Test delta broadcast to live and late-joining spectators."""
+    print("\n" + "=" * 60)
+    print("TESTING SPECTATOR BROADCAST")
+    print("=" * 60)
+
+    import asyncio
+    import json
+    from src.broadcast import BroadcastServer, MatchChannel, Spectator
+
+    # X builds the body diagonal; one move is taken back on the way
+    moves = [(0, 0, 0), (0, 1, 0), (1, 1, 1), (0, 2, 0), (2, 2, 2), (1, 2, 0), (3, 3, 3)]
+
+    async def watch(port, match_id, since=None):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        request = {"match": match_id} if since is None else {"match": match_id, "since": since}
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        return reader, writer
+
+    async def catch_up(spectator, reader, seq):
+        while spectator.seq != seq:
+            spectator.apply_line(await asyncio.wait_for(reader.readline(), 5))
+
+    async def scenario():
+        server = BroadcastServer(port=0, snapshot_interval=4)
+        port = await server.start()
+        board = Board()
+        channel = server.channel("final")
+        try:
+            early = Spectator()
+            early_reader, early_writer = await watch(port, "final")
+            await catch_up(early, early_reader, 0)
+
+            for move in moves[:5]:
+                board.make_move(*move)
+                channel.publish(board)
+            board.undo_move()
+            channel.publish(board)
+            board.make_move(*moves[4])
+            channel.publish(board)
+
+            late = Spectator()
+            late_reader, late_writer = await watch(port, "final")
+            await catch_up(late, late_reader, channel.seq)
+            late_writer.close()
+            resume_seq = late.seq
+
+            for move in moves[5:]:
+                board.make_move(*move)
+                channel.publish(board)
+            await catch_up(early, early_reader, channel.seq)
+            resumed_reader, resumed_writer = await watch(port, "final", since=resume_seq)
+            await catch_up(late, resumed_reader, channel.seq)
+            for writer in (early_writer, resumed_writer):
+                writer.close()
+            return board, channel, early, late
+        finally:
+            await server.close()
+
+    board, channel, early, late = asyncio.run(scenario())
+
+    for spectator in (early, late):
+        assert spectator.cells == board.cells.tolist(), "Spectator board should match the match"
+        assert spectator.status == board.game_status and spectator.winner == board.winner
+        assert spectator.line == [0, 21, 42, 63]
+    print(f"✓ Live, late and resuming spectators agree after {channel.seq} updates")
+
+    assert len(channel.tail) < 4, "Snapshots should bound the late-joiner tail"
+    assert channel.bytes_encoded < 60 * channel.seq, f"Deltas should be small: {channel.bytes_encoded} bytes"
+    print(f"✓ {channel.bytes_encoded} bytes encoded once for {channel.seq} deltas")
+
+    # A reset followed by a move is not an undo: subscribers get a snapshot
+    class LineWriter:
+        def __init__(self):
+            self.spectator = Spectator()
+
+        def write(self, data):
+            for line in data.splitlines():
+                self.spectator.apply_line(line)
+
+    writer = LineWriter()
+    rematch = MatchChannel("rematch")
+    rematch.subscribe(writer)
+    board = Board()
+    for move in moves[:2]:
+        board.make_move(*move)
+        rematch.publish(board)
+    board.reset()
+    board.make_move(3, 3, 3)
+    rematch.publish(board)
+    assert writer.spectator.cells == board.cells.tolist(), "Reset then move should resync the spectator"
+    print("✓ Reset followed by a move resyncs spectators")
+
+    return True
+
+
+def test_ai_difficulty():
+    """Test node-budgeted, reproducible AI difficulty levels."""
+    print("\n" + "=" * 60)
+    print("TESTING AI DIFFICULTY LEVELS")
+    print("=" * 60)
+
+    from src.ai import AIPlayer, DIFFICULTY_LEVELS, load_test
+    from src.constants import AI_EASY, AI_MEDIUM
+
+    board = Board()
+    for move in [(0, 0, 0), (1, 1, 1), (1, 0, 0), (2, 2, 2), (2, 0, 0)]:
+        board.make_move(*move)
+    for difficulty in (AI_EASY, AI_MEDIUM):
+        player = AIPlayer(difficulty)
+        assert player.choose_move(board) == (3, 0, 0), f"{difficulty} should block X's row"
+        assert player.last_result.nodes <= DIFFICULTY_LEVELS[difficulty]["nodes"], "Node budget exceeded"
+    print("✓ Every level blocks an open three within its node budget")
+
+    opening = Board()
+    opening.make_move(1, 1, 1)
+    choices = [AIPlayer(AI_EASY, seed).choose_move(opening) for seed in range(8)]
+    assert choices == [AIPlayer(AI_EASY, seed).choose_move(opening) for seed in range(8)], \
+        "Same seed and position should give the same move"
+    assert len(set(choices)) > 1, "Easy should vary among near-best moves across seeds"
+    assert len({AIPlayer(AI_MEDIUM, 0).choose_move(opening) for _ in range(3)}) == 1
+    print(f"✓ Seeded choices are reproducible ({len(set(choices))} distinct easy moves over 8 seeds)")
+
+    report = load_test(AI_EASY, games=2, workers=1)
+    assert report["moves"] > 0 and report["p50_ms"] <= report["p99_ms"] <= report["max_ms"]
+    assert 0 <= report["over_ceiling"] <= report["moves"] and report["max_overshoot_ms"] >= 0
+    print(f"✓ Load test: p50 {report['p50_ms']:.1f}ms, p99 {report['p99_ms']:.1f}ms, "
+          f"max overshoot {report['max_overshoot_ms']:.1f}ms")
+
+    return True
+
+
+def test_selfplay_dataset():
+    """Test self-play export to memory-mapped shards and minibatch sampling."""
+    print("\n" + "=" * 60)
+    print("TESTING SELF-PLAY DATASET")
+    print("=" * 60)
+
+    import tempfile
+    import numpy as np
+    from src.dataset import ShardDataset, ShardWriter, generate
+
+    with tempfile.TemporaryDirectory() as directory:
+        written = generate(directory, games=3, nodes=300, max_depth=2, augment_count=2, shard_size=64,
+                           workers=1)
+        dataset = ShardDataset(directory)
+        assert len(dataset) == written and written % 2 == 0
+        assert len(dataset.shards) == -(-written // 64), "Positions should spill over fixed-size shards"
+        assert isinstance(dataset.shards[0]["cells"], np.memmap)
+        print(f"✓ {written} positions written into {len(dataset.shards)} shards")
+
+        batch = dataset.sample(256, np.random.default_rng(0))
+        cells, side, policy = batch["cells"], batch["side"], batch["policy"]
+        x_count = (cells == PLAYER_X).sum(axis=1)
+        o_count = (cells == PLAYER_O).sum(axis=1)
+        assert np.all(side == np.where(x_count == o_count, PLAYER_X, PLAYER_O)), "Side to move mismatch"
+        assert np.allclose(policy.sum(axis=1), 1.0), "Policies should be distributions"
+        assert np.all(policy[cells != 0] == 0), "Policy mass only on empty cells"
+        assert set(np.unique(batch["outcome"])) <= {-1, 0, 1}
+
+        first = dataset.get([0, 1])
+        assert (first["cells"] == 0).all() and first["outcome"][0] == first["outcome"][1], \
+            "Symmetric copies of the opening position should share their labels"
+        print("✓ Sampled minibatches are consistent across shards")
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Interrupted before its first shard closed: only the manifest exists
+        ShardWriter(directory).write_manifest()
+        empty = ShardDataset(directory)
+        batch = empty.get([])
+        assert len(empty) == 0 and batch["cells"].shape == (0, 64), "Empty reads should keep field shapes"
+        try:
+            empty.sample(8, np.random.default_rng(0))
+            assert False, "Sampling an empty dataset should fail clearly"
+        except ValueError:
+            pass
+        print("✓ A dataset without completed shards reads empty and refuses to sample")
+
+    return True
+
+
+def test_heatmap():
+    """Test vectorized Monte Carlo playouts and the background heatmap."""
+    print("\n" + "=" * 60)
+    print("TESTING WIN-RATE HEATMAP")
+    print("=" * 60)
+
+    import time
+    import numpy as np
+    from src.heatmap import HeatmapAnalyzer, run_playouts
+    from src.winning_lines import position_to_index
+
+    # X holds three of row 0 in plane 0; X to move
+    board = Board()
+    for move in [(0, 0, 0), (0, 1, 0), (1, 0, 0), (1, 1, 0), (2, 0, 0), (0, 2, 0)]:
+        board.make_move(*move)
+    rng = np.random.default_rng(0)
+    winning_cell = position_to_index(3, 0, 0)
+    wins, draws = run_playouts(board.cells, PLAYER_X, [winning_cell, 63], 200, rng)
+    assert wins[0] == 200, "Completing the line should win every playout"
+    assert 0 < wins[1] < 200, "A quiet move should win only some playouts"
+    wins, _ = run_playouts(board.cells, PLAYER_X, [63], 200, rng, weighted=False)
+    assert 0 < wins[0] < 200
+    print("✓ Playouts score the immediate win at 100%")
+
+    analyzer = HeatmapAnalyzer(target_playouts=512, seed=1)
+    analyzer.start()
+    try:
+        analyzer.set_position(board)
+        start_time = time.perf_counter()
+        while analyzer.get_rates()[1] < 512 and time.perf_counter() - start_time < 10:
+            time.sleep(0.01)
+        rates, playouts = analyzer.get_rates()
+    finally:
+        analyzer.stop()
+    assert playouts >= 512 and np.nanargmax(rates) == winning_cell
+    assert np.isnan(rates[board.cells != 0]).all(), "Occupied cells should have no estimate"
+    print(f"✓ Background heatmap converged in {time.perf_counter() - start_time:.2f}s")
+
+    return True
+
+
+def test_tournament():
+    """Test the round-robin tournament runner, its resume and Bayesian Elo."""
+    print("\n" + "=" * 60)
+    print("TESTING TOURNAMENT")
+    print("=" * 60)
+
+    import json
+    import os
+    import tempfile
+    from src.tournament import bayes_elo, crosstable, parse_player, run_tournament, schedule
+
+    players = [parse_player("d1:nodes=100,max_depth=1,margin=none"),
+               parse_player("d3:nodes=600,max_depth=3,margin=none"),
+               parse_player("easy")]
+    names = [player["name"] for player in players]
+    games = schedule(players, 4)
+    assert len(games) == 3 * 4 and games[0]["cost"] >= games[-1]["cost"], "Longest games go first"
+    for name in names:
+        assert sum(game["x"]["name"] == name for game in games) == 4, "Colors should be balanced"
+
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint = os.path.join(directory, "tournament.jsonl")
+        records = run_tournament(players, 4, checkpoint, workers=1)
+        assert len(records) == 12 and all(record["score"] in (0.0, 0.5, 1.0) for record in records)
+
+        # Simulate a crash: keep five games and half a line, then resume
+        with open(checkpoint) as f:
+            lines = f.readlines()
+        with open(checkpoint, "w") as f:
+            f.writelines(lines[:5])
+            f.write(lines[5][:20])
+        played = []
+        resumed = run_tournament(players, 4, checkpoint, workers=1,
+                                 progress=lambda done, total: played.append(done))
+        assert len(played) == 7, "Only unfinished games should be replayed"
+        assert [record["moves"] for record in resumed] == [record["moves"] for record in records], \
+            "Resumed games should replay identically"
+        with open(checkpoint) as f:
+            lines = f.readlines()
+        assert len(lines) == 12 and all(json.loads(line)["key"] for line in lines), \
+            "The truncated line should be cut off before resuming"
+        print("✓ Interrupted tournament resumed from its checkpoint")
+
+        # Same names with other settings are new games, not checkpointed ones
+        changed = [players[0], parse_player("d3:nodes=700,max_depth=3,margin=none"), players[2]]
+        played = []
+        run_tournament(changed, 4, checkpoint, workers=1, progress=lambda done, total: played.append(done))
+        assert len(played) == 8, "Only pairings with d3 should be replayed"
+        print("✓ Changed settings are not resumed from the checkpoint")
+
+    strong_wins = [{"x": "a", "o": "b", "score": 1.0}, {"x": "b", "o": "a", "score": 0.0}] * 5
+    elo = bayes_elo(strong_wins + [{"x": "b", "o": "c", "score": 0.5}] * 4, ["a", "b", "c"])
+    assert elo["ratings"]["a"] > elo["ratings"]["b"] and abs(sum(elo["ratings"].values())) < 1e-6
+    assert elo["errors"]["a"] > 0
+    table = crosstable(records, names)
+    assert all(name in table for name in names)
+    print(table)
+    print("✓ Crosstable and Bayesian Elo computed")
+
+    return True
+
+
+def test_distributed_solve():
+    """Test the checkpointed, multi-process exact solver."""
+    print("\n" + "=" * 60)
+    print("TESTING DISTRIBUTED SOLVE")
+    print("=" * 60)
+
+    import os
+    import tempfile
+    from src.solve import SolveCoordinator, describe_score, run_worker, solve, solve_board
+    from src.winning_lines import position_to_index
+
+    # A late position (16 empty cells) whose side to move is lost
+    moves = [(1, 2, 0), (0, 3, 3), (2, 3, 0), (2, 2, 0), (2, 1, 1), (0, 0, 3), (3, 3, 3), (2, 0, 1),
+             (0, 1, 2), (1, 0, 0), (2, 1, 3), (3, 0, 0), (1, 0, 2), (3, 2, 1), (2, 2, 2), (1, 3, 1),
+             (1, 1, 0), (2, 3, 2), (1, 3, 3), (3, 2, 2), (2, 0, 2), (0, 2, 3), (0, 1, 3), (3, 0, 3),
+             (1, 3, 0), (1, 1, 3), (0, 0, 0), (1, 1, 1), (3, 1, 1), (0, 0, 2), (0, 2, 1), (3, 1, 3),
+             (3, 2, 0), (0, 1, 1), (3, 1, 0), (1, 1, 2), (3, 1, 2), (0, 2, 0), (2, 2, 3), (0, 0, 1),
+             (0, 2, 2), (2, 0, 0), (1, 2, 2), (2, 1, 0), (0, 3, 0), (3, 3, 0), (2, 2, 1), (2, 3, 1)]
+    cells = [position_to_index(*move) for move in moves]
+    board = Board()
+    for move in moves:
+        board.make_move(*move)
+    expected = solve_board(board)[0]
+
+    with tempfile.TemporaryDirectory() as directory:
+        with SolveCoordinator(directory, cells, split_depth=2) as coordinator:
+            units = coordinator.prepare()
+            assert units > 0 and coordinator.prepare() == 0, "Queued units should not be queued twice"
+            assert run_worker(directory, "first", max_units=3) == 3
+            assert coordinator.result() is None, "Result should wait for outstanding units"
+            assert coordinator.status() == {"pending": units - 3, "claimed": 0, "done": 3}
+        print(f"✓ {units} symmetry-distinct units queued, 3 solved before the interruption")
+
+        # Status and result only read the queue
+        pending = os.path.join(directory, "pending")
+        lost = sorted(os.listdir(pending))[-1]
+        os.remove(os.path.join(pending, lost))
+        with SolveCoordinator(directory) as coordinator:
+            assert coordinator.result() is None and coordinator.status()["pending"] == units - 4
+            assert coordinator.prepare() == 1, "Only prepare should queue missing units"
+        print("✓ Status and result leave the queue alone")
+
+        # Simulate workers that died holding claims
+        abandoned = sorted(os.listdir(pending))[:2]
+        with open(os.path.join(pending, abandoned[1])) as f:
+            unit = f.read()
+        for name in abandoned:
+            os.rename(os.path.join(pending, name), os.path.join(directory, "claimed", name[:-5] + ".dead.json"))
+        with SolveCoordinator(directory) as coordinator:
+            assert coordinator.requeue_stale(lease=0) == 2
+
+        # Restart: only the remaining units are solved, by several processes
+        result = solve(directory, workers=3)
+        assert result["score"] == expected, "Distributed value should match a direct solve"
+        assert result["moves"][result["best_move"]] == expected
+        print(f"✓ Resumed solve across 3 workers: {describe_score(result['score'])}")
+
+        # A claim that expires while workers are running is taken over by the next idle one
+        dead_claim = os.path.join(directory, "claimed", abandoned[1][:-5] + ".dead.json")
+        with open(dead_claim, "w") as f:
+            f.write(unit)
+        os.utime(dead_claim, (0, 0))
+        assert run_worker(directory, "late") == 1 and os.listdir(os.path.join(directory, "claimed")) == []
+        print("✓ Abandoned claims requeued by the coordinator and by idle workers")
+
+        with SolveCoordinator(directory) as coordinator:
+            assert coordinator.status()["done"] == units
+            coordinator.prepare()
+            assert len(coordinator.nodes) == 1, "Proven root should be answered from the results table"
+            assert coordinator.result()["score"] == expected
+        print("✓ Proven results reused from the persistent table")
+
+    return True
+
+
+def test_offscreen_render():
+    """Test offscreen replay rendering against the live UI's drawing."""
+    print("\n" + "=" * 60)
+    print("TESTING OFFSCREEN RENDER")
+    print("=" * 60)
+
+    import os
+    import tempfile
+    from src.render import ReplayRenderer, render_games
+    import pygame
+    from src.constants import WINDOW_WIDTH, WINDOW_HEIGHT
+    from src.ui import GameUI
+
+    moves = [(0, 0, 0), (1, 0, 0), (1, 1, 1), (2, 0, 0), (2, 2, 2), (3, 0, 0), (3, 3, 3)]
+    renderer = ReplayRenderer()
+    frames = [pygame.image.tobytes(frame, "RGB") for frame in renderer.frames(moves)]
+    assert len(frames) == len(moves) + 1 and len(set(frames)) == len(frames)
+
+    # Incremental frames should match a full redraw by the game window code
+    board = Board()
+    for move in moves:
+        board.make_move(*move)
+    ui = GameUI(pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)))
+    ui.draw_board(board)
+    ui.draw_winning_line(board)
+    assert frames[-1] == pygame.image.tobytes(ui.screen, "RGB"), "Replay should match a full redraw"
+    assert pygame.image.tobytes(renderer.render_final(moves), "RGB") == frames[-1]
+    print(f"✓ {len(frames)} frames drawn incrementally match the game window")
+
+    with tempfile.TemporaryDirectory() as directory:
+        games = [{"moves": moves}, {"moves": moves[:4]}]
+        paths = render_games(games, directory, "thumbnail", scale=0.25, workers=1)
+        assert [os.path.basename(path) for path in paths] == ["game_000000.png", "game_000001.png"]
+        assert pygame.image.load(paths[0]).get_size() == (WINDOW_WIDTH // 4, WINDOW_HEIGHT // 4)
+        paths = render_games(games[1:], directory, "frames", scale=0.25, workers=1)
+        assert len(os.listdir(paths[0])) == 5
+        print("✓ Thumbnails and frame sequences written by the worker pool")
+
+        try:
+            from PIL import Image
+        except ImportError:
+            Image = None
+        if Image is None:
+            try:
+                render_games(games, directory, "gif", workers=1)
+                assert False, "GIF mode should fail up front without Pillow"
+            except ImportError:
+                pass
+            print("⚠ Pillow not installed: GIF output skipped (missing dependency reported up front)")
+        else:
+            path = os.path.join(directory, "replay.gif")
+            ReplayRenderer(0.25).save_gif(moves, path)
+            with Image.open(path) as gif:
+                assert gif.n_frames == len(moves) + 1 and gif.size == (WINDOW_WIDTH // 4, WINDOW_HEIGHT // 4)
+            print("✓ Animated GIF written with one frame per position")
+
+    return True
+
+
+def test_threat_overlay():
+    """Test the cached threat overlay of the UI."""
+    print("\n" + "=" * 60)
+    print("TESTING THREAT OVERLAY")
+    print("=" * 60)
+
+    import os
+    import time
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from src.constants import THREAT_WIN, WINDOW_WIDTH, WINDOW_HEIGHT
+    from src.ui import GameUI
+    from src.winning_lines import position_to_index
+
+    ui = GameUI(pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)))
+    board = Board()
+    for move in [(0, 0, 0), (0, 1, 1), (1, 0, 0), (0, 2, 2), (2, 0, 0)]:
+        board.make_move(*move)
+
+    marks = ui.get_threat_marks(board)
+    assert ui.get_threat_marks(board) is marks, "Marks should be cached until the position changes"
+    win_rect = ui.get_cell_rect(position_to_index(3, 0, 0))
+    assert (ui.threat_sprites[PLAYER_X, THREAT_WIN], win_rect) in marks, "X's winning cell should be marked"
+    assert sum(rect == win_rect for _, rect in marks) == 1, "O has no line through X's winning cell"
+    print(f"✓ {len(marks)} threat marks computed once per position")
+
+    # Same move count, different position: the cache must not be reused
+    board.undo_move()
+    board.make_move(0, 3, 3)
+    assert (ui.threat_sprites[PLAYER_X, THREAT_WIN], win_rect) not in ui.get_threat_marks(board)
+    print("✓ Marks refreshed after an undo and a different move")
+
+    ui.draw_board(board)
+    plain = pygame.image.tobytes(ui.screen, "RGB")
+    ui.show_threats = True
+    start_time = time.perf_counter()
+    for _ in range(20):
+        ui.draw_board(board)
+    overlay_time = (time.perf_counter() - start_time) / 20
+    assert pygame.image.tobytes(ui.screen, "RGB") != plain
+    print(f"✓ Frame with overlay drawn in {overlay_time * 1000:.2f}ms")
+
+    return True
+
+
+def test_cube_view():
+    """Test the isometric cube view's cached projection and ID-buffer picking."""
+    print("\n" + "=" * 60)
+    print("TESTING CUBE VIEW")
+    print("=" * 60)
+
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from src.constants import CUBE_YAW_STEP, VIEW_CUBE, WINDOW_WIDTH, WINDOW_HEIGHT
+    from src.ui import GameUI
+
+    ui = GameUI(pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)))
+    ui.toggle_view()
+    assert ui.view_mode == VIEW_CUBE
+    board = Board()
+    board.make_move(0, 0, 0)
+    ui.draw_board(board)
+    view = ui.cube_view
+    surfaces = view.cell_surfaces
+    ui.draw_board(board)
+    assert view.cell_surfaces is surfaces, "Projection should be cached while the camera is still"
+
+    for angle in range(0, 360, CUBE_YAW_STEP):
+        visible = 0
+        for index, (x, y) in enumerate(view.centers):
+            picked = ui.get_index_from_mouse((int(x), int(y)))
+            # The center of a cell picks it, unless a nearer cell covers it
+            assert picked is not None and view.order.index(picked) >= view.order.index(index)
+            visible += picked == index
+        assert visible >= 32, "Most cell centers should be visible"
+        view.rotate(CUBE_YAW_STEP)
+        ui.draw_board(board)
+    assert view.cell_surfaces is not surfaces, "Rotation should rebuild the projection"
+    assert ui.get_index_from_mouse((0, 0)) is None
+    print("✓ ID-buffer picking agrees with the back-to-front order at every rotation")
+
+    return True
+
+
+def test_game_clock():
+    """Test clocks with increment, flag fall and the engine's time manager."""
+    print("\n" + "=" * 60)
+    print("TESTING GAME CLOCK")
+    print("=" * 60)
+
+    import threading
+    from src.ai import AIPlayer
+    from src.clock import GameClock, TimeManager, parse_time_control
+    from src.constants import AI_HARD, WIN_ON_TIME
+
+    now = [0.0]
+    clock = GameClock(*parse_time_control("0.5+2"), time_source=lambda: now[0])
+    assert clock.remaining[PLAYER_X] == 30.0
+    clock.start(PLAYER_X)
+    now[0] = 10.0
+    assert clock.press(PLAYER_X) and clock.running == PLAYER_O
+    assert clock.time_left(PLAYER_X) == 22.0, "Increment should be added after the move"
+    now[0] = 40.0
+    assert clock.flagged() == PLAYER_O
+    board = Board()
+    assert board.flag_fall(PLAYER_O) and board.winner == PLAYER_X and board.win_reason == WIN_ON_TIME
+    print("✓ Fischer increment and flag fall")
+
+    manager = TimeManager()
+    quiet = Board()
+    quiet.make_move(0, 0, 0)
+    forced = Board()
+    for move in [(0, 0, 0), (1, 1, 0), (1, 0, 0), (2, 2, 0), (2, 0, 0)]:
+        forced.make_move(*move)
+    soft, hard = manager.allocate(quiet, 60.0, 1.0)
+    assert 0 < soft <= hard <= 60.0 * manager.max_share
+    assert manager.allocate(forced, 60.0, 1.0)[0] < soft, "A forced block deserves less time"
+    assert manager.allocate(quiet, 0.05)[1] == 0, "Only the overhead left: no search"
+    print(f"✓ Quiet move budget {soft:.2f}s soft / {hard:.2f}s hard of 60s")
+
+    manager.record(0.2, 0.35)
+    assert abs(manager.reserve() - 0.3) < 1e-9, "Reserve should cover twice the measured overshoot"
+    assert manager.allocate(quiet, 1.0)[1] <= (1.0 - manager.reserve()) * manager.max_share
+    assert manager.allocate(quiet, 0.25)[1] == 0, "Only the grown reserve left: no search"
+    for _ in range(30):
+        manager.record(0.2, 0.1)
+    assert manager.reserve() == manager.move_overhead, "Reserve should fall back to its floor"
+    print("✓ Reserve grows with measured overshoot and decays back to the move overhead")
+
+    # Two hard engines on a short clock while other threads load the machine
+    # (the increment alone covers the reserve, so they finish with time to spare)
+    stop = threading.Event()
+
+    def hog():
+        while not stop.is_set():
+            sum(range(1000))
+
+    hogs = [threading.Thread(target=hog, daemon=True) for _ in range(2)]
+    for thread in hogs:
+        thread.start()
+    try:
+        board = Board()
+        clock = GameClock(1.0, 0.1)
+        players = {PLAYER_X: AIPlayer(AI_HARD, seed=1), PLAYER_O: AIPlayer(AI_HARD, seed=2)}
+        clock.start(PLAYER_X)
+        while board.game_status == STATE_PLAYING:
+            player = board.current_player
+            move = players[player].choose_move(board, clock.time_left(player), clock.increment)
+            board.make_move(*move)
+            if board.game_status == STATE_PLAYING:
+                assert clock.press(player), f"Engine {player} lost on time at move {board.move_count}"
+    finally:
+        stop.set()
+        for thread in hogs:
+            thread.join()
+    clock.stop()
+    assert min(clock.remaining.values()) > 0
+    print(f"✓ Loaded engines finished a {board.move_count}-move game with "
+          f"{clock.remaining[PLAYER_X]:.2f}s / {clock.remaining[PLAYER_O]:.2f}s left")
+
+    return True
+
+
+def test_endgame_solver():
+    """Test the exact endgame solver and the search's switch to it."""
+    print("\n" + "=" * 60)
+    print("TESTING ENDGAME SOLVER")
+    print("=" * 60)
+
+    from src.endgame import EndgameSolver, count_live_lines
+    from src.search import Searcher, WIN_SCORE
+    from src.winning_lines import CELL_LINE_INDICES
+
+    moves = [(1, 2, 0), (0, 3, 3), (2, 3, 0), (2, 2, 0), (2, 1, 1), (0, 0, 3), (3, 3, 3), (2, 0, 1),
+             (0, 1, 2), (1, 0, 0), (2, 1, 3), (3, 0, 0), (1, 0, 2), (3, 2, 1), (2, 2, 2), (1, 3, 1),
+             (1, 1, 0), (2, 3, 2), (1, 3, 3), (3, 2, 2), (2, 0, 2), (0, 2, 3), (0, 1, 3), (3, 0, 3),
+             (1, 3, 0), (1, 1, 3), (0, 0, 0), (1, 1, 1), (3, 1, 1), (0, 0, 2), (0, 2, 1), (3, 1, 3),
+             (3, 2, 0), (0, 1, 1), (3, 1, 0), (1, 1, 2), (3, 1, 2), (0, 2, 0), (2, 2, 3), (0, 0, 1),
+             (0, 2, 2), (2, 0, 0), (1, 2, 2), (2, 1, 0)]
+    board = Board()
+    for move in moves:
+        board.make_move(*move)
+    solver = EndgameSolver()
+    assert not solver.applies(Board()) and solver.applies(board)
+    print(f"✓ Switch applies with {64 - board.move_count} empty cells, {count_live_lines(board)} live lines")
+
+    # A drawn position: searching as deep as there are empty cells is exact too
+    empty = len(board.get_empty_indices())
+    exact = Searcher().search(board, empty, start_depth=empty)
+    best, score, _ = solver.solve(board)
+    assert score == exact.score, "Solver and full-depth search should agree"
+    first_nodes = solver.nodes
+    solver.solve(board)
+    assert solver.nodes < first_nodes, "Solved positions should come from the memo"
+    memo_nodes = solver.nodes
+    candidates = solver.solve(board, margin=WIN_SCORE)[2]
+    live = {index for index in range(64) if any(
+        not (board.line_counts[PLAYER_X][line] and board.line_counts[PLAYER_O][line])
+        for line in CELL_LINE_INDICES[index])}
+    assert best in live and {index for index, _ in candidates} <= live, "Only cells on live lines are searched"
+    print(f"✓ Exact score {score} in {first_nodes} nodes (full-depth search: {exact.nodes}), "
+          f"{memo_nodes} nodes from the memo")
+
+    small = EndgameSolver(max_entries=100)
+    assert small.solve(board)[1] == score and len(small.memo) <= 100, "Memo should stay within its limit"
+    print("✓ Memo bounded within a single solve")
+
+    searcher = Searcher(endgame=EndgameSolver())
+    result = searcher.search(board, 4)
+    assert result.score == score and result.depth == empty, "Search should switch to the exact solver"
+    result = searcher.search(board, 2, node_limit=50)
+    assert result is not None and result.nodes <= 50, "Out of budget, the heuristic search takes over"
+    print("✓ Search switches to the solver, and falls back when its budget runs out")
+
+    return True
+
+
+def test_fork_detection():
+    """Test fork (double-threat) moves and blocks via the line-intersection table."""
+    print("\n" + "=" * 60)
+    print("TESTING FORK DETECTION")
+    print("=" * 60)
+
+    from src.winning_lines import CELL_POSITIONS, LINE_CELL_INDICES, LINE_INTERSECTIONS
+
+    for i, line in enumerate(LINE_CELL_INDICES):
+        for j, other in enumerate(LINE_CELL_INDICES):
+            shared = set(line) & set(other)
+            cell = LINE_INTERSECTIONS[i][j]
+            assert cell == LINE_INTERSECTIONS[j][i]
+            assert (cell == -1) if i == j or not shared else shared == {cell}
+    print(f"✓ Intersection table: {sum(cell >= 0 for row in LINE_INTERSECTIONS for cell in row) // 2} crossing pairs")
+
+    # X holds two of row y=0 and two of column x=0 on the bottom layer
+    board = Board()
+    for move in [(1, 0, 0), (3, 3, 3), (0, 1, 0), (2, 3, 3), (2, 0, 0), (3, 2, 3), (0, 2, 0)]:
+        board.make_move(*move)
+    assert board.get_fork_moves(PLAYER_X) == [(0, 0, 0)]
+    assert board.get_fork_blocks(PLAYER_O) == [(0, 0, 0), (3, 0, 0), (0, 3, 0)]
+    assert board.get_fork_blocks(PLAYER_X) == [], "O has no fork to block"
+    board.make_move(3, 3, 1)
+    board.make_move(0, 0, 0)
+    assert len(board.get_winning_moves(PLAYER_X)) == 2, "The fork move makes two open threes"
+    print("✓ Fork move and the three cells that defuse it found")
+
+    # Agrees with brute force: a block leaves the opponent without a fork
+    import random
+    rng = random.Random(5)
+    checked = 0
+    while checked < 50:
+        board = Board()
+        for _ in range(rng.randint(6, 24)):
+            if board.game_status == STATE_PLAYING:
+                board.make_move_index(rng.choice(board.get_empty_indices()))
+        opponent = PLAYER_O if board.current_player == PLAYER_X else PLAYER_X
+        if board.game_status != STATE_PLAYING or not board.get_fork_moves(opponent):
+            continue
+        checked += 1
+        blocks = set(board.get_fork_blocks(board.current_player))
+        for index in board.get_empty_indices():
+            board.make_move_index(index)
+            if board.game_status == STATE_PLAYING:
+                assert (board.get_fork_moves(opponent) == []) == (CELL_POSITIONS[index] in blocks)
+            board.undo_move()
+    print(f"✓ Fork blocks match brute force on {checked} random positions")
+
+    return True
+
+
+def test_notation():
+    """Test position and move notation, single and in bulk."""
+    print("\n" + "=" * 60)
+    print("TESTING POSITION NOTATION")
+    print("=" * 60)
+
+    import numpy as np
+    from src.analysis_server import AnalysisError, parse_position
+    from src.notation import cells_to_notation, notation_to_cells
+
+    board = Board()
+    for move in [(0, 0, 0), (1, 1, 1), (1, 0, 0), (2, 2, 2)]:
+        board.make_move(*move)
+    text = board.to_notation()
+    assert text == "XX" + "." * 19 + "O" + "." * 20 + "O" + "." * 21 + " X"
+    assert board.to_notation(moves=True) == "0,21,1,42"
+    for restored in (Board.from_notation(text), Board.from_notation("0,21,1,42")):
+        assert restored.to_notation() == text and restored.zobrist_key == board.zobrist_key
+        assert restored.line_counts == board.line_counts and restored.current_player == PLAYER_X
+    print(f"✓ Round trip: {text}")
+
+    won = Board.from_notation("XXXX" + "." * 12 + "OOO" + "." * 45 + " X")
+    assert won.game_status == STATE_WIN and won.winner == PLAYER_X
+    assert won.undo_move() and won.game_status == STATE_PLAYING
+    # X's highest cell (63) is off the winning row: the rebuilt last move must be on it
+    game = Board()
+    for index in (0, 4, 1, 20, 2, 37, 63, 54, 3):
+        game.make_move_index(index)
+    won = Board.from_notation(game.to_notation())
+    winning_move = won.move_history[-1][:3]
+    assert won.game_status == STATE_WIN and won.undo_move()
+    assert won.game_status == STATE_PLAYING and 4 not in won.line_counts[PLAYER_X], \
+        "Undoing the win should leave a game in progress"
+    assert won.get_winning_moves(PLAYER_X) == [winning_move] and won.make_move(*winning_move)
+    for invalid in ["X" * 64, "." * 63, "." * 64 + " Q", "0,0"]:
+        try:
+            Board.from_notation(invalid)
+            assert False, f"{invalid!r} should be rejected"
+        except ValueError:
+            pass
+    for invalid in ["." * 63, "X" + "." * 63 + " X"]:
+        try:
+            parse_position(invalid)
+            assert False, f"Analysis service should reject {invalid!r}"
+        except AnalysisError as e:
+            assert "position 0" not in str(e), "A single string should not be numbered"
+    assert len(parse_position("X" + "." * 63 + " O")) == 64
+    assert Board.from_notation("XXXX" + "." * 12 + "OOO" + "." * 45 + " O").winner == PLAYER_X, \
+        "A finished game may name either side"
+    try:
+        notation_to_cells(["." * 64 + " X", "." * 64 + " O"])
+        assert False, "O cannot move first"
+    except ValueError as e:
+        assert str(e).startswith("position 1:")
+    print("✓ Finished games restored, malformed notation and wrong sides to move rejected")
+
+    rng = np.random.default_rng(0)
+    cells = rng.integers(0, 3, size=(20000, 64), dtype=np.int8)
+    balance = (cells == PLAYER_X).sum(axis=1) - (cells == PLAYER_O).sum(axis=1)
+    cells = cells[(balance == 0) | (balance == 1)]
+    strings = cells_to_notation(cells)
+    parsed, sides = notation_to_cells(strings)
+    assert np.array_equal(parsed, cells)
+    assert np.array_equal(sides, np.where(balance[(balance == 0) | (balance == 1)] == 0, PLAYER_X, PLAYER_O))
+    print(f"✓ Bulk round trip of {len(strings)} positions")
+
+    return True
+
+
+def test_memory_diagnostics():
+    """Test live object accounting, allocation tracking and the report triggers."""
+    print("\n" + "=" * 60)
+    print("TESTING MEMORY DIAGNOSTICS")
+    print("=" * 60)
+
+    import asyncio
+    import io
+    import json
+    import os
+    import signal
+    import tempfile
+    from src import diagnostics
+    from src.analysis_server import AnalysisServer
+    from src.broadcast import MatchChannel
+    from src.journal import GameJournal, JournaledBoard
+
+    boards = [Board() for _ in range(20)]
+    for board in boards:
+        board.make_move(1, 1, 1)
+    report = diagnostics.memory_report()
+    assert report["live"]["Board"] >= 20 and report["boards"]["count"] == report["live"]["Board"]
+    assert set(report["per_game"]["board"]) >= {"cells", "move_history", "line_counts"}
+    assert not set(report["per_game"]["board"]) & set(report["per_game"]["engine"]), \
+        "Engine tables should be reported apart from board bytes"
+    assert report["allocations"] is None, "Nothing is traced until tracing starts"
+    board_bytes = sum(report["per_game"]["board"].values())
+    print(f"✓ {report['live']['Board']} live boards, {board_bytes} board bytes per game")
+
+    diagnostics.start_tracing()
+    try:
+        diagnostics.memory_report()
+        leaked = [Board() for _ in range(500)]
+        growth = diagnostics.memory_report()["allocations"]["growth"]
+    finally:
+        diagnostics.stop_tracing()
+    assert any("board.py" in entry["site"] for entry in growth[:3]), "Board allocations should lead the growth"
+    print(f"✓ Traced growth after {len(leaked)} new boards led by {growth[0]['site']}")
+
+    if diagnostics.REPORT_SIGNAL is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "memory.jsonl")
+            previous = diagnostics.install_signal_handler(path=path)
+            try:
+                os.kill(os.getpid(), diagnostics.REPORT_SIGNAL)
+            finally:
+                signal.signal(diagnostics.REPORT_SIGNAL, previous)
+            with open(path) as f:
+                assert json.loads(f.readline())["pid"] == os.getpid()
+        print("✓ Signal handler wrote a JSON report")
+
+    with tempfile.TemporaryDirectory() as directory:
+        with GameJournal(directory, max_delay=0.001) as journal:
+            hosted = [JournaledBoard(journal, session) for session in range(5)]
+            for board in hosted:
+                board.make_move(1, 1, 1)
+            channel = MatchChannel("watched")
+            channel.subscribe(io.BytesIO())
+            report = diagnostics.memory_report()
+    assert report["boards"]["count"] >= len(boards) + len(hosted), "Board subclasses should be counted"
+    assert report["sessions"]["journal_sessions"] >= 5 and report["sessions"]["spectators"] >= 1
+    assert "Sessions:" in diagnostics.format_report(report)
+    print(f"✓ Journaled boards counted as boards; sessions reported: {report['sessions']}")
+
+    response = asyncio.run(AnalysisServer().handle_request(
+        json.dumps({"jsonrpc": "2.0", "id": 1, "method": "memory", "params": {"top": 3}})))
+    assert response["result"]["boards"]["count"] >= 20 and "service" in response["result"]
+    for top in (0, "3", True):
+        response = asyncio.run(AnalysisServer().handle_request(
+            json.dumps({"jsonrpc": "2.0", "id": 2, "method": "memory", "params": {"top": top}})))
+        assert "error" in response, f"top={top!r} should be rejected"
+    print("✓ Admin command returns the report and validates its parameters")
+
+    return True
+
+
 def run_all_tests():
     """Run all tests."""
     print("\n╔════════════════════════════════════════════════════════════╗")
@@ -243,6 +1566,32 @@ def run_all_tests():
         ("3D Vertical Win", test_3d_vertical_win),
         ("3D Diagonal Win", test_3d_diagonal_win),
         ("Draw Condition", test_draw_condition),
+        ("Staged Move Generator", test_staged_move_generator),
+        ("Search and Undo", test_search_and_undo),
+        ("Parallel Search", test_parallel_search),
+        ("Analysis Server", test_analysis_server),
+        ("Search Telemetry", test_search_telemetry),
+        ("Differential Backends", test_differential_backends),
+        ("Perft", test_perft),
+        ("Post-Game Analysis", test_postgame_analysis),
+        ("Position Cache", test_position_cache),
+        ("Dead Draw", test_dead_draw),
+        ("Flat Index API", test_flat_index_api),
+        ("Game Journal", test_game_journal),
+        ("Spectator Broadcast", test_spectator_broadcast),
+        ("AI Difficulty", test_ai_difficulty),
+        ("Self-Play Dataset", test_selfplay_dataset),
+        ("Win-Rate Heatmap", test_heatmap),
+        ("Tournament", test_tournament),
+        ("Distributed Solve", test_distributed_solve),
+        ("Offscreen Render", test_offscreen_render),
+        ("Threat Overlay", test_threat_overlay),
+        ("Cube View", test_cube_view),
+        ("Game Clock", test_game_clock),
+        ("Endgame Solver", test_endgame_solver),
+        ("Fork Detection", test_fork_detection),
+        ("Position Notation", test_notation),
+        ("Memory Diagnostics", test_memory_diagnostics),
     ]
 
     passed = 0